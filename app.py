@@ -1,12 +1,24 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 import os
-from src.image_processor import ImageProcessor
-from src.piece_classifier import PieceClassifier
-from src.fen_generator import FENGenerator
-from src.chess_analyzer import ChessAnalyzer
-from src.board_renderer import BoardRenderer
-from src.pgn_exporter import PGNExporter
+import json
 import logging
+from contextlib import closing
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Optional
+from src.warmup import BackgroundInitializer
+
+if TYPE_CHECKING:
+    from src.debug_sink import DebugSink
+    from src.image_processor import ImageProcessor
+    from src.chess_detector import ChessboardDetector
+    from src.piece_classifier import PieceClassifier
+    from src.fen_generator import FENGenerator
+    from src.chess_analyzer import ChessAnalyzer
+    from src.board_renderer import BoardRenderer
+    from src.pgn_exporter import PGNExporter
+    from src.prediction_cache import PredictionCache
+    from src.empty_filter import EmptySquareFilter
+    from src.result_cache import ResultCache
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -15,22 +27,207 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 
 # Configuration
-UPLOAD_FOLDER = os.path.join('static', 'uploads')
+# Proportion des requêtes dont les images de debug sont conservées (0 = désactivé)
+DEBUG_SAMPLE_RATE = float(os.environ.get('DEBUG_SAMPLE_RATE', '0'))
+DEBUG_FOLDER = os.environ.get('DEBUG_FOLDER', 'debug')
+# Moteur d'inférence du classifieur : keras, onnx, tflite ou numpy (voir scripts/export_model.py)
+INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'keras')
+# Modèle à charger, par exemple models/chess_piece_classifier_int8.tflite (défaut du moteur si absent)
+MODEL_PATH = os.environ.get('MODEL_PATH')
+# Cache des prédictions par contenu des cases : taille en Mo (0 = désactivé) et mode (exact ou phash)
+PREDICTION_CACHE_MB = float(os.environ.get('PREDICTION_CACHE_MB', '16'))
+PREDICTION_CACHE_MODE = os.environ.get('PREDICTION_CACHE_MODE', 'exact')
+# Seuils du filtre des cases vides (voir scripts/calibrate_empty_filter.py), ignoré si absent
+EMPTY_FILTER_PATH = os.environ.get('EMPTY_FILTER_PATH', os.path.join('models', 'empty_filter.json'))
+# Regroupement des cases des requêtes concurrentes en un seul appel au modèle : attente maximale en ms
+# (0 = désactivé, par défaut : une requête seule n'attend pas ; quelques ms sous forte concurrence)
+BATCH_MAX_WAIT_MS = float(os.environ.get('BATCH_MAX_WAIT_MS', '0'))
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', '256'))
+# Cache des réponses complètes : entrées par niveau (0 = désactivé), durée de vie (s) et base SQLite optionnelle
+RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', '1024'))
+RESULT_CACHE_TTL = float(os.environ.get('RESULT_CACHE_TTL', '3600'))
+RESULT_CACHE_DB = os.environ.get('RESULT_CACHE_DB')
+# Pool de processus Stockfish : nombre (défaut : un par groupe de STOCKFISH_THREADS cœurs), threads et table de hachage (Mo) par processus
+STOCKFISH_POOL_SIZE = int(os.environ['STOCKFISH_POOL_SIZE']) if os.environ.get('STOCKFISH_POOL_SIZE') else None
+STOCKFISH_THREADS = int(os.environ.get('STOCKFISH_THREADS', '1'))
+STOCKFISH_HASH_MB = int(os.environ.get('STOCKFISH_HASH_MB', '16'))
+# Cache des analyses par position (Zobrist) : positions en mémoire (0 = désactivé) et base SQLite optionnelle
+ANALYSIS_CACHE_SIZE = int(os.environ.get('ANALYSIS_CACHE_SIZE', '4096'))
+ANALYSIS_CACHE_DB = os.environ.get('ANALYSIS_CACHE_DB')
+# Limites d'une analyse progressive (/analyze/stream) : variantes, profondeur et temps de recherche (ms)
+STREAM_MAX_MULTIPV = int(os.environ.get('STREAM_MAX_MULTIPV', '5'))
+STREAM_MAX_DEPTH = int(os.environ.get('STREAM_MAX_DEPTH', '30'))
+STREAM_MAX_MOVETIME_MS = float(os.environ.get('STREAM_MAX_MOVETIME_MS', '10000'))
+# Modèle d'échiquier complet (voir scripts/train_board_model.py), en remplacement de la classification case par case
+BOARD_MODEL_PATH = os.environ.get('BOARD_MODEL_PATH')
+
+# Attente maximale (en secondes) de la fin du préchauffage par une requête
+READY_TIMEOUT = float(os.environ.get('READY_TIMEOUT', '30'))
+
+@dataclass
+class Components:
+    debug_sink: 'DebugSink'
+    image_processor: 'ImageProcessor'
+    chessboard_detector: 'ChessboardDetector'
+    piece_classifier: 'PieceClassifier'
+    fen_generator: 'FENGenerator'
+    chess_analyzer: 'ChessAnalyzer'
+    board_renderer: 'BoardRenderer'
+    pgn_exporter: 'PGNExporter'
+    prediction_cache: Optional['PredictionCache'] = None
+    empty_filter: Optional['EmptySquareFilter'] = None
+    result_cache: Optional['ResultCache'] = None
+
+def create_components() -> Components:
+    """Initialisation des composants ; les imports lourds (cv2, TensorFlow, chess.engine) sont faits ici"""
+    from src.debug_sink import DebugSink
+    from src.image_processor import ImageProcessor
+    from src.chess_detector import ChessboardDetector
+    from src.piece_classifier import PieceClassifier
+    from src.fen_generator import FENGenerator
+    from src.chess_analyzer import ChessAnalyzer
+    from src.board_renderer import BoardRenderer
+    from src.pgn_exporter import PGNExporter
+    from src.prediction_cache import PredictionCache
+    from src.empty_filter import EmptySquareFilter
+    from src.result_cache import ResultCache
+    from src.analysis_cache import AnalysisCache
+    
+    debug_sink = DebugSink(output_dir=DEBUG_FOLDER, sample_rate=DEBUG_SAMPLE_RATE)
+    image_processor = ImageProcessor(debug_sink=debug_sink)
+    prediction_cache = None
+    if PREDICTION_CACHE_MB > 0:
+        prediction_cache = PredictionCache(max_bytes=int(PREDICTION_CACHE_MB * 1024 * 1024), mode=PREDICTION_CACHE_MODE)
+    empty_filter = EmptySquareFilter.load(EMPTY_FILTER_PATH) if os.path.exists(EMPTY_FILTER_PATH) else None
+    piece_classifier = PieceClassifier(model_path=MODEL_PATH, debug_sink=debug_sink, backend=INFERENCE_BACKEND,
+                                       cache=prediction_cache, empty_filter=empty_filter,
+                                       board_model_path=BOARD_MODEL_PATH)
+    if BATCH_MAX_WAIT_MS > 0:
+        piece_classifier.enable_batching(max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS)
+    
+    return Components(
+        debug_sink=debug_sink,
+        image_processor=image_processor,
+        chessboard_detector=ChessboardDetector(image_processor),
+        piece_classifier=piece_classifier,
+        fen_generator=FENGenerator(),
+        chess_analyzer=ChessAnalyzer(pool_size=STOCKFISH_POOL_SIZE, threads=STOCKFISH_THREADS, hash_mb=STOCKFISH_HASH_MB,
+                                     cache=AnalysisCache(ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_DB) if ANALYSIS_CACHE_SIZE > 0 else None),
+        board_renderer=BoardRenderer(),
+        pgn_exporter=PGNExporter(),
+        prediction_cache=prediction_cache,
+        empty_filter=empty_filter,
+        result_cache=ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL, RESULT_CACHE_DB) if RESULT_CACHE_SIZE > 0 else None,
+    )
+
+def warm_up(components: Components):
+    """Premier passage dans le modèle, pour que la première requête n'en paie pas le coût"""
+    components.piece_classifier.warm_up()
+
+# Les composants sont construits et préchauffés en arrière-plan ; /ready indique quand ils sont prêts.
+# Rien n'est lancé à l'import : le préchauffage démarre avec create_app(), au premier /ready ou à la première requête qui en a besoin
+app_components = BackgroundInitializer(create_components, warm_up, name='app-warmup')
 
-# Initialisation des composants
-image_processor = ImageProcessor()
-piece_classifier = PieceClassifier()
-fen_generator = FENGenerator()
-chess_analyzer = ChessAnalyzer()
-board_renderer = BoardRenderer()
-pgn_exporter = PGNExporter()
+def create_app() -> Flask:
+    """Fabrique de l'application : lance le préchauffage (par exemple gunicorn 'app:create_app()', dans chaque worker)"""
+    app_components.start()
+    return app
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.route('/ready')
+def ready():
+    """Point de contrôle pour les répartiteurs de charge : 200 une fois le préchauffage terminé, 503 avant"""
+    # Premier sondage d'un worker lancé sans create_app() (gunicorn app:app, flask run) : lance le préchauffage
+    app_components.start()
+    status = app_components.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+@app.route('/metrics')
+def metrics():
+    """Compteurs des caches, du filtre des cases vides, du regroupeur d'inférence et du pool de moteurs"""
+    if not app_components.ready:
+        return jsonify(app_components.status()), 503
+    components = app_components.get()
+    metrics = {'warmup': app_components.status()}
+    if components.result_cache is not None:
+        metrics['result_cache'] = components.result_cache.metrics()
+    if components.prediction_cache is not None:
+        cache = components.prediction_cache
+        metrics['prediction_cache'] = {'entries': len(cache), 'bytes': cache.nbytes, 'hits': cache.hits,
+                                       'misses': cache.misses, 'hit_rate': cache.hit_rate, 'evictions': cache.evictions}
+    if components.empty_filter is not None:
+        metrics['empty_filter'] = {'checked': components.empty_filter.checked, 'skipped': components.empty_filter.skipped}
+    batcher = components.piece_classifier.batcher
+    if batcher is not None:
+        metrics['batcher'] = {'batches': batcher.batches, 'requests': batcher.requests, 'items': batcher.items}
+    metrics['engine_pool'] = components.chess_analyzer.pool.metrics()
+    if components.chess_analyzer.cache is not None:
+        metrics['analysis_cache'] = components.chess_analyzer.cache.metrics()
+    return jsonify(metrics)
+
+@app.route('/analyze/stream')
+def analyze_stream():
+    """
+    Analyse progressive d'une position, en Server-Sent Events.
+    
+    Paramètres : fen (obligatoire), depth, movetime (ms), nodes et multipv.
+    Sans limite, la limite dépend du nombre de pièces ; sinon la profondeur
+    est bornée par STREAM_MAX_DEPTH et le temps de recherche, toujours
+    limité, par STREAM_MAX_MOVETIME_MS, pour qu'un client ne puisse pas
+    garder un moteur du pool indéfiniment. Chaque évènement
+    contient la profondeur atteinte et les variantes ; le dernier a
+    final=true. Un évènement 'error' signale une analyse impossible.
+    """
+    try:
+        components = app_components.get(timeout=READY_TIMEOUT)
+    except (TimeoutError, RuntimeError) as e:
+        logger.error(f"Composants indisponibles : {str(e)}")
+        return jsonify({'success': False, 'error': 'Service indisponible, réessayez dans quelques instants'}), 503
+    
+    import chess
+    fen = request.args.get('fen', '')
+    try:
+        chess.Board(fen)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'FEN invalide'}), 400
+    
+    movetime = request.args.get('movetime', type=float)
+    depth = request.args.get('depth', type=int)
+    nodes = request.args.get('nodes', type=int)
+    multipv = min(max(request.args.get('multipv', 3, type=int), 1), STREAM_MAX_MULTIPV)
+    if depth is not None:
+        depth = min(max(depth, 1), STREAM_MAX_DEPTH)
+    if nodes is not None:
+        nodes = max(nodes, 1)
+    if depth is not None or nodes is not None or movetime is not None:
+        movetime = min(movetime, STREAM_MAX_MOVETIME_MS) if movetime and movetime > 0 else STREAM_MAX_MOVETIME_MS
+    
+    def events():
+        final = False
+        updates = components.chess_analyzer.analyze_stream(fen, depth=depth, nodes=nodes, multipv=multipv,
+                                                           movetime=movetime / 1000 if movetime else None)
+        # Une déconnexion du client ferme ce générateur, qui ferme l'analyse et rend le moteur
+        with closing(updates):
+            for update in updates:
+                final = update.final
+                yield f"data: {json.dumps(asdict(update))}\n\n"
+        if not final:
+            yield f"event: error\ndata: {json.dumps({'error': 'Analyse impossible'})}\n\n"
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
+    try:
+        components = app_components.get(timeout=READY_TIMEOUT)
+    except (TimeoutError, RuntimeError) as e:
+        logger.error(f"Composants indisponibles : {str(e)}")
+        return jsonify({'success': False, 'error': 'Service indisponible, réessayez dans quelques instants'}), 503
+    
     try:
         logger.info("=== Début du traitement de l'upload ===")
         if 'file' not in request.files:
@@ -44,60 +241,101 @@ def upload_file():
             logger.error("Nom de fichier vide")
             return jsonify({'success': False, 'error': 'Aucun fichier sélectionné'})
         
-        # Sauvegarde l'image
-        filepath = os.path.join(UPLOAD_FOLDER, file.filename)
-        logger.info(f"Tentative de sauvegarde de l'image dans : {filepath}")
-        file.save(filepath)
-        logger.info("Image sauvegardée avec succès")
+        if not components.image_processor.has_valid_extension(file.filename):
+            logger.error("Extension de fichier non supportée")
+            return jsonify({'success': False, 'error': 'Image invalide'})
+        
+        data = file.read()
+        result_cache = components.result_cache
+        
+        # Capture déjà traitée à l'identique : réponse mémorisée, sans aucun traitement
+        exact_key = None
+        if result_cache is not None:
+            exact_key = result_cache.exact_key(data)
+            cached = result_cache.get('exact', exact_key)
+            if cached is not None:
+                logger.info("Réponse trouvée dans le cache (contenu identique)")
+                return jsonify(cached)
+        
+        # Valide l'en-tête puis décode l'image en mémoire, une seule fois pour toute la requête
+        is_valid, decoded = components.image_processor.validate_image(data)
+        if not is_valid:
+            logger.error("Image reçue invalide ou trop petite")
+            return jsonify({'success': False, 'error': 'Image invalide'})
+        image = components.image_processor.load_image(decoded)
                 
+        # Décide si cette requête produit des images de debug
+        debug_prefix = components.debug_sink.sample()
+        
         # Traite l'image
         logger.info("Début de la détection de l'échiquier...")
-        success, corners = image_processor.detect_chessboard(filepath)
-        logger.info(f"Résultat de la détection des coins: {success}")
+        detection = components.chessboard_detector.detect(image, debug_prefix=debug_prefix)
+        success, corners = detection.success, detection.corners
+        logger.info(f"Résultat de la détection des coins: {success} (étape : {detection.stage})")
         
         if not success or corners is None:
             logger.error("Échec de la détection de l'échiquier - coins non trouvés")
             return jsonify({'success': False, 'error': 'Échiquier non détecté'})
         
-        # Extrait les cases
-        logger.info("Début de l'extraction des cases...")
-        success, squares = image_processor.extract_squares(filepath, corners)
-        logger.info(f"Nombre de cases extraites: {len(squares) if squares else 0}")
+        # Autre capture de la même position : réponse mémorisée, sans classification ni analyse
+        signature = None
+        if result_cache is not None:
+            success, thumbnail = components.image_processor.warp_board(image, corners, size=result_cache.SIGNATURE_BOARD_SIZE)
+            if success:
+                signature = result_cache.board_signature(thumbnail)
+                cached = result_cache.get('near', signature)
+                if cached is not None:
+                    logger.info("Réponse trouvée dans le cache (même échiquier)")
+                    result_cache.put('exact', exact_key, cached)
+                    return jsonify(cached)
         
-        if not success or not squares or len(squares) != 64:
-            logger.error(f"Échec de l'extraction des cases - nombre incorrect de cases: {len(squares) if squares else 0}")
-            return jsonify({'success': False, 'error': 'Erreur lors de l\'extraction des cases'})
-        
-        # Classifie les pièces
-        logger.info("Classification des pièces...")
-        pieces = piece_classifier.classify_board(squares)
+        if components.piece_classifier.mode == 'board':
+            # Redresse l'échiquier entier et le classifie en une seule passe
+            logger.info("Redressement de l'échiquier...")
+            success, board = components.image_processor.warp_board(image, corners, size=components.piece_classifier.BOARD_INPUT_SIZE)
+            if not success:
+                logger.error("Échec du redressement de l'échiquier")
+                return jsonify({'success': False, 'error': 'Erreur lors de l\'extraction des cases'})
+            
+            logger.info("Classification des pièces...")
+            pieces = components.piece_classifier.classify_board_image(board, debug_prefix=debug_prefix)
+        else:
+            # Extrait les cases
+            logger.info("Début de l'extraction des cases...")
+            success, squares = components.image_processor.extract_squares_batch(image, corners)
+            logger.info(f"Nombre de cases extraites: {len(squares) if squares is not None else 0}")
+            
+            if not success or squares is None or len(squares) != 64:
+                logger.error(f"Échec de l'extraction des cases - nombre incorrect de cases: {len(squares) if squares is not None else 0}")
+                return jsonify({'success': False, 'error': 'Erreur lors de l\'extraction des cases'})
+            
+            # Classifie les pièces
+            logger.info("Classification des pièces...")
+            pieces = components.piece_classifier.classify_board(squares, debug_prefix=debug_prefix)
         
         # Génère le FEN
         logger.info("Génération du FEN...")
         try:
-            fen = fen_generator.pieces_to_fen(pieces)
+            fen = components.fen_generator.pieces_to_fen(pieces)
             logger.info(f"FEN généré : {fen}")
         except Exception as e:
             logger.error(f"Erreur lors de la génération du FEN : {str(e)}")
             return jsonify({'success': False, 'error': 'Erreur lors de la génération du FEN'})
         
-        # Analyse la position
+        # Analyse la position ; le résumé reprend la meilleure variante, sans seconde recherche
         logger.info("Analyse de la position...")
-        analysis = chess_analyzer.analyze_position(fen)
-        analysis_summary = chess_analyzer.get_position_summary(fen)
+        analysis = components.chess_analyzer.analyze_position(fen)
+        analysis_summary = components.chess_analyzer.get_position_summary(fen, analysis)
         
         # Génère le rendu de l'échiquier
         logger.info("Rendu de l'échiquier...")
-        board_svg = board_renderer.render_svg(fen)
+        board_svg = components.board_renderer.render_svg(fen)
         
         # Génère le PGN
         logger.info("Génération du PGN...")
-        pgn = pgn_exporter.export_pgn(fen, analysis)
-        
-        # Nettoie le fichier temporaire
-        os.remove(filepath)
+        pgn = components.pgn_exporter.export_pgn(fen, analysis)
         
-        return jsonify({
+        response = {
             'success': True,
             'fen': fen,
             'board_svg': board_svg,
@@ -112,19 +350,23 @@ def upload_file():
                 for result in analysis
             ],
             'pgn': pgn
-        })
+        }
+        
+        # Une analyse vide (moteurs indisponibles) n'est pas mémorisée : la prochaine requête la retentera
+        if result_cache is not None and analysis:
+            result_cache.put('exact', exact_key, response)
+            if signature is not None:
+                result_cache.put('near', signature, response)
+        
+        return jsonify(response)
         
     except Exception as e:
         logger.error(f"Erreur lors du traitement : {str(e)}")
         return jsonify({'success': False, 'error': str(e)})
 
 if __name__ == '__main__':
-    # S'assurer que le dossier d'upload existe
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-    
     # Configuration du serveur
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # Limite de 16MB pour les uploads
-    app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
     
-    # Démarrer le serveur
-    app.run(host='127.0.0.1', port=5000, debug=True, use_reloader=False)
+    # Démarrer le préchauffage puis le serveur
+    create_app().run(host='127.0.0.1', port=5000, debug=True, use_reloader=False)
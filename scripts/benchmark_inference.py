@@ -0,0 +1,54 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+import logging
+import numpy as np
+from src.piece_classifier import PieceClassifier
+from src.inference_backends import KerasBackend
+
+# Configure le logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def measure(fn, runs: int) -> float:
+    """Temps médian d'un appel, en millisecondes"""
+    fn()  # Préchauffage
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare model.predict et la fonction d'inférence compilée du moteur keras")
+    parser.add_argument('--model', default=KerasBackend.default_path(), help="Modèle Keras (.h5)")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 64, 200])
+    parser.add_argument('--runs', type=int, default=30)
+    args = parser.parse_args()
+    
+    classifier = PieceClassifier(model_path=args.model)
+    backend = classifier.backend
+    backend.warm_up(np.zeros((1, 100, 100, 3), dtype=np.float32))
+    traced = len(backend._functions)
+    
+    rng = np.random.RandomState(0)
+    logger.info(f"{'cases':>6}{'model.predict':>16}{'compilé':>12}{'accélération':>14}{'écart max':>12}")
+    for batch_size in args.batch_sizes:
+        batch = rng.standard_normal((batch_size, 100, 100, 3)).astype(np.float32)
+        error = float(np.abs(backend.predict(batch) - classifier.model.predict(batch, verbose=0)).max())
+        legacy = measure(lambda: classifier.model.predict(batch, batch_size=len(batch), verbose=0), args.runs)
+        compiled = measure(lambda: backend.predict(batch), args.runs)
+        logger.info(f"{batch_size:>6}{legacy:>13.2f} ms{compiled:>9.2f} ms{legacy / compiled:>13.1f}x{error:>12.1e}")
+    
+    # Aucune nouvelle fonction ne doit avoir été tracée pendant les mesures
+    if len(backend._functions) != traced:
+        logger.error(f"Retraçage pendant les mesures : {traced} -> {len(backend._functions)} fonctions")
+        sys.exit(1)
+    logger.info(f"{traced} fonctions compilées (tailles de lot {backend.buckets}), aucun retraçage")
+
+if __name__ == "__main__":
+    main()
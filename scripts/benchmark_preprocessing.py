@@ -0,0 +1,75 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+import logging
+import numpy as np
+import cv2
+from src.preprocessing import preprocess_batch
+
+# Configure le logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def preprocess_per_square(squares: np.ndarray) -> np.ndarray:
+    """Ancien prétraitement, case par case, conservé comme référence"""
+    processed = []
+    for img in squares:
+        img = cv2.resize(img, (100, 100))
+        lab = cv2.cvtColor(img, cv2.COLOR_RGB2LAB)
+        l, a, b = cv2.split(lab)
+        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+        cl = clahe.apply(l)
+        img = cv2.cvtColor(cv2.merge((cl, a, b)), cv2.COLOR_LAB2RGB)
+        img = cv2.GaussianBlur(img, (3, 3), 0)
+        img = img.astype(np.float32) / 255.0
+        img = (img - np.mean(img)) / (np.std(img) + 1e-7)
+        processed.append(img)
+    return np.array(processed)
+
+def board_squares(seed: int = 0) -> np.ndarray:
+    """64 cases synthétiques : cases unies bruitées et quelques formes"""
+    rng = np.random.RandomState(seed)
+    squares = np.empty((64, 100, 100, 3), dtype=np.uint8)
+    for i in range(64):
+        color = (240, 217, 181) if (i + i // 8) % 2 == 0 else (181, 136, 99)
+        squares[i] = np.clip(np.array(color) + rng.randint(-4, 5, (100, 100, 3)), 0, 255)
+        if rng.rand() < 0.5:
+            cv2.circle(squares[i], (50, 55), 25, (20, 20, 20) if i % 2 else (250, 250, 250), -1)
+    return squares
+
+def measure(fn, runs: int) -> float:
+    """Temps médian d'un appel, en millisecondes"""
+    fn()  # Préchauffage
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesure le temps de prétraitement d'un échiquier (64 cases)")
+    parser.add_argument('--runs', type=int, default=50)
+    args = parser.parse_args()
+    
+    squares = board_squares()
+    out = np.empty((64, 100, 100, 3), dtype=np.float32)
+    
+    reference = preprocess_per_square(squares)
+    max_error = float(np.abs(preprocess_batch(squares) - reference).max())
+    logger.info(f"Écart maximal avec le prétraitement case par case : {max_error:.2e}")
+    
+    results = {
+        'case par case': measure(lambda: preprocess_per_square(squares), args.runs),
+        'lot': measure(lambda: preprocess_batch(squares), args.runs),
+        'lot, tampon préalloué': measure(lambda: preprocess_batch(squares, out=out), args.runs),
+    }
+    baseline = results['case par case']
+    for name, ms in results.items():
+        logger.info(f"{name:<24}{ms:>8.2f} ms/échiquier  ({baseline / ms:.1f}x)")
+
+if __name__ == "__main__":
+    main()
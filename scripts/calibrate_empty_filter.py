@@ -0,0 +1,59 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+import numpy as np
+import cv2
+from src.empty_filter import EmptySquareFilter
+
+# Configure le logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def load_squares(class_dir: str) -> list:
+    """Charge les cases d'une classe en RGB ; la transparence est rendue sur fond blanc"""
+    squares = []
+    for img_name in sorted(os.listdir(class_dir)):
+        if img_name.lower().endswith('.svg'):
+            continue
+        img = cv2.imread(os.path.join(class_dir, img_name), cv2.IMREAD_UNCHANGED)
+        if img is None:
+            logger.warning(f"Impossible de charger l'image : {img_name}")
+            continue
+        if img.ndim == 2:
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        elif img.shape[2] == 4:
+            alpha = img[:, :, 3:].astype(np.float32) / 255.0
+            img = (img[:, :, :3] * alpha + 255 * (1 - alpha)).astype(np.uint8)
+        squares.append(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+    return squares
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibre le filtre des cases vides sur data/pieces")
+    parser.add_argument('--data-dir', default='data/pieces', help="Cases étiquetées, un dossier par pièce")
+    parser.add_argument('--false-negative-rate', type=float, default=0.05,
+                        help="Proportion tolérée de cases vides envoyées malgré tout au CNN")
+    parser.add_argument('--output', default='models/empty_filter.json')
+    args = parser.parse_args()
+    
+    # Cases vides pour les seuils, cases avec pièce pour mesurer les faux positifs
+    empty = load_squares(os.path.join(args.data_dir, 'empty'))
+    pieces = []
+    for class_name in sorted(os.listdir(args.data_dir)):
+        class_dir = os.path.join(args.data_dir, class_name)
+        if class_name != 'empty' and os.path.isdir(class_dir):
+            pieces.extend(load_squares(class_dir))
+    logger.info(f"{len(empty)} cases vides, {len(pieces)} cases avec pièce")
+    
+    empty_filter = EmptySquareFilter()
+    report = empty_filter.calibrate(empty, args.false_negative_rate, pieces)
+    logger.info(f"Cases vides reconnues : {report['empty_detected'] * 100:.1f}%")
+    logger.info(f"Cases avec pièce déclarées vides : {report['pieces_flagged_empty'] * 100:.2f}%")
+    
+    empty_filter.save(args.output, report)
+    logger.info(f"Seuils écrits dans {args.output}")
+
+if __name__ == "__main__":
+    main()
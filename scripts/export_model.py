@@ -0,0 +1,82 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+import numpy as np
+import cv2
+import tensorflow as tf
+from src.piece_classifier import PieceClassifier
+from src.inference_backends import (KerasBackend, NumpyBackend, OnnxBackend, TFLiteBackend,
+                                    export_onnx, export_tflite, load_backend)
+from src.numpy_inference import convert_model
+
+# Configure le logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def load_sample_squares(data_dir: str, per_class: int = 8) -> np.ndarray:
+    """Charge quelques cases de chaque classe pour vérifier la parité des moteurs"""
+    squares = []
+    for class_name in sorted(os.listdir(data_dir)):
+        class_dir = os.path.join(data_dir, class_name)
+        if not os.path.isdir(class_dir):
+            continue
+        for img_name in sorted(os.listdir(class_dir))[:per_class]:
+            img = cv2.imread(os.path.join(class_dir, img_name))
+            if img is not None:
+                squares.append(cv2.resize(cv2.cvtColor(img, cv2.COLOR_BGR2RGB), (100, 100)))
+    return np.array(squares)
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporte le modèle Keras aux formats ONNX, TFLite et NumPy")
+    parser.add_argument('--model', default=KerasBackend.default_path(), help="Modèle Keras (.h5)")
+    parser.add_argument('--formats', nargs='+', default=['onnx', 'tflite', 'numpy'], choices=['onnx', 'tflite', 'numpy'])
+    parser.add_argument('--data-dir', default='data/pieces', help="Cases utilisées pour vérifier la parité")
+    parser.add_argument('--tolerance', type=float, default=1e-4, help="Écart maximal toléré sur les probabilités")
+    args = parser.parse_args()
+    
+    # Charge le modèle Keras de référence
+    logger.info(f"Chargement du modèle {args.model}...")
+    model = tf.keras.models.load_model(args.model)
+    reference = PieceClassifier(model_path=args.model)
+    
+    outputs = {
+        'onnx': os.path.splitext(args.model)[0] + OnnxBackend.extension,
+        'tflite': os.path.splitext(args.model)[0] + TFLiteBackend.extension,
+        'numpy': os.path.splitext(args.model)[0] + NumpyBackend.extension,
+    }
+    for fmt in args.formats:
+        logger.info(f"Export {fmt} vers {outputs[fmt]}...")
+        if fmt == 'onnx':
+            export_onnx(model, outputs[fmt])
+        elif fmt == 'numpy':
+            convert_model(model, outputs[fmt])
+        else:
+            export_tflite(model, outputs[fmt])
+    
+    # Vérifie que chaque moteur reproduit les probabilités du modèle Keras
+    squares = load_sample_squares(args.data_dir)
+    if len(squares) == 0:
+        logger.warning(f"Aucune case dans {args.data_dir}, parité non vérifiée")
+        return
+    batch = reference.preprocess_batch(squares)
+    expected = reference.predict_proba(batch)
+    
+    failed = False
+    for fmt in args.formats:
+        probabilities = load_backend(fmt, outputs[fmt]).predict(batch)
+        max_error = float(np.abs(probabilities - expected).max())
+        same_labels = np.mean(probabilities.argmax(axis=1) == expected.argmax(axis=1))
+        logger.info(f"{fmt} : écart maximal {max_error:.2e}, prédictions identiques {same_labels * 100:.1f}% "
+                    f"({len(batch)} cases)")
+        failed |= max_error > args.tolerance
+    
+    if failed:
+        logger.error("Parité non respectée pour au moins un format")
+        sys.exit(1)
+    logger.info("Export terminé !")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import time
+import logging
+import numpy as np
+import cv2
+from src.piece_classifier import PieceClassifier
+from src.inference_backends import (InferenceBackend, KerasBackend, TFLiteBackend,
+                                    QUANTIZATIONS, export_tflite)
+
+# Configure le logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def load_labeled_squares(data_dir: str, seed: int = 42):
+    """Charge les cases étiquetées (nom du dossier = nom de la pièce), dans un ordre aléatoire fixe"""
+    squares, labels = [], []
+    for class_name in sorted(os.listdir(data_dir)):
+        class_dir = os.path.join(data_dir, class_name)
+        if not os.path.isdir(class_dir):
+            continue
+        for img_name in sorted(os.listdir(class_dir)):
+            img = cv2.imread(os.path.join(class_dir, img_name))
+            if img is None:
+                continue
+            squares.append(cv2.resize(cv2.cvtColor(img, cv2.COLOR_BGR2RGB), (100, 100)))
+            labels.append(class_name)
+
+    indices = np.random.RandomState(seed).permutation(len(squares))
+    return np.array(squares)[indices], np.array(labels)[indices]
+
+def per_board_latency(backend: InferenceBackend, batch: np.ndarray, runs: int) -> float:
+    """Latence médiane (ms) d'une passe sur un échiquier complet (64 cases)"""
+    board = np.resize(batch, (64,) + batch.shape[1:])
+    backend.predict(board)  # Préchauffage
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        backend.predict(board)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+def evaluate(classifier: PieceClassifier, backend: InferenceBackend, batch: np.ndarray,
+             labels: np.ndarray, reference: np.ndarray, runs: int) -> dict:
+    """Précision par classe, accord avec le modèle float et latence d'un moteur"""
+    probabilities = backend.predict(batch)
+    predicted = np.array(classifier.decode_predictions(probabilities))
+    per_class = {
+        name: float(np.mean(predicted[labels == name] == name))
+        for name in sorted(set(labels))
+    }
+    return {
+        'accuracy': float(np.mean(predicted == labels)),
+        'per_class_accuracy': per_class,
+        'agreement_with_float': float(np.mean(predicted == np.array(reference))),
+        'max_probability_error': float(np.abs(probabilities - classifier.predict_proba(batch)).max()),
+        'per_board_latency_ms': per_board_latency(backend, batch, runs),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantifie le modèle Keras (TFLite float16 et int8) et compare au modèle float")
+    parser.add_argument('--model', default=KerasBackend.default_path(), help="Modèle Keras (.h5)")
+    parser.add_argument('--data-dir', default='data/pieces', help="Cases étiquetées, un dossier par pièce")
+    parser.add_argument('--quantizations', nargs='+', default=list(QUANTIZATIONS), choices=QUANTIZATIONS)
+    parser.add_argument('--calibration-size', type=int, default=200, help="Cases utilisées pour calibrer l'int8")
+    parser.add_argument('--runs', type=int, default=20, help="Passes chronométrées par moteur")
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.01,
+                        help="Perte de précision globale tolérée par rapport au modèle float")
+    parser.add_argument('--report', default='models/quantization_report.json')
+    args = parser.parse_args()
+
+    # Charge le modèle de référence et les données
+    logger.info(f"Chargement du modèle {args.model}...")
+    classifier = PieceClassifier(model_path=args.model)
+    squares, labels = load_labeled_squares(args.data_dir)
+    if len(squares) == 0:
+        logger.error(f"Aucune case dans {args.data_dir}")
+        sys.exit(1)
+    batch = classifier.preprocess_batch(squares)
+
+    # Échantillon de calibration distinct des cases d'évaluation
+    calibration_size = min(args.calibration_size, len(batch) // 2)
+    calibration, batch, labels = batch[:calibration_size], batch[calibration_size:], labels[calibration_size:]
+    logger.info(f"{calibration_size} cases de calibration, {len(batch)} cases d'évaluation")
+
+    reference = classifier.decode_predictions(classifier.predict_proba(batch))
+    report = {'model': args.model, 'evaluation_size': len(batch), 'calibration_size': calibration_size, 'variants': {}}
+    report['variants']['float32'] = evaluate(classifier, classifier.backend, batch, labels, reference, args.runs)
+    report['variants']['float32']['size_bytes'] = os.path.getsize(args.model)
+
+    base = os.path.splitext(args.model)[0]
+    for quantization in args.quantizations:
+        output_path = f"{base}_{quantization}{TFLiteBackend.extension}"
+        logger.info(f"Quantification {quantization} vers {output_path}...")
+        export_tflite(classifier.model, output_path, quantization=quantization, representative_data=calibration)
+        backend = TFLiteBackend.load(output_path)
+        report['variants'][quantization] = evaluate(classifier, backend, batch, labels, reference, args.runs)
+        report['variants'][quantization]['size_bytes'] = os.path.getsize(output_path)
+        report['variants'][quantization]['path'] = output_path
+
+    # Rapport
+    float_result = report['variants']['float32']
+    logger.info(f"{'variante':<10}{'précision':>11}{'accord':>9}{'ms/échiquier':>14}{'accélération':>14}{'taille':>10}")
+    for name, result in report['variants'].items():
+        speedup = float_result['per_board_latency_ms'] / result['per_board_latency_ms']
+        result['speedup'] = speedup
+        logger.info(f"{name:<10}{result['accuracy'] * 100:>10.1f}%{result['agreement_with_float'] * 100:>8.1f}%"
+                    f"{result['per_board_latency_ms']:>14.1f}{speedup:>13.2f}x{result['size_bytes'] / 1e6:>8.1f}Mo")
+
+    # La perte de précision n'est jamais acceptée silencieusement
+    failed = False
+    for name, result in report['variants'].items():
+        drop = float_result['accuracy'] - result['accuracy']
+        for class_name, accuracy in result['per_class_accuracy'].items():
+            class_drop = float_result['per_class_accuracy'][class_name] - accuracy
+            if class_drop > args.max_accuracy_drop:
+                logger.warning(f"{name} : précision de la classe {class_name} en baisse de {class_drop * 100:.1f} points")
+        if drop > args.max_accuracy_drop:
+            logger.error(f"{name} : précision globale en baisse de {drop * 100:.1f} points "
+                         f"(tolérance {args.max_accuracy_drop * 100:.1f})")
+            failed = True
+    report['passed'] = not failed
+
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Rapport écrit dans {args.report}")
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ from sklearn.metrics import classification_report, confusion_matrix
 import seaborn as sns
 import matplotlib.pyplot as plt
 from src.piece_classifier import PieceClassifier
+from src.preprocessing import preprocess_batch
 
 # Configure le logging
 logging.basicConfig(level=logging.INFO)
@@ -35,20 +36,10 @@ def load_test_data(test_dir: str):
                 if img is None:
                     continue
                 
-                # Prétraite l'image comme dans l'entraînement
+                # Le prétraitement, commun à l'entraînement, est appliqué au lot complet
                 img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
                 img = cv2.resize(img, (100, 100))
                 
-                # Améliore le contraste
-                lab = cv2.cvtColor(img, cv2.COLOR_RGB2LAB)
-                l, a, b = cv2.split(lab)
-                clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-                cl = clahe.apply(l)
-                enhanced = cv2.merge((cl,a,b))
-                img = cv2.cvtColor(enhanced, cv2.COLOR_LAB2RGB)
-                
-                img = img.astype(np.float32) / 255.0
-                
                 images.append(img)
                 true_classes.append(class_name)
                 
@@ -56,7 +47,7 @@ def load_test_data(test_dir: str):
                 logger.error(f"Erreur lors du chargement de {img_path}: {str(e)}")
                 continue
                 
-    return np.array(images), true_classes
+    return preprocess_batch(images), true_classes
 
 def plot_confusion_matrix(y_true, y_pred, classes):
     """Affiche la matrice de confusion"""
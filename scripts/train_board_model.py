@@ -0,0 +1,58 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+import logging
+import numpy as np
+from src.model_trainer import ChessModelTrainer
+from src.piece_classifier import PieceClassifier
+from src.dataset_generator import BoardDatasetGenerator
+from src.preprocessing import BOARD_INPUT_SIZE
+
+# Configure le logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def median_ms(fn, runs: int) -> float:
+    """Temps médian d'un appel, en millisecondes"""
+    fn()  # Préchauffage
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+def main():
+    parser = argparse.ArgumentParser(description="Entraîne le modèle d'échiquier complet sur des positions rendues")
+    parser.add_argument('--data-dir', default='data/pieces', help="Sprites des pièces, un dossier par pièce")
+    parser.add_argument('--samples', type=int, default=2000, help="Nombre d'échiquiers générés")
+    parser.add_argument('--epochs', type=int, default=20)
+    parser.add_argument('--board-size', type=int, default=BOARD_INPUT_SIZE)
+    parser.add_argument('--output', default=PieceClassifier.BOARD_MODEL_PATH)
+    parser.add_argument('--runs', type=int, default=20, help="Passes chronométrées pour la comparaison de latence")
+    args = parser.parse_args()
+    
+    trainer = ChessModelTrainer(data_dir=args.data_dir)
+    history = trainer.train_board_model(epochs=args.epochs, samples=args.samples,
+                                        model_path=args.output, board_size=args.board_size)
+    logger.info(f"Précision de validation (par case) : {max(history.history['val_accuracy']):.2%}")
+    
+    # Évaluation sur des positions inédites, et coût comparé aux 64 recadrages
+    classifier = PieceClassifier(board_model_path=args.output)
+    boards, labels = BoardDatasetGenerator(sprites_dir=args.data_dir, size=args.board_size, seed=1).generate(50)
+    names = np.array(list(PieceClassifier.PIECES.values()))
+    predicted = np.array([classifier.classify_board_image(board) for board in boards])
+    logger.info(f"Précision sur 50 échiquiers inédits : {np.mean(predicted == names[labels.reshape(50, 64)]):.2%} par case, "
+                f"{np.mean(np.all(predicted == names[labels.reshape(50, 64)], axis=1)):.2%} d'échiquiers exacts")
+    
+    squares = np.random.RandomState(0).randint(0, 256, (64, 100, 100, 3), dtype=np.uint8)
+    per_square = median_ms(lambda: classifier.predict_proba(classifier.preprocess_batch(squares)), args.runs)
+    whole_board = median_ms(lambda: classifier.classify_board_image(boards[0]), args.runs)
+    logger.info(f"64 cases : {per_square:.1f} ms, échiquier complet : {whole_board:.1f} ms "
+                f"({per_square / whole_board:.1f}x)")
+
+if __name__ == "__main__":
+    main()
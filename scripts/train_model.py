@@ -8,6 +8,7 @@ from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping
 import logging
 from src.piece_classifier import PieceClassifier
+from src.preprocessing import preprocess_batch
 from sklearn.model_selection import train_test_split
 import tensorflow as tf
 from svglib.svglib import svg2rlg
@@ -60,20 +61,9 @@ def load_and_preprocess_data(data_dir: str):
                     # Convertit en RGB
                     img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
                 
-                # Redimensionne
+                # Redimensionne ; le prétraitement est appliqué au lot complet
                 img = cv2.resize(img, (100, 100))
                 
-                # Améliore le contraste
-                lab = cv2.cvtColor(img, cv2.COLOR_RGB2LAB)
-                l, a, b = cv2.split(lab)
-                clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-                cl = clahe.apply(l)
-                enhanced = cv2.merge((cl,a,b))
-                img = cv2.cvtColor(enhanced, cv2.COLOR_LAB2RGB)
-                
-                # Normalise
-                img = img.astype(np.float32) / 255.0
-                
                 images.append(img)
                 labels.append(i)
                 
@@ -81,8 +71,8 @@ def load_and_preprocess_data(data_dir: str):
                 logger.error(f"Erreur lors du chargement de {img_path}: {str(e)}")
                 continue
     
-    # Convertit en arrays numpy
-    images = np.array(images)
+    # Prétraitement identique à celui de l'inférence (CLAHE, flou, standardisation)
+    images = preprocess_batch(images)
     labels = np.array(labels)
     
     # Mélange les données
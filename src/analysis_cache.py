@@ -0,0 +1,118 @@
+import json
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+from typing import List, Optional
+
+import chess
+import chess.polyglot
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class AnalysisCache:
+    """
+    Cache des analyses de positions, indépendant de la profondeur demandée.
+
+    La clé est le hachage Zobrist (polyglot) de la position : pièces, trait,
+    roques et prise en passant, sans les compteurs de coups qui ne changent
+    pas l'analyse. Pour une position, chaque entrée mémorise la profondeur
+    et le nombre de variantes (multipv) de la recherche ; une demande est
+    servie par toute entrée au moins aussi profonde et avec au moins autant
+    de variantes, dont seules les premières variantes sont renvoyées. Une
+    entrée couverte par une nouvelle analyse plus complète est remplacée.
+
+    Les positions sont gardées dans un LRU de max_entries positions. Si
+    db_path est fourni, les analyses sont aussi écrites dans une base
+    SQLite, consultée en cas d'absence en mémoire : une position populaire
+    n'est analysée qu'une fois, même après un redémarrage.
+    """
+
+    def __init__(self, max_entries: int = 4096, db_path: Optional[str] = None):
+        """
+        Initialise le cache.
+
+        Args:
+            max_entries: Nombre maximal de positions en mémoire
+            db_path: Base SQLite de persistance (optionnelle)
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # Position -> liste de (profondeur, multipv, variantes)
+        self._entries: 'OrderedDict[str, list]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS analyses (key TEXT, depth INTEGER, multipv INTEGER, "
+                             "results TEXT, PRIMARY KEY (key, depth, multipv))")
+            self._db.commit()
+
+    @staticmethod
+    def key(board: chess.Board) -> str:
+        """Clé d'une position : hachage Zobrist polyglot sur 64 bits, en hexadécimal"""
+        return f"{chess.polyglot.zobrist_hash(board):016x}"
+
+    def get(self, board: chess.Board, depth: int, multipv: int) -> Optional[List[dict]]:
+        """
+        Cherche une analyse au moins aussi profonde et complète que demandé.
+
+        Args:
+            board: Position
+            depth: Profondeur minimale
+            multipv: Nombre de variantes demandées
+
+        Returns:
+            Les multipv premières variantes, None si aucune entrée ne convient
+        """
+        key = self.key(board)
+        with self._lock:
+            entries = self._entries.get(key)
+            if entries is None and self._db is not None:
+                rows = self._db.execute("SELECT depth, multipv, results FROM analyses WHERE key = ?", (key,)).fetchall()
+                for row_depth, row_multipv, results in rows:
+                    self._insert(key, row_depth, row_multipv, json.loads(results))
+                entries = self._entries.get(key)
+
+            for entry_depth, entry_multipv, results in entries or []:
+                # Une recherche qui a trouvé moins de coups que demandé (peu de coups légaux) reste complète
+                if entry_depth >= depth and (entry_multipv >= multipv or len(results) < entry_multipv):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return results[:multipv]
+            self.misses += 1
+            return None
+
+    def put(self, board: chess.Board, depth: int, multipv: int, results: List[dict]):
+        """Mémorise les variantes d'une analyse (dictionnaires sérialisables en JSON)"""
+        key = self.key(board)
+        with self._lock:
+            self._insert(key, depth, multipv, results)
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM analyses WHERE key = ? AND depth <= ? AND multipv <= ?",
+                                     (key, depth, multipv))
+                    self._db.execute("INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?)",
+                                     (key, depth, multipv, json.dumps(results)))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Erreur lors de l'écriture du cache des analyses : {str(e)}")
+
+    def metrics(self) -> dict:
+        """Compteurs du cache, pour /metrics"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {'positions': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                    'hit_rate': self.hits / total if total else 0.0, 'persistent': self._db is not None}
+
+    def _insert(self, key: str, depth: int, multipv: int, results: List[dict]):
+        # Les entrées couvertes par la nouvelle analyse sont inutiles
+        entries = [entry for entry in self._entries.get(key, []) if entry[0] > depth or entry[1] > multipv]
+        entries.append((depth, multipv, results))
+        self._entries[key] = entries
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
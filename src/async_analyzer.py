@@ -0,0 +1,280 @@
+import asyncio
+import inspect
+import logging
+from dataclasses import asdict
+from typing import Awaitable, Callable, List, Optional, Union
+
+import chess
+import chess.engine
+
+from .analysis_cache import AnalysisCache
+from .chess_analyzer import AnalysisResult, ChessAnalyzer, format_summary, to_analysis_results
+from .engine_pool import ENGINE_FAILURES
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fonction indiquant si le client HTTP s'est déconnecté (par exemple request.is_disconnected de Starlette)
+DisconnectCheck = Callable[[], Union[bool, Awaitable[bool]]]
+
+class AsyncChessAnalyzer:
+    """
+    Analyseur d'échecs asyncio, pour les serveurs web asynchrones.
+
+    Les moteurs sont des protocoles UCI lancés par chess.engine.popen_uci
+    et pilotés par la boucle d'évènements appelante : une seule boucle fait
+    avancer des dizaines d'analyses, sans thread par analyse ni par moteur
+    (contrairement à SimpleEngine). Les analyses attendent un moteur libre
+    dans une file ; une analyse est interrompue (commande stop) à
+    l'expiration de son délai, à l'annulation de la tâche, ou dès que
+    is_disconnected signale le départ du client. Un moteur dont le
+    processus tombe est remplacé en arrière-plan.
+
+    Toutes les méthodes doivent être appelées depuis la même boucle ; les
+    résultats sont les mêmes AnalysisResult que ceux de ChessAnalyzer.
+    """
+
+    RESPAWN_DELAY = 5.0  # Délai entre deux tentatives de relance d'un moteur
+    DISCONNECT_POLL_INTERVAL = 0.1  # Intervalle de vérification de la connexion du client, en secondes
+
+    def __init__(self, stockfish_path: Optional[str] = None, size: int = 8, threads: int = 1, hash_mb: int = 16,
+                 timeout: Optional[float] = 30.0, checkout_timeout: Optional[float] = 30.0,
+                 cache: Optional[AnalysisCache] = None,
+                 engine_factory: Optional[Callable[[], Awaitable[chess.engine.Protocol]]] = None):
+        """
+        Initialise l'analyseur ; les moteurs sont lancés par start.
+
+        Args:
+            stockfish_path: Chemin vers l'exécutable Stockfish (recherché automatiquement si None)
+            size: Nombre de processus moteurs
+            threads: Threads de recherche de chaque moteur (option UCI Threads)
+            hash_mb: Table de transposition de chaque moteur, en Mo (option UCI Hash)
+            timeout: Durée maximale d'une analyse, en secondes
+            checkout_timeout: Attente maximale d'un moteur libre, en secondes
+            cache: Cache des analyses, consulté avant toute recherche (optionnel)
+            engine_factory: Coroutine qui lance un moteur, à la place de stockfish_path
+        """
+        if engine_factory is None:
+            path = stockfish_path or ChessAnalyzer.find_stockfish()
+
+            async def engine_factory() -> chess.engine.Protocol:
+                _, engine = await chess.engine.popen_uci(path)
+                options = {name: value for name, value in (('Threads', threads), ('Hash', hash_mb))
+                           if name in engine.options}
+                if options:
+                    await engine.configure(options)
+                return engine
+
+        self.engine_factory = engine_factory
+        self.size = size
+        self.timeout = timeout
+        self.checkout_timeout = checkout_timeout
+        self.cache = cache
+        self._idle: Optional[asyncio.Queue] = None
+        self._engines: List[chess.engine.Protocol] = []
+        self._respawns: set = set()
+        self._closed = False
+        self.in_flight = 0
+        self.analyses = 0
+        self.timeouts = 0
+        self.cancellations = 0
+        self.failures = 0
+
+    async def start(self) -> 'AsyncChessAnalyzer':
+        """Lance les moteurs en parallèle ; ceux qui échouent sont relancés en arrière-plan"""
+        self._idle = asyncio.Queue()
+        engines = await asyncio.gather(*(self.engine_factory() for _ in range(self.size)), return_exceptions=True)
+        for engine in engines:
+            if isinstance(engine, BaseException):
+                logger.error(f"Erreur lors du lancement d'un moteur d'échecs : {str(engine)}")
+                self._respawn()
+            else:
+                self._engines.append(engine)
+                self._idle.put_nowait(engine)
+        logger.info(f"Moteurs asynchrones : {len(self._engines)}/{self.size} moteurs lancés")
+        return self
+
+    async def close(self):
+        """Arrête les relances et ferme tous les moteurs"""
+        self._closed = True
+        for task in list(self._respawns):
+            task.cancel()
+        await asyncio.gather(*(self._quit(engine) for engine in self._engines))
+        self._engines = []
+
+    async def analyze_position(self, fen: str, depth: int = 20, multipv: int = 3, timeout: Optional[float] = None,
+                               is_disconnected: Optional[DisconnectCheck] = None) -> List[AnalysisResult]:
+        """
+        Analyse une position d'échecs.
+
+        Args:
+            fen: Position en notation FEN
+            depth: Profondeur d'analyse
+            multipv: Nombre de variantes à calculer
+            timeout: Durée maximale de l'analyse (self.timeout si None)
+            is_disconnected: Fonction, éventuellement asynchrone, qui renvoie True
+                             quand le client est parti ; l'analyse est alors arrêtée
+
+        Returns:
+            Liste des meilleurs coups avec leurs évaluations ; vide en cas
+            d'erreur, de délai dépassé ou de déconnexion du client
+
+        Raises:
+            asyncio.CancelledError: Si la tâche appelante est annulée (le moteur est arrêté et rendu)
+        """
+        try:
+            board = chess.Board(fen)
+            if self.cache is not None:
+                cached = self.cache.get(board, depth, multipv)
+                if cached is not None:
+                    return [AnalysisResult(**result) for result in cached]
+            engine = await asyncio.wait_for(self._checkout(), self.checkout_timeout)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'analyse : {str(e) or type(e).__name__}")
+            return []
+
+        healthy = True
+        self.in_flight += 1
+        try:
+            search = asyncio.ensure_future(engine.analyse(board, chess.engine.Limit(depth=depth), multipv=multipv,
+                                                          info=chess.engine.INFO_ALL))
+            info = await self._wait(search, timeout if timeout is not None else self.timeout, is_disconnected)
+        except asyncio.TimeoutError:
+            # La recherche a été arrêtée ; le moteur reste utilisable
+            self.timeouts += 1
+            logger.error("Délai d'analyse dépassé")
+            return []
+        except ENGINE_FAILURES as e:
+            healthy = False
+            logger.error(f"Erreur lors de l'analyse : {str(e)}")
+            return []
+        except asyncio.CancelledError:
+            self.cancellations += 1
+            raise
+        except Exception as e:
+            logger.error(f"Erreur lors de l'analyse : {str(e)}")
+            return []
+        finally:
+            self.in_flight -= 1
+            self._release(engine, healthy)
+
+        if info is None:
+            self.cancellations += 1
+            logger.info("Client déconnecté, analyse interrompue")
+            return []
+
+        self.analyses += 1
+        results = to_analysis_results(board, info)
+        if self.cache is not None and results:
+            self.cache.put(board, depth, multipv, [asdict(result) for result in results])
+        return results
+
+    async def get_position_summary(self, fen: str, results: Optional[List[AnalysisResult]] = None,
+                                   is_disconnected: Optional[DisconnectCheck] = None) -> str:
+        """
+        Génère un résumé en langage naturel de la position.
+
+        Args:
+            fen: Position en notation FEN
+            results: Analyse déjà calculée, pour éviter une seconde recherche
+            is_disconnected: Voir analyze_position
+
+        Returns:
+            Description de la position
+        """
+        if results is None:
+            results = await self.analyze_position(fen, depth=18, multipv=1, is_disconnected=is_disconnected)
+        if not results:
+            return "Impossible d'analyser la position."
+        return format_summary(results[0])
+
+    def metrics(self) -> dict:
+        """Compteurs de l'analyseur"""
+        return {'size': self.size, 'alive': len(self._engines), 'idle': self._idle.qsize() if self._idle else 0,
+                'in_flight': self.in_flight, 'analyses': self.analyses, 'timeouts': self.timeouts,
+                'cancellations': self.cancellations, 'failures': self.failures}
+
+    async def _checkout(self) -> chess.engine.Protocol:
+        if self._idle is None:
+            raise RuntimeError("Analyseur non démarré (voir start)")
+        while True:
+            engine = await self._idle.get()
+            if engine in self._engines:
+                return engine
+
+    def _release(self, engine: chess.engine.Protocol, healthy: bool):
+        if self._closed:
+            return
+        if engine.returncode.done():
+            healthy = False
+        if healthy:
+            self._idle.put_nowait(engine)
+            return
+        self.failures += 1
+        self._engines.remove(engine)
+        asyncio.ensure_future(self._quit(engine))
+        self._respawn()
+        logger.warning("Moteur d'échecs défaillant fermé, il sera relancé")
+
+    def _respawn(self):
+        """Relance un moteur en arrière-plan, en réessayant toutes les RESPAWN_DELAY secondes"""
+        async def respawn():
+            while not self._closed:
+                try:
+                    engine = await self.engine_factory()
+                except Exception as e:
+                    logger.error(f"Erreur lors du lancement d'un moteur d'échecs : {str(e)}")
+                    await asyncio.sleep(self.RESPAWN_DELAY)
+                    continue
+                if self._closed:
+                    await self._quit(engine)
+                    return
+                self._engines.append(engine)
+                self._idle.put_nowait(engine)
+                return
+
+        task = asyncio.ensure_future(respawn())
+        self._respawns.add(task)
+        task.add_done_callback(self._respawns.discard)
+
+    @staticmethod
+    async def _quit(engine: chess.engine.Protocol):
+        try:
+            await asyncio.wait_for(engine.quit(), 5.0)
+        except Exception:
+            pass
+
+    async def _wait(self, search: asyncio.Future, timeout: Optional[float],
+                    is_disconnected: Optional[DisconnectCheck]) -> Optional[list]:
+        """
+        Attend la fin d'une recherche.
+
+        Returns:
+            Les informations du moteur, None si le client s'est déconnecté
+
+        Raises:
+            asyncio.TimeoutError: Si la recherche dépasse timeout
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        try:
+            while True:
+                wait = self.DISCONNECT_POLL_INTERVAL if is_disconnected is not None else None
+                if deadline is not None:
+                    remaining = max(deadline - loop.time(), 0)
+                    wait = remaining if wait is None else min(wait, remaining)
+                done, _ = await asyncio.wait({search}, timeout=wait)
+                if done:
+                    return search.result()
+                if deadline is not None and loop.time() >= deadline:
+                    raise asyncio.TimeoutError()
+                disconnected = is_disconnected()
+                if inspect.isawaitable(disconnected):
+                    disconnected = await disconnected
+                if disconnected:
+                    return None
+        finally:
+            if not search.done():
+                # L'annulation envoie stop au moteur ; la commande suivante attend son bestmove
+                search.cancel()
+                await asyncio.gather(search, return_exceptions=True)
@@ -0,0 +1,135 @@
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class DynamicBatcher:
+    """
+    Regroupe les lots de plusieurs requêtes concurrentes en un seul appel au modèle.
+
+    Chaque requête dépose son tenseur prétraité dans une file et reçoit un
+    Future. Un unique thread vide la file : il attend la première requête,
+    puis accumule les suivantes jusqu'à atteindre max_batch_size cases ou
+    jusqu'à ce que max_wait_ms se soient écoulées depuis l'arrivée de la
+    première. Le lot concaténé passe une seule fois dans le modèle et chaque
+    requête reçoit les lignes de probabilités qui lui correspondent.
+    """
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray],
+                 max_batch_size: int = 256, max_wait_ms: float = 5.0):
+        """
+        Initialise le regroupement dynamique.
+
+        Args:
+            predict_fn: Fonction appliquant le modèle à un lot (N, ...) et
+                        renvoyant une matrice (N, nombre de classes)
+            max_batch_size: Nombre maximal de cases par appel au modèle ; un lot
+                            plus grand qu'une seule requête n'est jamais découpé
+            max_wait_ms: Attente maximale d'autres requêtes après la première
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._pending: Optional[Tuple[np.ndarray, Future]] = None
+        self.batches = 0  # Appels au modèle
+        self.requests = 0  # Requêtes servies
+        self.items = 0  # Cases classifiées
+
+    def submit(self, batch: np.ndarray) -> Future:
+        """
+        Ajoute un lot à la file sans attendre le modèle.
+
+        Args:
+            batch: Tenseur prétraité (N, ...) d'une requête
+
+        Returns:
+            Future dont le résultat est la matrice (N, nombre de classes)
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((batch, future))
+        return future
+
+    def predict_proba(self, batch: np.ndarray, timeout: Optional[float] = None) -> np.ndarray:
+        """
+        Équivalent bloquant de submit, utilisable à la place de PieceClassifier.predict_proba.
+
+        Args:
+            batch: Tenseur prétraité (N, ...) d'une requête
+            timeout: Attente maximale du résultat, en secondes
+
+        Returns:
+            Matrice de probabilités (N, nombre de classes)
+        """
+        return self.submit(batch).result(timeout=timeout)
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='dynamic-batcher', daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[Tuple[np.ndarray, Future]]:
+        """Attend une première requête puis accumule les suivantes dans la limite de taille et de temps"""
+        if self._pending is not None:
+            first, self._pending = self._pending, None
+        else:
+            first = self._queue.get()
+        requests = [first]
+        size = len(first[0])
+        deadline = time.perf_counter() + self.max_wait_ms / 1000.0
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if size + len(item[0]) > self.max_batch_size:
+                # Servie en tête du lot suivant
+                self._pending = item
+                break
+            requests.append(item)
+            size += len(item[0])
+        return requests
+
+    def _run(self):
+        while True:
+            requests = self._collect()
+            # Une requête annulée par son appelant n'est pas calculée
+            requests = [(batch, future) for batch, future in requests if future.set_running_or_notify_cancel()]
+            if not requests:
+                continue
+
+            try:
+                batch = requests[0][0] if len(requests) == 1 else np.concatenate([b for b, _ in requests])
+                probabilities = np.asarray(self.predict_fn(batch))
+            except Exception as e:
+                logger.error(f"Erreur lors de l'inférence groupée : {str(e)}")
+                for _, future in requests:
+                    future.set_exception(e)
+                continue
+
+            # Compteurs à jour avant de réveiller les appelants
+            self.batches += 1
+            self.requests += len(requests)
+            self.items += len(batch)
+
+            offsets = np.cumsum([len(b) for b, _ in requests])[:-1]
+            for (_, future), result in zip(requests, np.split(probabilities, offsets)):
+                future.set_result(result)
+            logger.debug(f"Lot de {len(batch)} cases pour {len(requests)} requête(s)")
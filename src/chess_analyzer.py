@@ -3,8 +3,10 @@ import chess.engine
 import os
 import platform
 import logging
-from typing import Optional, Tuple, List
-from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple, List
+from dataclasses import asdict, dataclass, replace
+from .analysis_cache import AnalysisCache
+from .engine_pool import ENGINE_FAILURES, EnginePool
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,26 +18,105 @@ class AnalysisResult:
     pv: List[str]  # Ligne principale
     mate_in: Optional[int] = None  # Nombre de coups avant mat, si applicable
 
+@dataclass
+class AnalysisUpdate:
+    depth: int  # Profondeur atteinte
+    results: List[AnalysisResult]  # Variantes à cette profondeur
+    nodes: Optional[int] = None  # Nœuds explorés depuis le début de la recherche
+    time_ms: Optional[float] = None  # Durée de la recherche, en millisecondes
+    final: bool = False  # Dernier résultat de la recherche
+
+def to_analysis_results(board: chess.Board, infos: List[dict]) -> List[AnalysisResult]:
+    """Convertit les informations du moteur en variantes"""
+    results = []
+    for pv in infos:
+        # Calcule le score en centipawns
+        if 'score' in pv:
+            score = pv['score'].relative.score()
+            mate = pv['score'].relative.mate()
+        else:
+            score = None
+            mate = None
+        
+        # Extrait la ligne principale
+        if 'pv' in pv:
+            moves = [board.san(move) for move in pv['pv']]
+        else:
+            moves = []
+        
+        # Extrait le meilleur coup
+        if moves:
+            best_move = moves[0]
+        else:
+            best_move = ""
+        
+        results.append(AnalysisResult(
+            score=score if score is not None else 0.0,
+            best_move=best_move,
+            pv=moves,
+            mate_in=mate
+        ))
+    return results
+
+def format_summary(result: AnalysisResult) -> str:
+    """Résumé en langage naturel de la meilleure variante d'une analyse"""
+    # Détermine l'avantage
+    if result.mate_in is not None:
+        if result.mate_in > 0:
+            advantage = f"Mat en {result.mate_in} coup{'s' if result.mate_in > 1 else ''}"
+        else:
+            advantage = f"Mat en {-result.mate_in} coup{'s' if -result.mate_in > 1 else ''}"
+    else:
+        score = result.score / 100.0  # Convertit en pions
+        if abs(score) < 0.5:
+            advantage = "Position égale"
+        else:
+            color = "blancs" if score > 0 else "noirs"
+            advantage = f"Avantage {color} de {abs(score):.1f} pions"
+    
+    # Suggère le meilleur coup
+    suggestion = f"Meilleur coup : {result.best_move}"
+    
+    # Combine le résumé
+    return f"{advantage}. {suggestion}."
+
 class ChessAnalyzer:
-    def __init__(self, stockfish_path: Optional[str] = None):
+    # Limites adaptatives (voir adaptive_limit) : (nombre maximal de pièces, profondeur, temps maximal en s)
+    ADAPTIVE_LIMITS = ((7, 32, 1.0), (16, 24, 2.0), (32, 20, 3.0))
+    
+    def __init__(self, stockfish_path: Optional[str] = None, pool_size: Optional[int] = None,
+                 threads: int = 1, hash_mb: int = 16, checkout_timeout: Optional[float] = 30.0,
+                 pool: Optional[EnginePool] = None, cache: Optional[AnalysisCache] = None):
         """
-        Initialise l'analyseur d'échecs avec Stockfish.
+        Initialise l'analyseur d'échecs avec un pool de processus Stockfish.
+        
+        Les analyses concurrentes s'exécutent sur des moteurs distincts ; un
+        moteur qui plante est relancé par le pool (voir EnginePool).
         
         Args:
             stockfish_path: Chemin vers l'exécutable Stockfish.
                           Si None, tentera de trouver Stockfish automatiquement.
+            pool_size: Nombre de moteurs ; par défaut, un par groupe de threads cœurs
+            threads: Threads de recherche de chaque moteur (option UCI Threads)
+            hash_mb: Table de transposition de chaque moteur, en Mo (option UCI Hash)
+            checkout_timeout: Attente maximale d'un moteur libre, en secondes
+            pool: Pool déjà construit, à la place des paramètres précédents
+            cache: Cache des analyses, consulté avant toute recherche (optionnel)
         """
-        if stockfish_path is None:
-            stockfish_path = self._find_stockfish()
-        
-        try:
-            self.engine = chess.engine.SimpleEngine.popen_uci(stockfish_path)
-            logger.info(f"Moteur Stockfish initialisé : {stockfish_path}")
-        except Exception as e:
-            logger.error(f"Erreur lors de l'initialisation de Stockfish : {str(e)}")
-            self.engine = None
+        if pool is None:
+            if stockfish_path is None:
+                stockfish_path = self.find_stockfish()
+            if pool_size is None:
+                pool_size = max(1, (os.cpu_count() or 1) // threads)
+            pool = EnginePool(EnginePool.uci_factory(stockfish_path, threads, hash_mb), size=pool_size)
+            if pool.alive:
+                logger.info(f"Moteurs Stockfish initialisés : {stockfish_path} ({pool.alive} processus)")
+        self.pool = pool
+        self.checkout_timeout = checkout_timeout
+        self.cache = cache
     
-    def _find_stockfish(self) -> str:
+    @staticmethod
+    def find_stockfish() -> str:
         """Trouve le chemin de Stockfish selon le système d'exploitation"""
         system = platform.system().lower()
         
@@ -81,6 +162,10 @@ class ChessAnalyzer:
         """
         Analyse une position d'échecs.
         
+        Si un cache est configuré, une analyse déjà faite de la même position,
+        au moins aussi profonde et avec au moins autant de variantes, est
+        renvoyée sans solliciter de moteur.
+        
         Args:
             fen: Position en notation FEN
             depth: Profondeur d'analyse
@@ -89,53 +174,31 @@ class ChessAnalyzer:
         Returns:
             Liste des meilleurs coups avec leurs évaluations
         """
-        if self.engine is None:
-            logger.error("Moteur d'échecs non initialisé")
-            return []
-        
         try:
             board = chess.Board(fen)
             
+            if self.cache is not None:
+                cached = self.cache.get(board, depth, multipv)
+                if cached is not None:
+                    return [AnalysisResult(**result) for result in cached]
+            
             # Configure l'analyse
             limit = chess.engine.Limit(depth=depth)
             
-            # Lance l'analyse
-            info = self.engine.analyse(
-                board,
-                limit,
-                multipv=multipv,
-                info=chess.engine.INFO_ALL
-            )
+            # Lance l'analyse sur un moteur libre du pool
+            with self.pool.engine(timeout=self.checkout_timeout) as engine:
+                info = engine.analyse(
+                    board,
+                    limit,
+                    multipv=multipv,
+                    info=chess.engine.INFO_ALL
+                )
             
             # Traite les résultats
-            results = []
-            for pv in info:
-                # Calcule le score en centipawns
-                if 'score' in pv:
-                    score = pv['score'].relative.score()
-                    mate = pv['score'].relative.mate()
-                else:
-                    score = None
-                    mate = None
-                
-                # Extrait la ligne principale
-                if 'pv' in pv:
-                    moves = [board.san(move) for move in pv['pv']]
-                else:
-                    moves = []
-                
-                # Extrait le meilleur coup
-                if moves:
-                    best_move = moves[0]
-                else:
-                    best_move = ""
-                
-                results.append(AnalysisResult(
-                    score=score if score is not None else 0.0,
-                    best_move=best_move,
-                    pv=moves,
-                    mate_in=mate
-                ))
+            results = to_analysis_results(board, info)
+            
+            if self.cache is not None and results:
+                self.cache.put(board, depth, multipv, [asdict(result) for result in results])
             
             return results
             
@@ -143,52 +206,127 @@ class ChessAnalyzer:
             logger.error(f"Erreur lors de l'analyse : {str(e)}")
             return []
     
-    def get_position_summary(self, fen: str) -> str:
+    def adaptive_limit(self, board: chess.Board) -> chess.engine.Limit:
+        """
+        Limite de recherche selon le nombre de pièces sur l'échiquier.
+        
+        Avec peu de pièces, l'arbre est étroit : la recherche va plus loin
+        pour le même temps. Avec beaucoup de pièces, une limite de temps
+        borne l'attente avant le résultat final.
+        """
+        pieces = chess.popcount(board.occupied)
+        for max_pieces, depth, time_limit in self.ADAPTIVE_LIMITS:
+            if pieces <= max_pieces:
+                return chess.engine.Limit(depth=depth, time=time_limit)
+        _, depth, time_limit = self.ADAPTIVE_LIMITS[-1]
+        return chess.engine.Limit(depth=depth, time=time_limit)
+    
+    def analyze_stream(self, fen: str, depth: Optional[int] = None, movetime: Optional[float] = None,
+                       nodes: Optional[int] = None, multipv: int = 3) -> Iterator[AnalysisUpdate]:
+        """
+        Analyse progressive d'une position.
+        
+        Un résultat est produit à chaque profondeur atteinte par le moteur,
+        dès la profondeur 1 : un premier meilleur coup est disponible en
+        quelques millisecondes, puis affiné. Le dernier résultat a final=True
+        et est mémorisé dans le cache. Fermer le générateur arrête la
+        recherche et rend le moteur au pool.
+        
+        Args:
+            fen: Position en notation FEN
+            depth: Profondeur maximale
+            movetime: Temps maximal de recherche, en secondes
+            nodes: Nombre maximal de nœuds
+            multipv: Nombre de variantes à calculer
+            
+        Returns:
+            Générateur de résultats intermédiaires ; sans limite donnée, la
+            limite est choisie par adaptive_limit. Rien n'est produit en cas
+            d'erreur.
+        """
+        try:
+            board = chess.Board(fen)
+            if depth is None and movetime is None and nodes is None:
+                limit = self.adaptive_limit(board)
+            else:
+                limit = chess.engine.Limit(depth=depth, time=movetime, nodes=nodes)
+            
+            # Une analyse déjà faite à cette profondeur est renvoyée directement
+            if self.cache is not None and limit.depth is not None:
+                cached = self.cache.get(board, limit.depth, multipv)
+                if cached is not None:
+                    yield AnalysisUpdate(depth=limit.depth, results=[AnalysisResult(**result) for result in cached],
+                                         final=True)
+                    return
+            
+            engine = self.pool.checkout(self.checkout_timeout)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'analyse : {str(e)}")
+            return
+        
+        lines = min(multipv, board.legal_moves.count())
+        update = None
+        healthy = True
+        try:
+            with engine.analysis(board, limit, multipv=multipv, info=chess.engine.INFO_ALL) as analysis:
+                for info in analysis:
+                    # Une profondeur est complète quand sa dernière variante arrive
+                    if 'pv' not in info or info.get('multipv', 1) < lines:
+                        continue
+                    if update is not None and info.get('depth', 0) <= update.depth:
+                        continue
+                    update = AnalysisUpdate(
+                        depth=info.get('depth', 0),
+                        results=to_analysis_results(board, analysis.multipv),
+                        nodes=info.get('nodes'),
+                        time_ms=info['time'] * 1000 if 'time' in info else None
+                    )
+                    yield update
+        except ENGINE_FAILURES as e:
+            healthy = False
+            logger.error(f"Erreur lors de l'analyse : {str(e)}")
+            return
+        except Exception as e:
+            logger.error(f"Erreur lors de l'analyse : {str(e)}")
+            return
+        finally:
+            self.pool.release(engine, healthy)
+        
+        # Mat ou pat : aucune variante
+        update = replace(update, final=True) if update is not None else AnalysisUpdate(depth=0, results=[], final=True)
+        if self.cache is not None and update.results:
+            self.cache.put(board, update.depth, multipv, [asdict(result) for result in update.results])
+        yield update
+    
+    def get_position_summary(self, fen: str, results: Optional[List[AnalysisResult]] = None) -> str:
         """
         Génère un résumé en langage naturel de la position.
         
         Args:
             fen: Position en notation FEN
+            results: Analyse déjà calculée (analyze_position), pour éviter une
+                     seconde recherche ; si None, la position est analysée
             
         Returns:
             Description de la position
         """
         try:
-            # Analyse la position
-            results = self.analyze_position(fen, depth=18, multipv=1)
+            # Analyse la position si nécessaire
+            if results is None:
+                results = self.analyze_position(fen, depth=18, multipv=1)
             if not results:
                 return "Impossible d'analyser la position."
             
-            result = results[0]
-            
-            # Détermine l'avantage
-            if result.mate_in is not None:
-                if result.mate_in > 0:
-                    advantage = f"Mat en {result.mate_in} coup{'s' if result.mate_in > 1 else ''}"
-                else:
-                    advantage = f"Mat en {-result.mate_in} coup{'s' if -result.mate_in > 1 else ''}"
-            else:
-                score = result.score / 100.0  # Convertit en pions
-                if abs(score) < 0.5:
-                    advantage = "Position égale"
-                else:
-                    color = "blancs" if score > 0 else "noirs"
-                    advantage = f"Avantage {color} de {abs(score):.1f} pions"
-            
-            # Suggère le meilleur coup
-            suggestion = f"Meilleur coup : {result.best_move}"
-            
-            # Combine le résumé
-            return f"{advantage}. {suggestion}."
+            return format_summary(results[0])
             
         except Exception as e:
             logger.error(f"Erreur lors de la génération du résumé : {str(e)}")
             return "Impossible de générer un résumé de la position."
     
     def __del__(self):
-        """Ferme proprement le moteur"""
-        if hasattr(self, 'engine') and self.engine:
+        """Ferme proprement les moteurs"""
+        if hasattr(self, 'pool'):
             try:
-                self.engine.quit()
+                self.pool.close()
             except:
                 pass
@@ -1,24 +1,316 @@
 import cv2
 import numpy as np
-from PIL import Image
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from .image_processor import ImageProcessor, ImageSource, DecodedImage
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@dataclass
+class StageTiming:
+    name: str  # Nom de l'étape de détection
+    elapsed_ms: float  # Durée effective de l'étape
+    budget_ms: float  # Budget alloué à l'étape
+    success: bool  # L'étape a-t-elle trouvé l'échiquier
+    skipped: bool = False  # Étape non lancée faute de budget global suffisant
+
+    @property
+    def over_budget(self) -> bool:
+        return self.elapsed_ms > self.budget_ms
+
+@dataclass
+class DetectionResult:
+    success: bool
+    corners: Optional[np.ndarray] = None  # Coins extérieurs (haut-gauche, haut-droite, bas-droite, bas-gauche)
+    stage: Optional[str] = None  # Étape ayant trouvé l'échiquier
+    timings: List[StageTiming] = field(default_factory=list)
+
+class _Deadline:
+    """Échéance d'une étape, vérifiée entre ses sous-étapes"""
+
+    def __init__(self, budget_ms: float):
+        self.budget_ms = budget_ms
+        self.end = time.perf_counter() + budget_ms / 1000.0
+
+    @property
+    def expired(self) -> bool:
+        return time.perf_counter() > self.end
 
 class ChessboardDetector:
-    """Classe pour la détection et l'analyse d'un échiquier dans une image"""
-    
-    def __init__(self):
-        pass
-    
+    """Classe pour la détection et l'analyse d'un échiquier dans une image
+
+    La détection est une cascade de détecteurs, du moins coûteux au plus
+    coûteux : capture d'écran alignée sur les axes, ajustement d'une grille
+    de lignes (Hough), puis motif des coins intérieurs. Chaque étape dispose
+    d'un budget de temps, vérifié entre ses sous-étapes, et borné par ce qui
+    reste du budget global : une étape qui n'a plus MIN_STAGE_MS devant elle
+    est sautée, et l'étape des coins, qui ne peut pas être interrompue,
+    cherche sur un niveau de pyramide plus grossier quand son budget est
+    entamé. La cascade s'arrête à la première étape qui réussit et rapporte
+    la durée de chacune.
+    """
+
+    STAGES = ('screenshot', 'hough', 'corners')
+    DEFAULT_BUDGETS_MS = {
+        'screenshot': 30.0,
+        'hough': 150.0,
+        'corners': 500.0,
+    }
+    DEFAULT_MAX_TOTAL_MS = 700.0  # Budget global de la cascade
+    MIN_STAGE_MS = 5.0  # En dessous, l'étape n'est pas lancée
+    WORKING_MAX_SIDE = 1024  # Plus grand côté de l'image réduite utilisée par les premières étapes
+    CORNERS_MIN_SIDE = 256  # Plus grand côté du niveau le plus grossier de l'étape des coins
+    GRID_CANDIDATES = 4  # Grilles candidates essayées par famille de droites
+    MAX_SPACING_RATIO = 1.5  # Écart maximal entre les pas des grilles horizontale et verticale
+    CHECK_CELL_SIZE = 16  # Côté d'une case de l'échiquier redressé servant à vérifier l'alternance
+    CHECK_MIN_CONTRAST = 8  # Écart minimal de niveau de gris entre deux cases voisines
+    CHECK_MIN_PAIRS = 5  # Paires voisines alternées exigées sur 7, dans chaque rangée et chaque colonne
+
+    def __init__(self, processor: Optional[ImageProcessor] = None,
+                 budgets_ms: Optional[Dict[str, float]] = None,
+                 max_total_ms: Optional[float] = DEFAULT_MAX_TOTAL_MS):
+        """
+        Initialise la cascade de détection.
+
+        Args:
+            processor: Processeur d'images utilisé par l'étape des coins
+            budgets_ms: Budgets par étape, en remplacement des valeurs par défaut
+            max_total_ms: Budget global, partagé par les étapes (None = illimité)
+        """
+        self.processor = processor or ImageProcessor()
+        self.budgets_ms = dict(self.DEFAULT_BUDGETS_MS)
+        if budgets_ms:
+            self.budgets_ms.update(budgets_ms)
+        self.max_total_ms = max_total_ms
+
     def validate_image_format(self, image_path):
         """Valide le format de l'image
-        
+
+        Seuls la signature et l'en-tête de l'image sont lus (voir
+        ImageProcessor.sniff_image) : rien n'est décodé.
+
         Args:
-            image_path (str): Chemin vers l'image à valider
-            
+            image_path (str | bytes | file): Chemin, contenu ou flux de l'image à valider
+
         Returns:
             bool: True si le format est valide, False sinon
         """
-        try:
-            with Image.open(image_path) as img:
-                return img.format.lower() in ['jpeg', 'jpg', 'png']
-        except Exception:
-            return False
+        is_valid, _ = ImageProcessor.sniff_image(image_path)
+        return is_valid
+
+    def detect(self, image: ImageSource, debug_prefix: Optional[str] = None) -> DetectionResult:
+        """
+        Détecte l'échiquier en essayant les étapes de la cascade dans l'ordre.
+
+        Args:
+            image: Image à analyser (chemin, contenu brut, tableau ou DecodedImage)
+            debug_prefix: Préfixe des images de debug de l'étape des coins
+
+        Returns:
+            DetectionResult avec les coins trouvés et la durée de chaque étape
+        """
+        decoded = self.processor.load_image(image)
+        if decoded is None:
+            return DetectionResult(success=False)
+
+        stages: Dict[str, Callable[[DecodedImage, _Deadline], Optional[np.ndarray]]] = {
+            'screenshot': self._detect_screenshot,
+            'hough': self._detect_hough_grid,
+            'corners': lambda img, deadline: self._detect_corner_pattern(img, debug_prefix, deadline),
+        }
+
+        result = DetectionResult(success=False)
+        start = time.perf_counter()
+        for name in self.STAGES:
+            budget = self.budgets_ms[name]
+            if self.max_total_ms is not None:
+                budget = min(budget, self.max_total_ms - (time.perf_counter() - start) * 1000)
+            if budget < self.MIN_STAGE_MS:
+                result.timings.append(StageTiming(name, 0.0, max(budget, 0.0), False, skipped=True))
+                continue
+
+            stage_start = time.perf_counter()
+            try:
+                corners = stages[name](decoded, _Deadline(budget))
+            except Exception as e:
+                logger.error(f"Erreur lors de l'étape de détection {name} : {str(e)}")
+                corners = None
+            timing = StageTiming(name, (time.perf_counter() - stage_start) * 1000, budget, corners is not None)
+            result.timings.append(timing)
+
+            if timing.over_budget:
+                logger.warning(f"Étape {name} hors budget : {timing.elapsed_ms:.1f} ms > {budget:.0f} ms")
+            if corners is not None:
+                result.success = True
+                result.corners = corners
+                result.stage = name
+                break
+
+        summary = ', '.join(
+            f"{t.name}={'sautée' if t.skipped else f'{t.elapsed_ms:.1f}ms'}" for t in result.timings)
+        logger.info(f"Détection de l'échiquier ({result.stage or 'échec'}) : {summary}")
+        return result
+
+    def _working_image(self, decoded: DecodedImage) -> Tuple[np.ndarray, float]:
+        """Renvoie l'image en niveaux de gris réduite et le facteur pour revenir à la pleine résolution"""
+        gray = decoded.gray
+        scale = 1.0
+        while max(gray.shape[:2]) > self.WORKING_MAX_SIDE:
+            gray = cv2.pyrDown(gray)
+            scale *= 2.0
+        return gray, scale
+
+    @staticmethod
+    def _to_full_resolution(corners: np.ndarray, scale: float) -> np.ndarray:
+        return ((corners + 0.5) * scale - 0.5).astype(np.float32)
+
+    def _detect_screenshot(self, decoded: DecodedImage, deadline: _Deadline) -> Optional[np.ndarray]:
+        """Cherche un échiquier numérique, carré et aligné sur les axes (profils de projection, sur l'image réduite)"""
+        success, corners = self.processor.locate_screenshot_board(decoded, max_side=self.WORKING_MAX_SIDE)
+        return corners if success else None
+
+    def _detect_hough_grid(self, decoded: DecodedImage, deadline: _Deadline) -> Optional[np.ndarray]:
+        """Ajuste une grille de 9 x 9 lignes régulièrement espacées sur les droites de Hough, puis la vérifie"""
+        gray, scale = self._working_image(decoded)
+        edges = cv2.Canny(cv2.GaussianBlur(gray, (5, 5), 0), 50, 150)
+        threshold = int(0.2 * min(gray.shape[:2]))
+        lines = cv2.HoughLines(edges, 1, np.pi / 180, threshold)
+        if lines is None or deadline.expired:
+            return None
+
+        # Sépare les droites en deux familles : proches de l'horizontale (theta ~ pi/2,
+        # représentation d'OpenCV) et de la verticale (theta ramené dans ]-pi/2, pi/2])
+        rho, theta = lines[:, 0, 0], lines[:, 0, 1]
+        tolerance = np.deg2rad(25)
+        horizontal = np.abs(theta - np.pi / 2) < tolerance
+        flipped = theta > np.pi / 2
+        rho_v = np.where(flipped, -rho, rho)
+        theta_v = np.where(flipped, theta - np.pi, theta)
+        vertical = np.abs(theta_v) < tolerance
+        families = ((rho[horizontal], theta[horizontal]), (rho_v[vertical], theta_v[vertical]))
+
+        size = min(gray.shape[:2])
+        horizontal_grids = self._fit_regular_lines(*families[0], size)
+        vertical_grids = self._fit_regular_lines(*families[1], size)
+
+        # Des bords d'interface, de cadre ou de pièces forment aussi des droites
+        # régulières : une grille n'est retenue que si ses deux pas concordent
+        # et que ses cases alternent comme celles d'un échiquier
+        for top, bottom in horizontal_grids:
+            for left, right in vertical_grids:
+                if deadline.expired:
+                    return None
+                spacings = sorted((abs(bottom[0] - top[0]), abs(right[0] - left[0])))
+                if spacings[1] > self.MAX_SPACING_RATIO * spacings[0]:
+                    continue
+                corners = np.array([
+                    self._intersect(top, left), self._intersect(top, right),
+                    self._intersect(bottom, right), self._intersect(bottom, left),
+                ], dtype=np.float32)
+                if np.all(np.isfinite(corners)) and self._is_checkerboard(gray, corners):
+                    return self._to_full_resolution(corners, scale)
+        return None
+
+    def _is_checkerboard(self, gray: np.ndarray, corners: np.ndarray) -> bool:
+        """
+        Vérifie que la grille délimite bien un échiquier.
+
+        L'échiquier est redressé, puis chaque case est résumée par la médiane
+        de ses quatre coins, rarement couverts par une pièce. Dans chaque
+        rangée et chaque colonne, au moins CHECK_MIN_PAIRS des 7 paires de
+        cases voisines doivent différer d'au moins CHECK_MIN_CONTRAST, dans
+        le sens de l'alternance (case claire, case foncée) du reste de
+        l'échiquier.
+        """
+        cell = self.CHECK_CELL_SIZE
+        side = 8 * cell
+        target = np.float32([[0, 0], [side, 0], [side, side], [0, side]])
+        board = cv2.warpPerspective(gray, cv2.getPerspectiveTransform(corners, target), (side, side))
+
+        offsets = np.minimum(np.arange(cell), np.arange(cell)[::-1])
+        near_edge = (offsets >= 1) & (offsets < 4)
+        cells = board.reshape(8, cell, 8, cell).swapaxes(1, 2)[:, :, near_edge][:, :, :, near_edge]
+        levels = np.median(cells.reshape(8, 8, -1), axis=2)
+
+        # Écarts entre voisines, signés selon la couleur attendue de la première case
+        parity = np.where(np.add.outer(np.arange(8), np.arange(8)) % 2 == 0, 1.0, -1.0)
+        across = (levels[:, :-1] - levels[:, 1:]) * parity[:, :-1]
+        down = (levels[:-1, :] - levels[1:, :]) * parity[:-1, :]
+        phase = 1.0 if np.median(np.concatenate([across.ravel(), down.ravel()])) >= 0 else -1.0
+        rows_ok = np.sum(across * phase >= self.CHECK_MIN_CONTRAST, axis=1) >= self.CHECK_MIN_PAIRS
+        columns_ok = np.sum(down * phase >= self.CHECK_MIN_CONTRAST, axis=0) >= self.CHECK_MIN_PAIRS
+        return bool(np.all(rows_ok) and np.all(columns_ok))
+
+    @classmethod
+    def _fit_regular_lines(cls, rho: np.ndarray, theta: np.ndarray, image_size: int) -> List[Tuple[Tuple[float, float], Tuple[float, float]]]:
+        """
+        Cherche 9 droites presque équidistantes dans une famille de droites.
+
+        Returns:
+            Les deux droites extrêmes (rho, theta) des GRID_CANDIDATES
+            meilleures grilles, la plus complète puis la plus large d'abord
+        """
+        if len(rho) < 7:
+            return []
+
+        # Regroupe les droites quasi confondues
+        order = np.argsort(rho)
+        rho, theta = rho[order], theta[order]
+        merge_distance = image_size / 100
+        clusters = [[0]]
+        for i in range(1, len(rho)):
+            if rho[i] - rho[clusters[-1][-1]] < merge_distance:
+                clusters[-1].append(i)
+            else:
+                clusters.append([i])
+        rho = np.array([rho[c].mean() for c in clusters])
+        theta = np.array([theta[c].mean() for c in clusters])
+
+        # Cherche les grilles dont au moins 7 des 9 droites sont présentes
+        candidates = []
+        for i in range(len(rho)):
+            for j in range(len(rho) - 1, i, -1):
+                spacing = (rho[j] - rho[i]) / 8
+                if spacing < image_size / 40:
+                    break
+                expected = rho[i] + spacing * np.arange(9)
+                distance = np.min(np.abs(expected[:, None] - rho[None, :]), axis=1)
+                key = (int(np.sum(distance < 0.2 * spacing)), rho[j] - rho[i])
+                if key[0] >= 7:
+                    candidates.append((key, i, j))
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        return [((rho[i], theta[i]), (rho[j], theta[j])) for _, i, j in candidates[:cls.GRID_CANDIDATES]]
+
+    @staticmethod
+    def _intersect(line1: Tuple[float, float], line2: Tuple[float, float]) -> np.ndarray:
+        """Intersection de deux droites en coordonnées polaires (rho, theta)"""
+        (r1, t1), (r2, t2) = line1, line2
+        a = np.array([[np.cos(t1), np.sin(t1)], [np.cos(t2), np.sin(t2)]])
+        if abs(np.linalg.det(a)) < 1e-6:
+            return np.array([np.nan, np.nan])
+        return np.linalg.solve(a, np.array([r1, r2]))
+
+    def _corner_search_side(self, deadline: _Deadline) -> Optional[int]:
+        """
+        Plus grand côté du niveau de pyramide de l'étape des coins.
+
+        Le coût de findChessboardCorners suit le nombre de pixels : avec une
+        fraction f du budget nominal, le côté est réduit d'un facteur racine
+        de f, sans descendre sous CORNERS_MIN_SIDE. None garde le niveau
+        habituel (voir ImageProcessor.find_inner_corners).
+        """
+        nominal_ms = self.budgets_ms['corners']
+        if deadline.budget_ms >= nominal_ms:
+            return None
+        side = int(self.processor.PYRAMID_MAX_SIDE * np.sqrt(deadline.budget_ms / nominal_ms))
+        return max(self.CORNERS_MIN_SIDE, side)
+
+    def _detect_corner_pattern(self, decoded: DecodedImage, debug_prefix: Optional[str],
+                               deadline: _Deadline) -> Optional[np.ndarray]:
+        """Détecte le motif des 7x7 coins intérieurs (l'étape la plus coûteuse)"""
+        success, corners = self.processor.detect_chessboard(decoded, debug_prefix=debug_prefix,
+                                                            max_side=self._corner_search_side(deadline))
+        return corners if success else None
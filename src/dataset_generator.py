@@ -3,7 +3,11 @@ import cv2
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 import random
-from typing import Tuple, Optional
+import chess
+import chess.svg
+from typing import Dict, List, Tuple, Optional
+from .piece_classifier import PieceClassifier
+from .preprocessing import BOARD_INPUT_SIZE
 
 class DatasetGenerator:
     # Mapping des pièces aux caractères ASCII
@@ -117,3 +121,155 @@ class DatasetGenerator:
                     print(f"  {i + 1}/{samples_per_piece} images générées")
         
         print("Génération du dataset terminée !")
+
+
+class BoardDatasetGenerator:
+    """
+    Génère des échiquiers complets à partir de positions aléatoires, pour le
+    modèle d'échiquier (voir ChessModelTrainer.create_board_model).
+
+    Chaque position est rendue soit par chess.svg (converti par cairosvg,
+    s'il est installé), soit en incrustant sur un damier les sprites
+    détourés (PNG avec transparence) de data/pieces. Les étiquettes sont une
+    grille 8x8 d'indices de PieceClassifier.PIECES, la première ligne étant
+    la 8e rangée (en haut de l'image, les blancs en bas).
+    """
+    
+    # Couleurs (claire, foncée) des cases des thèmes courants
+    SQUARE_COLORS = [
+        ((240, 217, 181), (181, 136, 99)),  # Bois (lichess)
+        ((238, 238, 210), (118, 150, 86)),  # Vert (chess.com)
+        ((222, 227, 230), (140, 162, 173)),  # Bleu
+        ((255, 255, 255), (170, 170, 170)),  # Gris
+    ]
+    DENSITY_RANGE = (0.05, 0.5)  # Proportion des cases occupées par une pièce, hors rois
+    
+    def __init__(self, sprites_dir: str = 'data/pieces', size: int = BOARD_INPUT_SIZE, seed: Optional[int] = None):
+        """
+        Initialise le générateur.
+        
+        Args:
+            sprites_dir: Répertoire des pièces, un dossier par classe
+            size: Côté des échiquiers générés, en pixels (multiple de 8)
+            seed: Graine du générateur aléatoire
+        """
+        self.size = size
+        self.rng = np.random.RandomState(seed)
+        self.classes = list(PieceClassifier.PIECES.values())
+        self.sprites = self._load_sprites(sprites_dir, size // 8)
+        try:
+            import cairosvg  # noqa: F401
+            self.svg_available = True
+        except ImportError:
+            self.svg_available = False
+        if not self.sprites and not self.svg_available:
+            raise RuntimeError(f"Aucun moteur de rendu : ni sprites détourés dans {sprites_dir}, ni cairosvg")
+    
+    @staticmethod
+    def _load_sprites(sprites_dir: str, tile: int) -> Dict[str, List[np.ndarray]]:
+        """Sprites RGBA redimensionnés à la taille d'une case, par pièce (les images sans transparence sont ignorées)"""
+        sprites: Dict[str, List[np.ndarray]] = {}
+        if not os.path.isdir(sprites_dir):
+            return sprites
+        for piece in sorted(os.listdir(sprites_dir)):
+            piece_dir = os.path.join(sprites_dir, piece)
+            if piece == 'empty' or not os.path.isdir(piece_dir):
+                continue
+            for img_name in sorted(os.listdir(piece_dir)):
+                img = cv2.imread(os.path.join(piece_dir, img_name), cv2.IMREAD_UNCHANGED)
+                if img is None or img.ndim != 3 or img.shape[2] != 4:
+                    continue
+                img = cv2.resize(cv2.cvtColor(img, cv2.COLOR_BGRA2RGBA), (tile, tile), interpolation=cv2.INTER_AREA)
+                sprites.setdefault(piece, []).append(img)
+        # Le rendu par sprites exige toutes les pièces
+        if any(piece not in sprites for piece in 'KQRBNP'):
+            return {}
+        return sprites
+    
+    def random_position(self) -> chess.Board:
+        """Position aléatoire (pas forcément légale) : un roi de chaque couleur et des pièces au hasard"""
+        board = chess.Board(None)
+        squares = self.rng.permutation(64)
+        board.set_piece_at(int(squares[0]), chess.Piece(chess.KING, chess.WHITE))
+        board.set_piece_at(int(squares[1]), chess.Piece(chess.KING, chess.BLACK))
+        count = int(self.rng.uniform(*self.DENSITY_RANGE) * 62)
+        for square in squares[2:2 + count]:
+            piece_type = int(self.rng.choice([chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN],
+                                             p=[0.5, 0.125, 0.125, 0.15, 0.1]))
+            # Pas de pion sur la première ni la dernière rangée
+            if piece_type == chess.PAWN and chess.square_rank(int(square)) in (0, 7):
+                piece_type = chess.KNIGHT
+            board.set_piece_at(int(square), chess.Piece(piece_type, bool(self.rng.rand() < 0.5)))
+        return board
+    
+    def labels(self, board: chess.Board) -> np.ndarray:
+        """Grille (8, 8) des indices de classe, la première ligne étant la 8e rangée"""
+        labels = np.full((8, 8), self.classes.index('empty'), dtype=np.int32)
+        for square, piece in board.piece_map().items():
+            labels[7 - chess.square_rank(square), chess.square_file(square)] = self.classes.index(piece.symbol().upper())
+        return labels
+    
+    def render_svg(self, board: chess.Board, colors: Tuple[Tuple[int, int, int], Tuple[int, int, int]]) -> np.ndarray:
+        """Rendu chess.svg converti par cairosvg, image uint8 RGB (size, size, 3)"""
+        import cairosvg
+        light, dark = ('#%02x%02x%02x' % color for color in colors)
+        svg = chess.svg.board(board, size=self.size, coordinates=False,
+                              colors={'square light': light, 'square dark': dark})
+        png = cairosvg.svg2png(bytestring=svg.encode(), output_width=self.size, output_height=self.size)
+        img = cv2.imdecode(np.frombuffer(png, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    
+    def render_sprites(self, board: chess.Board, colors: Tuple[Tuple[int, int, int], Tuple[int, int, int]]) -> np.ndarray:
+        """Damier uni sur lequel sont incrustés des sprites détourés, image uint8 RGB (size, size, 3)"""
+        tile = self.size // 8
+        img = np.empty((self.size, self.size, 3), dtype=np.uint8)
+        for row in range(8):
+            for col in range(8):
+                img[row * tile:(row + 1) * tile, col * tile:(col + 1) * tile] = colors[(row + col) % 2]
+        
+        for square, piece in board.piece_map().items():
+            candidates = self.sprites[piece.symbol().upper()]
+            sprite = candidates[self.rng.randint(len(candidates))]
+            y, x = (7 - chess.square_rank(square)) * tile, chess.square_file(square) * tile
+            cell = img[y:y + tile, x:x + tile]
+            alpha = sprite[:, :, 3:] / 255.0
+            cell[:] = np.round(sprite[:, :, :3] * alpha + cell * (1 - alpha)).astype(np.uint8)
+        return img
+    
+    def _augment(self, img: np.ndarray) -> np.ndarray:
+        """Variations de capture : luminosité, contraste, flou et bruit"""
+        img = img.astype(np.float32)
+        img = (img - 128) * self.rng.uniform(0.8, 1.2) + 128 + self.rng.uniform(-20, 20)
+        if self.rng.rand() < 0.3:
+            img = cv2.GaussianBlur(img, (3, 3), self.rng.uniform(0.3, 1.0))
+        img += self.rng.normal(0, self.rng.uniform(0, 6), img.shape)
+        return np.clip(img, 0, 255).astype(np.uint8)
+    
+    def render(self, board: chess.Board) -> np.ndarray:
+        """Rend une position avec un thème et un moteur de rendu tirés au hasard, puis l'altère"""
+        colors = self.SQUARE_COLORS[self.rng.randint(len(self.SQUARE_COLORS))]
+        if self.svg_available and (not self.sprites or self.rng.rand() < 0.5):
+            img = self.render_svg(board, colors)
+        else:
+            img = self.render_sprites(board, colors)
+        return self._augment(img)
+    
+    def generate(self, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Génère un lot d'échiquiers étiquetés.
+        
+        Args:
+            count: Nombre d'échiquiers
+            
+        Returns:
+            Tuple (images, étiquettes)
+            - images: Tableau uint8 (count, size, size, 3) RGB
+            - étiquettes: Tableau int32 (count, 8, 8) d'indices de PieceClassifier.PIECES
+        """
+        images = np.empty((count, self.size, self.size, 3), dtype=np.uint8)
+        labels = np.empty((count, 8, 8), dtype=np.int32)
+        for i in range(count):
+            board = self.random_position()
+            images[i] = self.render(board)
+            labels[i] = self.labels(board)
+        return images, labels
@@ -0,0 +1,106 @@
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+import logging
+from typing import Optional
+
+import cv2
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class DebugSink:
+    """
+    Écrit les images de debug en arrière-plan, hors du chemin des requêtes.
+
+    Désactivé par défaut : seules les requêtes tirées au sort selon
+    sample_rate reçoivent un préfixe de debug. Les images sont encodées et
+    écrites par un unique thread, via une file bornée ; si la file est
+    pleine, l'image est abandonnée plutôt que de ralentir la requête.
+    """
+
+    def __init__(self, output_dir: str = 'debug', sample_rate: float = 0.0, max_queue_size: int = 32):
+        """
+        Initialise le collecteur d'images de debug.
+
+        Args:
+            output_dir: Dossier où écrire les images
+            sample_rate: Proportion des requêtes à échantillonner (0 = désactivé, 1 = toutes)
+            max_queue_size: Nombre maximal d'images en attente d'écriture
+        """
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._worker = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def sample(self) -> Optional[str]:
+        """
+        Décide si la requête courante doit produire des images de debug.
+
+        Returns:
+            Préfixe unique à la requête si elle est échantillonnée, None sinon
+        """
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+        return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+    def submit(self, prefix: str, name: str, image: np.ndarray) -> bool:
+        """
+        Programme l'écriture d'une image sans bloquer l'appelant.
+
+        L'image ne doit plus être modifiée par l'appelant après l'envoi.
+
+        Args:
+            prefix: Préfixe de la requête (renvoyé par sample)
+            name: Nom de l'image dans la requête
+            image: Image BGR à écrire
+
+        Returns:
+            True si l'image a été mise en file, False si elle a été abandonnée
+        """
+        self._ensure_worker()
+        path = os.path.join(self.output_dir, f"{prefix}_{name}.png")
+        try:
+            self._queue.put_nowait((path, image))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            logger.debug(f"File de debug pleine, image abandonnée : {path}")
+            return False
+
+    def flush(self):
+        """Attend que toutes les images en file soient écrites"""
+        if self._worker is not None:
+            self._queue.join()
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                os.makedirs(self.output_dir, exist_ok=True)
+                self._worker = threading.Thread(target=self._run, name='debug-sink', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            path, image = self._queue.get()
+            try:
+                cv2.imwrite(path, image)
+                self.written += 1
+            except Exception as e:
+                logger.error(f"Erreur lors de l'écriture de l'image de debug {path} : {str(e)}")
+            finally:
+                self._queue.task_done()
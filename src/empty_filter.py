@@ -0,0 +1,158 @@
+import json
+import threading
+import logging
+from typing import Dict, List, Optional, Sequence, Union
+
+import cv2
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class EmptySquareFilter:
+    """
+    Pré-classifieur des cases vides, appliqué avant le CNN.
+
+    Trois mesures sont calculées en une fois sur tout le lot, dans la zone
+    centrale de chaque case (la marge blanche et les bords de la case en
+    sont exclus) :
+    - std : écart-type des niveaux de gris ;
+    - edges : proportion de pixels dont le gradient dépasse EDGE_THRESHOLD ;
+    - color : plus grand écart-type parmi les trois canaux de couleur.
+    Une case est déclarée vide si les trois mesures sont sous leurs seuils.
+    Les seuils par défaut sont prudents ; calibrate les ajuste sur des cases
+    vides connues pour un taux de faux négatifs donné.
+    """
+
+    FEATURES = ('std', 'edges', 'color')
+    DEFAULT_THRESHOLDS = {'std': 3.0, 'edges': 0.005, 'color': 4.0}
+    # Seuils minimaux après calibration : bruit de capteur ou de compression d'une case vide
+    NOISE_FLOOR = {'std': 2.0, 'edges': 0.002, 'color': 2.5}
+    CROP_RATIO = 0.5  # Côté de la zone centrale analysée, relatif à la case
+    EDGE_THRESHOLD = 24  # Gradient (|dx| + |dy|) d'un pixel de contour
+    TILE_SIZE = 100  # Taille des cases analysées
+
+    def __init__(self, thresholds: Optional[Dict[str, float]] = None):
+        """
+        Initialise le filtre.
+
+        Args:
+            thresholds: Seuils par mesure, en remplacement des valeurs par défaut
+        """
+        self.thresholds = dict(self.DEFAULT_THRESHOLDS)
+        if thresholds:
+            self.thresholds.update(thresholds)
+        self._lock = threading.Lock()
+        self.checked = 0  # Cases examinées
+        self.skipped = 0  # Cases déclarées vides, sans passage par le CNN
+
+    @classmethod
+    def load(cls, path: str) -> 'EmptySquareFilter':
+        """Charge des seuils calibrés (fichier JSON écrit par save)"""
+        with open(path) as f:
+            return cls(json.load(f)['thresholds'])
+
+    def save(self, path: str, report: Optional[dict] = None):
+        """Écrit les seuils, et éventuellement le rapport de calibration, au format JSON"""
+        with open(path, 'w') as f:
+            json.dump({'thresholds': self.thresholds, 'report': report or {}}, f, indent=2)
+
+    def features(self, squares: Union[Sequence[np.ndarray], np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Calcule les mesures de tout un lot.
+
+        Args:
+            squares: Cases uint8 RGB, tableau (N, H, W, 3) ou liste d'images
+
+        Returns:
+            Dictionnaire mesure -> tableau (N,)
+        """
+        tiles = self._stack(squares)
+        size = tiles.shape[1]
+        start = int(size * (1 - self.CROP_RATIO) / 2)
+        center = tiles[:, start:size - start, start:size - start].astype(np.float32)
+
+        gray = center @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        gradient = np.abs(np.diff(gray, axis=1))[:, :, :-1] + np.abs(np.diff(gray, axis=2))[:, :-1, :]
+        return {
+            'std': gray.reshape(len(gray), -1).std(axis=1),
+            'edges': (gradient > self.EDGE_THRESHOLD).reshape(len(gray), -1).mean(axis=1),
+            'color': center.reshape(len(center), -1, 3).std(axis=1).max(axis=1),
+        }
+
+    def predict(self, squares: Union[Sequence[np.ndarray], np.ndarray]) -> np.ndarray:
+        """
+        Repère les cases vides avec certitude.
+
+        Returns:
+            Masque booléen (N,) : True pour une case déclarée vide
+        """
+        if len(squares) == 0:
+            return np.zeros(0, dtype=bool)
+        features = self.features(squares)
+        empty = np.ones(len(squares), dtype=bool)
+        for name in self.FEATURES:
+            empty &= features[name] <= self.thresholds[name]
+
+        with self._lock:
+            self.checked += len(empty)
+            self.skipped += int(empty.sum())
+        return empty
+
+    def calibrate(self, empty_squares: Union[Sequence[np.ndarray], np.ndarray],
+                  false_negative_rate: float = 0.05,
+                  piece_squares: Optional[Union[Sequence[np.ndarray], np.ndarray]] = None) -> dict:
+        """
+        Ajuste les seuils sur des cases vides connues.
+
+        Chaque seuil est le quantile 1 - false_negative_rate / 3 de sa mesure :
+        au plus false_negative_rate des cases vides de calibration ne sont pas
+        reconnues (et passent simplement par le CNN). Les seuils ne descendent
+        pas sous NOISE_FLOOR, pour qu'un jeu de cases synthétiques parfaitement
+        unies ne rende pas le filtre inopérant sur de vraies images.
+
+        Args:
+            empty_squares: Cases vides de calibration
+            false_negative_rate: Proportion tolérée de cases vides non reconnues
+            piece_squares: Cases avec pièce, pour mesurer les faux positifs (optionnel)
+
+        Returns:
+            Rapport : seuils, taux de cases vides reconnues et de pièces
+            déclarées vides à tort
+        """
+        features = self.features(empty_squares)
+        quantile = 1 - false_negative_rate / len(self.FEATURES)
+        self.thresholds = {
+            name: max(float(np.quantile(features[name], quantile)), self.NOISE_FLOOR[name])
+            for name in self.FEATURES
+        }
+
+        report = {
+            'thresholds': dict(self.thresholds),
+            'false_negative_rate': false_negative_rate,
+            'empty_detected': float(self._matches(features).mean()),
+        }
+        if piece_squares is not None and len(piece_squares):
+            report['pieces_flagged_empty'] = float(self._matches(self.features(piece_squares)).mean())
+            if report['pieces_flagged_empty'] > 0:
+                logger.warning(f"{report['pieces_flagged_empty'] * 100:.2f}% des cases avec pièce seraient déclarées vides")
+        logger.info(f"Filtre des cases vides calibré : {report}")
+        return report
+
+    def _matches(self, features: Dict[str, np.ndarray]) -> np.ndarray:
+        return np.all([features[name] <= self.thresholds[name] for name in self.FEATURES], axis=0)
+
+    def _stack(self, squares: Union[Sequence[np.ndarray], np.ndarray]) -> np.ndarray:
+        """Empile les cases en un tableau (N, TILE_SIZE, TILE_SIZE, 3), en redimensionnant si nécessaire"""
+        if isinstance(squares, np.ndarray) and squares.ndim == 4 and squares.shape[-1] == 3:
+            return squares
+        tiles: List[np.ndarray] = []
+        for square in squares:
+            if square.ndim == 2:
+                square = cv2.cvtColor(square, cv2.COLOR_GRAY2RGB)
+            elif square.shape[-1] == 4:
+                square = cv2.cvtColor(square, cv2.COLOR_RGBA2RGB)
+            if square.shape[:2] != (self.TILE_SIZE, self.TILE_SIZE):
+                square = cv2.resize(square, (self.TILE_SIZE, self.TILE_SIZE), interpolation=cv2.INTER_AREA)
+            tiles.append(square)
+        return np.stack(tiles)
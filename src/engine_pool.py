@@ -0,0 +1,238 @@
+import os
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+import chess.engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Erreurs qui laissent un moteur dans un état inconnu : il est remplacé plutôt que réutilisé
+ENGINE_FAILURES = (chess.engine.EngineError, TimeoutError, ConnectionError, OSError)
+
+class EnginePool:
+    """
+    Pool de processus Stockfish partagés entre les threads des requêtes.
+
+    Chaque analyse emprunte un moteur (checkout), bloquant au plus timeout
+    secondes si tous sont occupés, et le rend à la fin. Un moteur inactif
+    depuis plus de health_check_interval secondes est sondé (ping) avant
+    d'être prêté ; un moteur qui ne répond pas ou dont l'analyse échoue est
+    fermé et relancé. Si la relance échoue (exécutable absent), elle est
+    retentée au plus tôt RESPAWN_DELAY secondes plus tard.
+    """
+
+    RESPAWN_DELAY = 5.0  # Délai minimal entre deux tentatives de relance d'un moteur
+
+    def __init__(self, factory: Callable[[], chess.engine.SimpleEngine], size: Optional[int] = None,
+                 health_check_interval: float = 30.0):
+        """
+        Initialise le pool et lance ses moteurs.
+
+        Args:
+            factory: Fonction qui lance et configure un moteur (voir uci_factory)
+            size: Nombre de moteurs ; un par cœur si None
+            health_check_interval: Inactivité (s) au-delà de laquelle un moteur est sondé avant d'être prêté
+        """
+        self.factory = factory
+        self.size = size or os.cpu_count() or 1
+        self.health_check_interval = health_check_interval
+        self._cond = threading.Condition()
+        self._idle: List[chess.engine.SimpleEngine] = []
+        self._last_used: Dict[int, float] = {}
+        self._dead = self.size  # Emplacements sans moteur, à relancer
+        self._spawning = 0
+        self._next_respawn = 0.0
+        self._closed = False
+        self.checkouts = 0
+        self.respawns = 0
+        self.failures = 0
+
+        for _ in range(self.size):
+            engine = self._spawn()
+            with self._cond:
+                if engine is not None:
+                    self._dead -= 1
+                    self._idle.append(engine)
+        logger.info(f"Pool de moteurs : {self.size - self._dead}/{self.size} moteurs lancés")
+
+    @staticmethod
+    def uci_factory(path: str, threads: int = 1, hash_mb: int = 16,
+                    timeout: float = 10.0) -> Callable[[], chess.engine.SimpleEngine]:
+        """
+        Fabrique de moteurs UCI configurés.
+
+        Args:
+            path: Exécutable du moteur
+            threads: Option UCI Threads de chaque moteur
+            hash_mb: Option UCI Hash (table de transposition, en Mo) de chaque moteur
+            timeout: Délai maximal de démarrage
+        """
+        def factory() -> chess.engine.SimpleEngine:
+            engine = chess.engine.SimpleEngine.popen_uci(path, timeout=timeout)
+            options = {name: value for name, value in (('Threads', threads), ('Hash', hash_mb))
+                       if name in engine.options}
+            if options:
+                engine.configure(options)
+            return engine
+        return factory
+
+    @property
+    def alive(self) -> int:
+        """Moteurs lancés (occupés ou libres)"""
+        with self._cond:
+            return self.size - self._dead
+
+    @contextmanager
+    def engine(self, timeout: Optional[float] = None) -> Iterator[chess.engine.SimpleEngine]:
+        """
+        Emprunte un moteur le temps d'un bloc with.
+
+        Si le bloc lève une erreur du moteur (ENGINE_FAILURES), le moteur est
+        remplacé ; sinon il est rendu au pool.
+
+        Raises:
+            TimeoutError: Si aucun moteur ne se libère à temps
+            RuntimeError: Si aucun moteur ne peut être lancé
+        """
+        engine = self.checkout(timeout)
+        healthy = False
+        try:
+            yield engine
+            healthy = True
+        except ENGINE_FAILURES:
+            raise
+        except Exception:
+            # Erreur de l'appelant (position invalide...) : le moteur reste utilisable
+            healthy = True
+            raise
+        finally:
+            self.release(engine, healthy)
+
+    def checkout(self, timeout: Optional[float] = None) -> chess.engine.SimpleEngine:
+        """
+        Emprunte un moteur sain, à rendre par release.
+
+        Args:
+            timeout: Attente maximale en secondes (None = sans limite)
+
+        Raises:
+            TimeoutError: Si aucun moteur ne se libère à temps
+            RuntimeError: Si aucun moteur ne peut être lancé
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            engine = self._acquire(deadline)
+            if engine is None:
+                # Emplacement réservé pour une relance, hors du verrou
+                engine = self._spawn()
+                with self._cond:
+                    self._spawning -= 1
+                    if engine is None:
+                        self._dead += 1
+                        self._next_respawn = time.monotonic() + self.RESPAWN_DELAY
+                        self._cond.notify_all()
+                        continue
+                    self.respawns += 1
+            elif not self._healthy(engine):
+                self._discard(engine)
+                continue
+            with self._cond:
+                self.checkouts += 1
+            return engine
+
+    def release(self, engine: chess.engine.SimpleEngine, healthy: bool = True):
+        """Rend un moteur au pool, ou le remplace s'il n'est plus fiable"""
+        if not healthy:
+            self._discard(engine)
+            return
+        with self._cond:
+            if self._closed:
+                self._quit(engine)
+                return
+            self._last_used[id(engine)] = time.monotonic()
+            self._idle.append(engine)
+            self._cond.notify()
+
+    def close(self):
+        """Ferme tous les moteurs libres ; les moteurs prêtés sont fermés à leur retour"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for engine in idle:
+            self._quit(engine)
+
+    def metrics(self) -> dict:
+        with self._cond:
+            return {'size': self.size, 'alive': self.size - self._dead, 'idle': len(self._idle),
+                    'checkouts': self.checkouts, 'respawns': self.respawns, 'failures': self.failures}
+
+    def _acquire(self, deadline: Optional[float]) -> Optional[chess.engine.SimpleEngine]:
+        """Moteur libre, ou None après avoir réservé un emplacement à relancer"""
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Pool de moteurs fermé")
+                if self._idle:
+                    return self._idle.pop()
+                now = time.monotonic()
+                if self._dead and now >= self._next_respawn:
+                    self._dead -= 1
+                    self._spawning += 1
+                    return None
+                if self._dead == self.size and not self._spawning:
+                    raise RuntimeError("Aucun moteur d'échecs disponible")
+
+                wait = None if deadline is None else deadline - now
+                if wait is not None and wait <= 0:
+                    raise TimeoutError("Aucun moteur d'échecs libre")
+                if self._dead:
+                    # Réveil au plus tard à la prochaine relance possible
+                    wait = self._next_respawn - now if wait is None else min(wait, self._next_respawn - now)
+                self._cond.wait(wait)
+
+    def _healthy(self, engine: chess.engine.SimpleEngine) -> bool:
+        """Sonde un moteur resté inactif depuis plus de health_check_interval"""
+        if time.monotonic() - self._last_used.get(id(engine), 0.0) < self.health_check_interval:
+            return True
+        try:
+            engine.ping()
+            return True
+        except Exception as e:
+            logger.error(f"Moteur d'échecs sans réponse : {str(e)}")
+            return False
+
+    def _discard(self, engine: chess.engine.SimpleEngine):
+        """Ferme un moteur défaillant ; son emplacement sera relancé au prochain checkout"""
+        self._quit(engine)
+        with self._cond:
+            self._last_used.pop(id(engine), None)
+            self._dead += 1
+            self.failures += 1
+            self._next_respawn = 0.0
+            self._cond.notify_all()
+        logger.warning("Moteur d'échecs défaillant fermé, il sera relancé")
+
+    def _spawn(self) -> Optional[chess.engine.SimpleEngine]:
+        try:
+            engine = self.factory()
+            with self._cond:
+                self._last_used[id(engine)] = time.monotonic()
+            return engine
+        except Exception as e:
+            logger.error(f"Erreur lors du lancement d'un moteur d'échecs : {str(e)}")
+            return None
+
+    @staticmethod
+    def _quit(engine: chess.engine.SimpleEngine):
+        try:
+            engine.quit()
+        except Exception:
+            try:
+                engine.close()
+            except Exception:
+                pass
@@ -0,0 +1,179 @@
+import cv2
+import numpy as np
+from typing import Tuple, Optional, List
+import logging
+from .image_processor import ImageProcessor, ImageSource, DecodedImage
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class FixedCameraBoard:
+    """
+    Mode caméra fixe : l'échiquier est détecté une fois, puis chaque image
+    est découpée avec des tables cv2.remap précalculées.
+
+    Les tables combinent la correction optionnelle de la distorsion de
+    l'objectif, l'homographie vers l'échiquier redressé et la disposition des
+    64 cases avec leur marge. Pour chaque nouvelle image, seule une
+    vérification rapide (corrélation de petites vignettes autour des coins
+    de l'échiquier) est effectuée ; la détection complète n'est relancée
+    que si la caméra ou l'échiquier a bougé.
+    """
+
+    CHECK_THRESHOLD = 0.6  # Corrélation minimale d'une vignette de coin
+    CHECK_MIN_MATCHES = 3  # Nombre minimal de coins (sur 4) qui doivent correspondre
+
+    def __init__(self, processor: Optional[ImageProcessor] = None,
+                 camera_matrix: Optional[np.ndarray] = None,
+                 dist_coeffs: Optional[np.ndarray] = None):
+        """
+        Initialise le mode caméra fixe.
+
+        Args:
+            processor: Processeur utilisé pour la détection et le découpage
+            camera_matrix: Matrice intrinsèque 3x3 de la caméra (optionnelle)
+            dist_coeffs: Coefficients de distorsion OpenCV (k1, k2, p1, p2[, k3...])
+        """
+        self.processor = processor or ImageProcessor()
+        self.camera_matrix = camera_matrix
+        self.dist_coeffs = dist_coeffs
+        self.corners = None  # Coins de l'échiquier dans l'image brute
+        self.redetections = 0
+        self._maps = None
+        self._patches = None
+        self._patch_boxes = None
+
+    @property
+    def calibrated(self) -> bool:
+        return self._maps is not None
+
+    @property
+    def _undistorts(self) -> bool:
+        return self.camera_matrix is not None and self.dist_coeffs is not None
+
+    def calibrate(self, image: ImageSource, corners: Optional[np.ndarray] = None) -> bool:
+        """
+        Mémorise la position de l'échiquier et précalcule les tables de découpage.
+
+        Args:
+            image: Image de référence
+            corners: Coins extérieurs de l'échiquier dans l'image corrigée de la
+                     distorsion ; détectés automatiquement si None
+
+        Returns:
+            True si la calibration a réussi, False sinon
+        """
+        decoded = self.processor.load_image(image)
+        if decoded is None:
+            return False
+
+        if corners is None:
+            reference = decoded
+            if self._undistorts:
+                reference = DecodedImage.from_array(
+                    cv2.undistort(decoded.bgr, self.camera_matrix, self.dist_coeffs))
+            success, corners = self.processor.detect_chessboard(reference)
+            if not success:
+                logger.error("Calibration impossible : échiquier non détecté")
+                return False
+
+        corners = np.asarray(corners, dtype=np.float32).reshape(4, 2)
+
+        # Table de découpage dans l'image corrigée, puis reportée dans l'image brute
+        maps = self.processor.build_square_maps(self.processor.perspective_transform(corners))
+        if self._undistorts:
+            maps = self._distort_points(maps.reshape(-1, 2)).reshape(maps.shape)
+            corners = self._distort_points(corners)
+
+        # Conversion en virgule fixe : cv2.remap est plus rapide avec ce format
+        self._maps = cv2.convertMaps(maps, None, cv2.CV_16SC2)
+        self.corners = corners
+        self._store_reference_patches(decoded.bgr)
+        logger.info(f"Caméra fixe calibrée, coins : {corners.tolist()}")
+        return True
+
+    def check(self, image: np.ndarray) -> bool:
+        """
+        Vérifie rapidement que l'échiquier n'a pas bougé depuis la calibration.
+
+        Args:
+            image: Image BGR brute
+
+        Returns:
+            True si les vignettes des coins correspondent à la référence
+        """
+        if not self.calibrated:
+            return False
+        matches = 0
+        for reference, box in zip(self._patches, self._patch_boxes):
+            patch = self._normalized_patch(image, box)
+            if patch is not None and float(np.sum(patch * reference)) >= self.CHECK_THRESHOLD:
+                matches += 1
+        return matches >= self.CHECK_MIN_MATCHES
+
+    def extract_squares(self, image: ImageSource) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Découpe les 64 cases d'une image de la caméra fixe.
+
+        Args:
+            image: Image à traiter
+
+        Returns:
+            Tuple (succès, cases) comme ImageProcessor.extract_squares_batch
+        """
+        decoded = self.processor.load_image(image)
+        if decoded is None:
+            return False, None
+
+        if not self.check(decoded.bgr):
+            logger.info("Position de l'échiquier modifiée, nouvelle détection")
+            self.redetections += 1
+            if not self.calibrate(decoded):
+                return False, None
+
+        return True, self.processor.remap_squares(decoded.bgr, *self._maps)
+
+    def _distort_points(self, points: np.ndarray) -> np.ndarray:
+        """Reporte des points de l'image corrigée vers l'image brute (distordue)"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        k = self.camera_matrix
+        normalized = np.empty((len(points), 3), dtype=np.float64)
+        normalized[:, 0] = (points[:, 0] - k[0, 2]) / k[0, 0]
+        normalized[:, 1] = (points[:, 1] - k[1, 2]) / k[1, 1]
+        normalized[:, 2] = 1.0
+        zero = np.zeros(3, dtype=np.float64)
+        projected, _ = cv2.projectPoints(normalized, zero, zero, k, self.dist_coeffs)
+        return projected.reshape(-1, 2).astype(np.float32)
+
+    def _store_reference_patches(self, image: np.ndarray):
+        """Mémorise les vignettes normalisées centrées sur les 4 coins de l'échiquier"""
+        side = np.mean(np.linalg.norm(self.corners - np.roll(self.corners, 1, axis=0), axis=1))
+        half = max(4, int(side / 16))  # Vignette d'une demi-case de côté
+
+        boxes: List[Tuple[int, int, int, int]] = []
+        patches = []
+        for corner in self.corners:
+            x, y = np.round(corner).astype(int)
+            box = (x - half, y - half, x + half, y + half)
+            patch = self._normalized_patch(image, box)
+            if patch is not None:
+                boxes.append(box)
+                patches.append(patch)
+        self._patch_boxes = boxes
+        self._patches = patches
+        if len(boxes) < self.CHECK_MIN_MATCHES:
+            logger.warning("Coins de l'échiquier trop proches du bord : la vérification sera toujours négative")
+
+    @staticmethod
+    def _normalized_patch(image: np.ndarray, box: Tuple[int, int, int, int]) -> Optional[np.ndarray]:
+        """Extrait une vignette en niveaux de gris, centrée et de norme 1 (None si hors image ou uniforme)"""
+        x1, y1, x2, y2 = box
+        height, width = image.shape[:2]
+        if x1 < 0 or y1 < 0 or x2 > width or y2 > height:
+            return None
+        patch = cv2.cvtColor(image[y1:y2, x1:x2], cv2.COLOR_BGR2GRAY).astype(np.float32)
+        patch -= patch.mean()
+        norm = np.linalg.norm(patch)
+        if norm < 1e-3:
+            return None
+        return patch / norm
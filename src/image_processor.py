@@ -1,23 +1,179 @@
 import cv2
 import numpy as np
-from typing import Tuple, Optional, List
+from typing import Tuple, Optional, List, Union, BinaryIO
+from dataclasses import dataclass, field
+from functools import lru_cache
 import logging
-import os
+import struct
+from .debug_sink import DebugSink
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@dataclass
+class DecodedImage:
+    """Image décodée une seule fois, accompagnée de sa version en niveaux de gris"""
+    bgr: np.ndarray  # Image couleur au format BGR d'OpenCV
+    _gray: Optional[np.ndarray] = field(default=None, repr=False)
+
+    @property
+    def gray(self) -> np.ndarray:
+        """Version en niveaux de gris, calculée à la première utilisation"""
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @classmethod
+    def from_array(cls, image: np.ndarray) -> 'DecodedImage':
+        """Construit une image décodée à partir d'un tableau BGR, BGRA ou niveaux de gris"""
+        if image.ndim == 2:
+            return cls(bgr=cv2.cvtColor(image, cv2.COLOR_GRAY2BGR), _gray=image)
+        if image.shape[-1] == 4:
+            image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+        return cls(bgr=image)
+
+# Sources acceptées par les points d'entrée du traitement d'image
+ImageSource = Union[str, bytes, np.ndarray, DecodedImage]
+
+@lru_cache(maxsize=8)
+def _square_sample_grid(warp_size: int, tile_size: int, margin_ratio: float) -> Tuple[np.ndarray, slice]:
+    """
+    Calcule, dans le repère de l'échiquier redressé, la position d'échantillonnage
+    de chaque pixel des 64 cases de sortie (marge comprise).
+    
+    Les cases sont empilées verticalement : la case i occupe les lignes
+    [i * tile_size, (i + 1) * tile_size) de la grille.
+    
+    Returns:
+        Tuple (points, inside)
+        - points: Tableau float32 (64 * tile_size * tile_size, 1, 2) des coordonnées (x, y)
+        - inside: Intervalle des lignes/colonnes d'une case hors de la marge blanche
+    """
+    square_size = warp_size // 8
+    margin = int(square_size * margin_ratio)
+    
+    # Reproduit l'échantillonnage de cv2.resize (INTER_LINEAR) de la case avec marge vers tile_size
+    scale = (square_size + 2 * margin) / tile_size
+    local = (np.arange(tile_size) + 0.5) * scale - 0.5 - margin
+    inside = np.flatnonzero((local >= -0.5) & (local <= square_size - 0.5))
+    
+    index = np.arange(64)
+    xs = (index % 8 * square_size)[:, None, None] + local[None, None, :]
+    ys = (index // 8 * square_size)[:, None, None] + local[None, :, None]
+    xs, ys = np.broadcast_arrays(xs, ys)
+    
+    points = np.stack([xs, ys], axis=-1).reshape(-1, 1, 2).astype(np.float32)
+    points.setflags(write=False)
+    return points, slice(inside[0], inside[-1] + 1)
+
 class ImageProcessor:
     VALID_EXTENSIONS = ['.jpg', '.jpeg', '.png']
     MIN_IMAGE_SIZE = 200  # Minimum size in pixels for both width and height
+    WARP_SIZE = 800  # Taille de l'échiquier redressé
+    SQUARE_SIZE = 100  # Taille des cases attendue par le modèle
+    SQUARE_MARGIN_RATIO = 0.1  # Marge blanche autour de chaque case, relative à sa taille
+    PATTERN_SIZE = (7, 7)  # Coins intérieurs de l'échiquier
+    PYRAMID_MAX_SIDE = 1024  # Plus grand côté du niveau de pyramide le plus grossier
+    HEADER_READ_SIZE = 64 * 1024  # Octets lus pour valider l'en-tête d'une image
+    DECODE_MIN_SIDE = WARP_SIZE  # Plus petit côté minimal d'une image JPEG décodée à échelle réduite
+    PROFILE_PEAK_RATIO = 0.3  # Seuil des pics des profils de projection, relatif au plus haut
+    PROFILE_MIN_STEP = 8  # Taille minimale d'une case (px) pour le chemin des captures d'écran
+    
+    # Modes de décodage JPEG réduit (dans le domaine DCT), du plus réduit au moins réduit
+    REDUCED_DECODE_FLAGS = (
+        (8, cv2.IMREAD_REDUCED_COLOR_8),
+        (4, cv2.IMREAD_REDUCED_COLOR_4),
+        (2, cv2.IMREAD_REDUCED_COLOR_2),
+    )
+    
+    # Marqueurs JPEG Start Of Frame portant les dimensions de l'image
+    _JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+    
+    def __init__(self, debug_sink: Optional[DebugSink] = None, multiscale: bool = True):
+        """
+        Initialise le processeur d'images.
+        
+        Args:
+            debug_sink: Collecteur optionnel des images de debug
+            multiscale: Détecte les coins sur une pyramide d'images réduites
+                        avant de les affiner en pleine résolution
+        """
+        self.debug_sink = debug_sink
+        self.multiscale = multiscale
+    
+    @staticmethod
+    def sniff_image(source: Union[str, bytes, BinaryIO]) -> Tuple[bool, Optional[Tuple[str, int, int]]]:
+        """
+        Valide une image à partir de sa signature et de son en-tête uniquement.
+        
+        Seuls les premiers octets sont lus : une image d'un format non supporté
+        ou trop petite est rejetée sans être décodée.
+        
+        Args:
+            source: Chemin, contenu brut ou flux binaire (sa position est restaurée)
+            
+        Returns:
+            Tuple (is_valid, header)
+            - header: (format, largeur, hauteur) si l'en-tête a pu être lu, None sinon
+        """
+        try:
+            data = ImageProcessor._read_prefix(source, ImageProcessor.HEADER_READ_SIZE)
+            header = ImageProcessor.read_image_header(data)
+            if header is None and data[:2] == b'\xff\xd8' and len(data) == ImageProcessor.HEADER_READ_SIZE:
+                # Segments JPEG (EXIF, miniatures) plus longs que le préfixe lu
+                header = ImageProcessor.read_image_header(ImageProcessor._read_prefix(source, None))
+        except Exception as e:
+            logger.error(f"Error reading image header: {str(e)}")
+            return False, None
+        
+        if header is None:
+            logger.error(f"Invalid image format. Supported formats: {ImageProcessor.VALID_EXTENSIONS}")
+            return False, None
+        
+        _, width, height = header
+        if height < ImageProcessor.MIN_IMAGE_SIZE or width < ImageProcessor.MIN_IMAGE_SIZE:
+            logger.error(f"Image too small. Minimum size: {ImageProcessor.MIN_IMAGE_SIZE}x{ImageProcessor.MIN_IMAGE_SIZE}")
+            return False, header
+        
+        return True, header
+    
+    @staticmethod
+    def _read_prefix(source: Union[str, bytes, BinaryIO], size: Optional[int]) -> bytes:
+        """Lit au plus size octets (tout si None) d'un chemin, d'un contenu brut ou d'un flux"""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return bytes(source[:size]) if size is not None else bytes(source)
+        if isinstance(source, str):
+            with open(source, 'rb') as f:
+                return f.read(size if size is not None else -1)
+        position = source.tell()
+        try:
+            return source.read(size if size is not None else -1)
+        finally:
+            source.seek(position)
     
     @staticmethod
-    def validate_image(image_path: str) -> Tuple[bool, Optional[np.ndarray]]:
+    def has_valid_extension(filename: str) -> bool:
+        """Check the file name against VALID_EXTENSIONS"""
+        if not any(filename.lower().endswith(ext) for ext in ImageProcessor.VALID_EXTENSIONS):
+            logger.error(f"Invalid image format. Supported formats: {ImageProcessor.VALID_EXTENSIONS}")
+            return False
+        return True
+    
+    @staticmethod
+    def validate_image(source: Union[str, bytes], filename: Optional[str] = None) -> Tuple[bool, Optional[np.ndarray]]:
         """
         Validate if the image is in a supported format and can be processed.
         
+        The file extension (of the path, or of filename for raw content) must
+        be one of VALID_EXTENSIONS, and the content itself must carry a PNG or
+        JPEG signature: both are checked. The format and dimensions are read
+        from the header first, so invalid uploads are rejected without
+        decoding. A valid image is decoded once and returned, to be handed to
+        detection as is.
+        
         Args:
-            image_path: Path to the image file
+            source: Path to the image file or raw file content
+            filename: Original file name of raw content (extension not checked if None)
             
         Returns:
             Tuple of (is_valid, image_data)
@@ -25,68 +181,163 @@ class ImageProcessor:
             - image_data: np.ndarray of the image if valid, None otherwise
         """
         # Check file extension
-        if not any(image_path.lower().endswith(ext) for ext in ImageProcessor.VALID_EXTENSIONS):
-            logger.error(f"Invalid image format. Supported formats: {ImageProcessor.VALID_EXTENSIONS}")
+        if isinstance(source, str):
+            filename = source
+        if filename is not None and not ImageProcessor.has_valid_extension(filename):
+            return False, None
+        
+        is_valid, _ = ImageProcessor.sniff_image(source)
+        if not is_valid:
             return False, None
             
         try:
             # Read file as binary
-            with open(image_path, 'rb') as f:
-                img_array = np.frombuffer(f.read(), np.uint8)
+            data = ImageProcessor._read_prefix(source, None)
             
-            # Decode the image
-            image = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+            # Decode the image, at reduced scale for large JPEGs
+            image = ImageProcessor.decode_image(data)
             if image is None:
                 logger.error("Failed to load image")
                 return False, None
                 
-            # Check image dimensions
-            height, width = image.shape[:2]
-            if height < ImageProcessor.MIN_IMAGE_SIZE or width < ImageProcessor.MIN_IMAGE_SIZE:
-                logger.error(f"Image too small. Minimum size: {ImageProcessor.MIN_IMAGE_SIZE}x{ImageProcessor.MIN_IMAGE_SIZE}")
-                return False, None
-                
             return True, image
             
         except Exception as e:
             logger.error(f"Error processing image: {str(e)}")
             return False, None
+    
+    @staticmethod
+    def read_image_header(data: bytes) -> Optional[Tuple[str, int, int]]:
+        """
+        Lit le format et les dimensions d'une image PNG ou JPEG sans la décoder.
+        
+        Args:
+            data: Contenu brut du fichier image (au moins jusqu'à l'en-tête)
             
-    def detect_chessboard(self, image_path: str) -> Tuple[bool, Optional[np.ndarray]]:
-        """Détecte l'échiquier dans l'image et retourne ses coins"""
+        Returns:
+            Tuple (format, largeur, hauteur), None si l'en-tête n'est pas reconnu
+        """
+        # PNG : signature puis bloc IHDR
+        if data[:8] == b'\x89PNG\r\n\x1a\n':
+            if len(data) < 24 or data[12:16] != b'IHDR':
+                return None
+            width, height = struct.unpack('>II', data[16:24])
+            return 'png', width, height
+        
+        # JPEG : parcourt les segments jusqu'au marqueur Start Of Frame
+        if data[:2] != b'\xff\xd8':
+            return None
+        pos = 2
+        while pos + 4 <= len(data):
+            if data[pos] != 0xFF:
+                return None
+            marker = data[pos + 1]
+            if marker == 0xFF:  # Octet de remplissage
+                pos += 1
+                continue
+            if marker == 0x01 or 0xD0 <= marker <= 0xD7:  # Marqueurs sans segment
+                pos += 2
+                continue
+            length = struct.unpack('>H', data[pos + 2:pos + 4])[0]
+            if marker in ImageProcessor._JPEG_SOF_MARKERS:
+                if pos + 9 > len(data):
+                    return None
+                height, width = struct.unpack('>HH', data[pos + 5:pos + 9])
+                return 'jpeg', width, height
+            pos += 2 + length
+        return None
+    
+    @staticmethod
+    def decode_image(data: bytes, min_side: Optional[int] = DECODE_MIN_SIDE) -> Optional[np.ndarray]:
+        """
+        Décode une image encodée (PNG, JPEG) directement depuis la mémoire.
+        
+        Les JPEG dont le plus petit côté dépasse largement min_side sont décodés
+        à 1/2, 1/4 ou 1/8 de leur taille dans le domaine DCT, ce qui réduit le
+        temps de décodage et la mémoire. L'échelle retenue est la plus réduite
+        qui garde un plus petit côté d'au moins min_side pixels, afin que
+        l'échiquier redressé ne soit jamais agrandi quand il remplit l'image.
+        
+        Args:
+            data: Contenu brut du fichier image
+            min_side: Plus petit côté minimal de l'image décodée (None = pleine taille)
+            
+        Returns:
+            Image BGR si le décodage a réussi, None sinon
+        """
+        img_array = np.frombuffer(data, np.uint8)
+        if img_array.size == 0:
+            return None
+        
+        flags = cv2.IMREAD_COLOR
+        header = ImageProcessor.read_image_header(data) if min_side else None
+        if header is not None and header[0] == 'jpeg':
+            short_side = min(header[1], header[2])
+            for factor, reduced_flags in ImageProcessor.REDUCED_DECODE_FLAGS:
+                if short_side // factor >= min_side:
+                    logger.debug(f"Décodage JPEG réduit au 1/{factor}")
+                    flags = reduced_flags
+                    break
+        
+        return cv2.imdecode(img_array, flags)
+    
+    @staticmethod
+    def load_image(source: ImageSource) -> Optional[DecodedImage]:
+        """
+        Charge une image une seule fois, quelle que soit sa provenance.
+        
+        Args:
+            source: Chemin de fichier, contenu brut, tableau BGR déjà décodé
+                    ou DecodedImage (renvoyée telle quelle)
+            
+        Returns:
+            DecodedImage si le chargement a réussi, None sinon
+        """
+        if isinstance(source, DecodedImage):
+            return source
+        if isinstance(source, np.ndarray):
+            return DecodedImage.from_array(source)
+        if not isinstance(source, (bytes, bytearray, memoryview)):
+            try:
+                with open(source, 'rb') as f:
+                    source = f.read()
+            except OSError as e:
+                logger.error(f"Impossible de lire l'image : {str(e)}")
+                return None
+        img = ImageProcessor.decode_image(source)
+        if img is None:
+            logger.error("Impossible de charger l'image")
+            return None
+        return DecodedImage.from_array(img)
+            
+    def detect_chessboard(self, image: ImageSource, debug_prefix: Optional[str] = None,
+                          max_side: Optional[int] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Détecte l'échiquier dans l'image et retourne ses coins.
+        
+        Si debug_prefix est fourni et qu'un collecteur de debug est configuré,
+        les images annotées sont écrites en arrière-plan sous ce préfixe.
+        max_side borne le niveau de pyramide de la recherche (voir
+        find_inner_corners).
+        """
         try:
             # Charge l'image
-            img = cv2.imread(image_path)
-            if img is None:
-                logger.error(f"Impossible de charger l'image : {image_path}")
+            decoded = self.load_image(image)
+            if decoded is None:
                 return False, None
-
-            # Convertit en niveaux de gris
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            
-            # Applique un flou gaussien pour réduire le bruit
-            blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+            img, gray = decoded.bgr, decoded.gray
             
             # Détecte les coins de l'échiquier
-            ret, corners = cv2.findChessboardCorners(blurred, (7, 7), None)
+            corners, level = self.find_inner_corners(gray, max_side=max_side)
+            ret = corners is not None
             
             if ret:
-                # Affine la position des coins
-                criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
-                corners = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
+                logger.info(f"Coins détectés au niveau de pyramide {level}")
                 
                 # Log des informations sur les coins
                 logger.info(f"Nombre de coins détectés : {len(corners)}")
                 logger.info(f"Forme des coins : {corners.shape}")
-                
-                # Sauvegarde l'image avec les coins détectés pour le debug
-                debug_img = img.copy()
-                cv2.drawChessboardCorners(debug_img, (7, 7), corners, ret)
-                debug_dir = 'debug'
-                os.makedirs(debug_dir, exist_ok=True)
-                debug_path = os.path.join(debug_dir, 'detected_corners.png')
-                cv2.imwrite(debug_path, debug_img)
-                logger.info(f"Image avec coins détectés sauvegardée : {debug_path}")
+                inner_corners = corners
                 
                 # Extrapoler les coins externes
                 # Calcule la taille moyenne d'une case
@@ -108,22 +359,8 @@ class ImageProcessor:
                     top_left, top_right, bottom_right, bottom_left
                 ], dtype=np.float32)
                 
-                # Dessine les coins externes sur l'image de debug
-                debug_img = img.copy()
-                for i, corner in enumerate(board_corners):
-                    cv2.circle(debug_img, tuple(corner.astype(int)), 5, (0, 0, 255), -1)
-                    if i > 0:
-                        cv2.line(debug_img, 
-                                tuple(board_corners[i-1].astype(int)),
-                                tuple(corner.astype(int)),
-                                (0, 255, 0), 2)
-                cv2.line(debug_img,
-                        tuple(board_corners[-1].astype(int)),
-                        tuple(board_corners[0].astype(int)),
-                        (0, 255, 0), 2)
-                debug_path = os.path.join(debug_dir, 'board_corners.png')
-                cv2.imwrite(debug_path, debug_img)
-                logger.info(f"Image avec coins de l'échiquier sauvegardée : {debug_path}")
+                if debug_prefix and self.debug_sink is not None:
+                    self._submit_debug_images(debug_prefix, img, inner_corners, board_corners)
                 
                 logger.info("Coins de l'échiquier extrapolés avec succès")
                 logger.info(f"Coins : {board_corners}")
@@ -137,33 +374,246 @@ class ImageProcessor:
             logger.error(f"Error detecting chessboard: {str(e)}")
             return False, None
 
-    def extract_squares(self, image_path: str, corners: np.ndarray) -> Tuple[bool, List[np.ndarray]]:
+    def find_inner_corners(self, gray: np.ndarray, max_side: Optional[int] = None) -> Tuple[Optional[np.ndarray], Optional[int]]:
+        """
+        Cherche les 7x7 coins intérieurs de l'échiquier.
+        
+        En mode multi-échelle, la recherche se fait sur le niveau de pyramide
+        dont le plus grand côté ne dépasse pas PYRAMID_MAX_SIDE, avec
+        CALIB_CB_FAST_CHECK pour rejeter rapidement les images sans échiquier :
+        son coût ne dépend donc plus de la résolution de l'image reçue. Les
+        coins trouvés sont remis à l'échelle puis affinés par cornerSubPix sur
+        de petites fenêtres en pleine résolution.
+        
+        max_side remplace PYRAMID_MAX_SIDE, même hors mode multi-échelle :
+        un appelant pressé par le temps descend ainsi d'un ou deux niveaux.
+        
+        Args:
+            gray: Image en niveaux de gris, pleine résolution
+            max_side: Plus grand côté du niveau de recherche (PYRAMID_MAX_SIDE par défaut)
+            
+        Returns:
+            Tuple (coins, niveau)
+            - coins: Tableau (49, 1, 2) en pleine résolution, None si non trouvés
+            - niveau: Niveau de pyramide ayant réussi (0 = pleine résolution)
+        """
+        flags = cv2.CALIB_CB_ADAPTIVE_THRESH + cv2.CALIB_CB_NORMALIZE_IMAGE
+        
+        level = 0
+        search = gray
+        if max_side is None and self.multiscale:
+            max_side = self.PYRAMID_MAX_SIDE
+        if max_side is not None:
+            # pyrDown lisse déjà l'image avant de la sous-échantillonner
+            while max(search.shape[:2]) > max_side:
+                search = cv2.pyrDown(search)
+                level += 1
+        
+        if level == 0:
+            # Applique un flou gaussien pour réduire le bruit
+            search = cv2.GaussianBlur(gray, (5, 5), 0)
+        else:
+            flags += cv2.CALIB_CB_FAST_CHECK
+        
+        found, corners = cv2.findChessboardCorners(search, self.PATTERN_SIZE, flags)
+        if not found:
+            return None, None
+        
+        # Remet les coins à l'échelle de l'image d'origine (centres des pixels)
+        scale = 2 ** level
+        corners = ((corners.reshape(-1, 1, 2) + 0.5) * scale - 0.5).astype(np.float32)
+        
+        # Affine la position des coins, dans une fenêtre couvrant l'erreur de mise à l'échelle
+        half_window = max(11, 5 + 2 * scale)
+        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+        corners = cv2.cornerSubPix(gray, corners, (half_window, half_window), (-1, -1), criteria)
+        return corners, level
+
+    def _submit_debug_images(self, prefix: str, img: np.ndarray, inner_corners: np.ndarray, board_corners: np.ndarray):
+        """Envoie au collecteur de debug les coins détectés et les coins extrapolés"""
+        # Image avec les coins intérieurs détectés
+        debug_img = img.copy()
+        cv2.drawChessboardCorners(debug_img, (7, 7), inner_corners, True)
+        self.debug_sink.submit(prefix, 'detected_corners', debug_img)
+        
+        # Image avec les coins externes et le contour de l'échiquier
+        debug_img = img.copy()
+        for i, corner in enumerate(board_corners):
+            cv2.circle(debug_img, tuple(corner.astype(int)), 5, (0, 0, 255), -1)
+            if i > 0:
+                cv2.line(debug_img, 
+                        tuple(board_corners[i-1].astype(int)),
+                        tuple(corner.astype(int)),
+                        (0, 255, 0), 2)
+        cv2.line(debug_img,
+                tuple(board_corners[-1].astype(int)),
+                tuple(board_corners[0].astype(int)),
+                (0, 255, 0), 2)
+        self.debug_sink.submit(prefix, 'board_corners', debug_img)
+
+    def locate_screenshot_board(self, image: ImageSource, max_side: Optional[int] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Localise un échiquier numérique (capture d'écran) à partir des profils de projection.
+        
+        Sur une capture d'écran, l'échiquier est carré et aligné sur les axes :
+        chaque frontière entre deux colonnes de cases est une colonne de pixels
+        où le gradient horizontal change de signe d'une case à l'autre. Le
+        produit des sommes des gradients positifs et négatifs de chaque colonne
+        (resp. ligne) fait ressortir ces frontières et ignore les bords des
+        pièces, qui n'ont pas cette alternance. Les 7 frontières intérieures
+        doivent être régulièrement espacées ; les bords extérieurs en sont
+        extrapolés.
+        
+        Si max_side est fourni, les profils sont calculés sur le niveau de
+        pyramide dont le plus grand côté ne le dépasse pas ; la première et
+        la dernière frontière intérieure sont ensuite recalées en pleine
+        résolution, sur une bande de quelques colonnes (resp. lignes) autour
+        de leur position estimée. Le coût ne dépend alors presque plus de la
+        résolution de la capture.
+        
+        Args:
+            image: Image à analyser (chemin, contenu brut, tableau ou DecodedImage)
+            max_side: Plus grand côté de l'image sur laquelle les profils sont calculés
+            
+        Returns:
+            Tuple (succès, coins) : les 4 coins extérieurs, au centre des pixels
+            extrêmes de l'échiquier, dans le même ordre que detect_chessboard
+        """
+        decoded = self.load_image(image)
+        if decoded is None:
+            return False, None
+        height, width = decoded.gray.shape
+        search = decoded.gray
+        scale = 1
+        if max_side is not None:
+            while max(search.shape[:2]) > max_side:
+                search = cv2.pyrDown(search)
+                scale *= 2
+        search = search.astype(np.int16)
+        
+        columns = self._grid_lines(self._projection_profile(np.diff(search, axis=1), axis=0))
+        rows = self._grid_lines(self._projection_profile(np.diff(search, axis=0), axis=1))
+        if columns is None or rows is None:
+            return False, None
+        
+        if scale > 1:
+            # Positions estimées en pleine résolution, recalées sur l'image d'origine
+            columns, rows = (columns[0] * scale, columns[1] * scale), (rows[0] * scale, rows[1] * scale)
+            columns, rows = (self._refine_grid_lines(decoded.gray, columns, rows, scale),
+                             self._refine_grid_lines(decoded.gray.T, rows, columns, scale))
+            if columns is None or rows is None:
+                return False, None
+        
+        (x0, x1), (y0, y1) = columns, rows
+        # Les cases doivent être carrées et l'échiquier entièrement visible
+        if abs((x1 - x0) - (y1 - y0)) > 0.02 * max(x1 - x0, y1 - y0) + 1:
+            return False, None
+        if x0 < 0 or y0 < 0 or x1 > width or y1 > height:
+            return False, None
+        
+        corners = np.array([[x0, y0], [x1 - 1, y0], [x1 - 1, y1 - 1], [x0, y1 - 1]], dtype=np.float32)
+        return True, corners
+    
+    @staticmethod
+    def _projection_profile(gradient: np.ndarray, axis: int) -> np.ndarray:
+        """Profil des frontières de cases : produit des gradients positifs et négatifs cumulés"""
+        positive = np.maximum(gradient, 0).sum(axis=axis)
+        negative = np.maximum(-gradient, 0).sum(axis=axis)
+        return positive.astype(np.float64) * negative
+    
+    def _grid_lines(self, profile: np.ndarray) -> Optional[Tuple[int, int]]:
+        """
+        Cherche 7 pics régulièrement espacés dans un profil de projection.
+        
+        Returns:
+            Intervalle [début, fin) de l'échiquier le long du profil, None si
+            aucune grille régulière n'est trouvée
+        """
+        peak = profile.max()
+        if peak <= 0:
+            return None
+        
+        # Un pic par groupe de positions consécutives au-dessus du seuil
+        above = np.flatnonzero(profile > self.PROFILE_PEAK_RATIO * peak)
+        groups = np.split(above, np.flatnonzero(np.diff(above) > 1) + 1)
+        peaks = np.array([g[np.argmax(profile[g])] for g in groups])
+        # Une frontière nette n'a pas de voisins forts (une image inclinée ou floue étale les pics)
+        padded = np.pad(profile, 2, mode='edge')
+        peaks = peaks[np.maximum(padded[peaks], padded[peaks + 4]) < 0.5 * profile[peaks]]
+        if len(peaks) < 7:
+            return None
+        
+        best, best_score = None, 0.0
+        for i in range(len(peaks)):
+            for j in range(i + 6, len(peaks)):
+                step = (peaks[j] - peaks[i]) / 6
+                if step < self.PROFILE_MIN_STEP:
+                    continue
+                expected = peaks[i] + step * np.arange(7)
+                distances = np.abs(peaks[:, None] - expected[None, :])
+                if distances.min(axis=0).max() > max(1.5, 0.02 * step):
+                    continue
+                score = profile[peaks[distances.argmin(axis=0)]].sum()
+                if score > best_score:
+                    best, best_score = (peaks[i], step), score
+        if best is None:
+            return None
+        
+        # Le gradient d'indice p sépare les pixels p et p + 1 : la frontière est en p + 1
+        first, step = best[0] + 1, best[1]
+        return int(round(first - step)), int(round(first + 7 * step))
+    
+    def _refine_grid_lines(self, gray: np.ndarray, interval: Tuple[int, int], across: Tuple[int, int],
+                           scale: int) -> Optional[Tuple[int, int]]:
+        """
+        Recale en pleine résolution les frontières de colonnes estimées sur un niveau réduit.
+        
+        Args:
+            gray: Image pleine résolution (transposée pour les rangées)
+            interval: Intervalle [début, fin) estimé de l'échiquier, le long des colonnes
+            across: Intervalle estimé dans l'autre direction, dont seul l'intérieur est lu
+            scale: Facteur entre le niveau réduit et la pleine résolution
+            
+        Returns:
+            Intervalle [début, fin) recalé, None si une frontière est introuvable
+        """
+        start, end = interval
+        margin = (across[1] - across[0]) // 16
+        lines = slice(max(across[0] + margin, 0), min(across[1] - margin, gray.shape[0]))
+        radius = scale + 1
+        boundaries = []
+        for k in (1, 7):
+            # Le gradient d'indice p sépare les colonnes p et p + 1 : la frontière est en p + 1
+            expected = int(round(start + k * (end - start) / 8)) - 1
+            low, high = max(expected - radius, 0), min(expected + radius, gray.shape[1] - 2)
+            if high < low:
+                return None
+            band = gray[lines, low:high + 2].astype(np.int16)
+            profile = self._projection_profile(np.diff(band, axis=1), axis=0)
+            if profile.max() <= 0:
+                return None
+            boundaries.append(low + int(np.argmax(profile)) + 1)
+        
+        first, step = boundaries[0], (boundaries[1] - boundaries[0]) / 6
+        return int(round(first - step)), int(round(first + 7 * step))
+    
+    def extract_squares(self, image: ImageSource, corners: np.ndarray) -> Tuple[bool, List[np.ndarray]]:
         """Extrait les 64 cases de l'échiquier"""
         try:
             # Charge l'image
-            img = cv2.imread(image_path)
-            if img is None:
-                logger.error(f"Impossible de charger l'image : {image_path}")
+            decoded = self.load_image(image)
+            if decoded is None:
                 return False, []
-
-            # Convertit en RGB
-            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            
-            # Trie les coins pour avoir un ordre cohérent
-            corners = self._sort_corners(corners)
             
             # Calcule la matrice de perspective
-            width = height = 800  # Taille plus grande pour une meilleure qualité
-            dst_points = np.array([
-                [0, 0],
-                [width - 1, 0],
-                [width - 1, height - 1],
-                [0, height - 1]
-            ], dtype=np.float32)
+            width = height = self.WARP_SIZE  # Taille plus grande pour une meilleure qualité
+            matrix = self.perspective_transform(corners)
             
             # Applique la transformation de perspective
-            matrix = cv2.getPerspectiveTransform(corners, dst_points)
-            warped = cv2.warpPerspective(img, matrix, (width, height))
+            warped = cv2.warpPerspective(decoded.bgr, matrix, (width, height))
+            
+            # Convertit en RGB (sur l'image redressée, plus petite que l'originale)
+            warped = cv2.cvtColor(warped, cv2.COLOR_BGR2RGB)
             
             # Extrait chaque case
             square_size = width // 8
@@ -176,7 +626,7 @@ class ImageProcessor:
                     square = warped[y:y + square_size, x:x + square_size]
                     
                     # Ajoute une marge autour de la case pour éviter les effets de bord
-                    margin = square_size // 10
+                    margin = int(square_size * self.SQUARE_MARGIN_RATIO)
                     square = cv2.copyMakeBorder(
                         square,
                         margin, margin, margin, margin,
@@ -185,7 +635,7 @@ class ImageProcessor:
                     )
                     
                     # Redimensionne à la taille attendue par le modèle
-                    square = cv2.resize(square, (100, 100))
+                    square = cv2.resize(square, (self.SQUARE_SIZE, self.SQUARE_SIZE))
                     squares.append(square)
             
             return True, squares
@@ -193,6 +643,172 @@ class ImageProcessor:
         except Exception as e:
             logger.error(f"Erreur lors de l'extraction des cases : {str(e)}")
             return False, []
+    
+    def perspective_transform(self, corners: np.ndarray) -> np.ndarray:
+        """Calcule l'homographie de l'image vers l'échiquier redressé (WARP_SIZE x WARP_SIZE)"""
+        # Trie les coins pour avoir un ordre cohérent
+        corners = self._sort_corners(np.asarray(corners, dtype=np.float32).reshape(4, 2))
+        
+        size = self.WARP_SIZE
+        dst_points = np.array([
+            [0, 0],
+            [size - 1, 0],
+            [size - 1, size - 1],
+            [0, size - 1]
+        ], dtype=np.float32)
+        return cv2.getPerspectiveTransform(corners, dst_points)
+    
+    def build_square_maps(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        Construit la table cv2.remap qui produit directement les 64 cases.
+        
+        Args:
+            matrix: Homographie de l'image vers l'échiquier redressé
+            
+        Returns:
+            Table float32 (64 * SQUARE_SIZE, SQUARE_SIZE, 2) des coordonnées sources (x, y)
+        """
+        points, _ = _square_sample_grid(self.WARP_SIZE, self.SQUARE_SIZE, self.SQUARE_MARGIN_RATIO)
+        
+        # Projette chaque pixel de sortie dans l'image source
+        src = cv2.perspectiveTransform(points, np.linalg.inv(matrix))
+        return src.reshape(64 * self.SQUARE_SIZE, self.SQUARE_SIZE, 2)
+    
+    def remap_squares(self, image: np.ndarray, map1: np.ndarray, map2: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Échantillonne les 64 cases d'une image BGR en un seul appel à cv2.remap.
+        
+        Args:
+            image: Image source au format BGR
+            map1, map2: Table produite par build_square_maps, éventuellement
+                        convertie en virgule fixe par cv2.convertMaps
+            
+        Returns:
+            Lot contigu uint8 (64, SQUARE_SIZE, SQUARE_SIZE, 3) au format RGB
+        """
+        tiles = cv2.remap(image, map1, map2, cv2.INTER_LINEAR,
+                          borderMode=cv2.BORDER_CONSTANT, borderValue=(255, 255, 255))
+        cv2.cvtColor(tiles, cv2.COLOR_BGR2RGB, dst=tiles)
+        tiles = tiles.reshape(64, self.SQUARE_SIZE, self.SQUARE_SIZE, 3)
+        
+        # Remplit la marge blanche autour de chaque case, pour tout le lot à la fois
+        _, inside = _square_sample_grid(self.WARP_SIZE, self.SQUARE_SIZE, self.SQUARE_MARGIN_RATIO)
+        tiles[:, :inside.start] = 255
+        tiles[:, inside.stop:] = 255
+        tiles[:, :, :inside.start] = 255
+        tiles[:, :, inside.stop:] = 255
+        return tiles
+    
+    def slice_squares(self, image: np.ndarray, rect: Tuple[int, int, int, int]) -> np.ndarray:
+        """
+        Découpe les 64 cases d'un échiquier aligné sur les axes par simple découpage du tableau.
+        
+        L'échiquier est redimensionné une seule fois, de façon à ce que chaque
+        case ait la taille de la zone utile d'une case de sortie ; les cases
+        sont ensuite des vues de ce tableau, copiées dans le lot à l'intérieur
+        de la marge blanche.
+        
+        Args:
+            image: Image source au format BGR
+            rect: Rectangle (x, y, largeur, hauteur) de l'échiquier, en pixels
+            
+        Returns:
+            Lot contigu uint8 (64, SQUARE_SIZE, SQUARE_SIZE, 3) au format RGB,
+            identique en disposition à celui de remap_squares
+        """
+        x, y, w, h = rect
+        _, inside = _square_sample_grid(self.WARP_SIZE, self.SQUARE_SIZE, self.SQUARE_MARGIN_RATIO)
+        content = inside.stop - inside.start
+        
+        side = 8 * content
+        interpolation = cv2.INTER_AREA if min(w, h) > side else cv2.INTER_LINEAR
+        board = cv2.resize(image[y:y + h, x:x + w], (side, side), interpolation=interpolation)
+        cv2.cvtColor(board, cv2.COLOR_BGR2RGB, dst=board)
+        
+        tiles = np.full((64, self.SQUARE_SIZE, self.SQUARE_SIZE, 3), 255, dtype=np.uint8)
+        grid = tiles.reshape(8, 8, self.SQUARE_SIZE, self.SQUARE_SIZE, 3)
+        grid[:, :, inside, inside] = board.reshape(8, content, 8, content, 3).swapaxes(1, 2)
+        return tiles
+    
+    def _axis_aligned_rect(self, corners: np.ndarray, shape: Tuple[int, ...]) -> Optional[Tuple[int, int, int, int]]:
+        """Rectangle (x, y, largeur, hauteur) si les coins forment un rectangle aligné sur les axes, au pixel près"""
+        corners = self._sort_corners(np.asarray(corners, dtype=np.float32).reshape(4, 2))
+        (x0, y0), (x1, y1) = np.round(corners.min(axis=0)), np.round(corners.max(axis=0))
+        box = np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], dtype=np.float32)
+        if np.abs(corners - box).max() > 0.5:
+            return None
+        if x0 < 0 or y0 < 0 or x1 >= shape[1] or y1 >= shape[0] or x1 - x0 < 8 or y1 - y0 < 8:
+            return None
+        return int(x0), int(y0), int(x1 - x0) + 1, int(y1 - y0) + 1
+    
+    def extract_squares_batch(self, image: ImageSource, corners: np.ndarray) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Extrait les 64 cases directement dans un lot prêt pour le classifieur.
+        
+        Équivalent à extract_squares, mais sans redresser l'échiquier entier
+        ni allouer chaque case séparément : un unique cv2.remap écrit les
+        cases (marge comprise) dans un tableau contigu.
+        Si les coins forment un rectangle aligné sur les axes (capture
+        d'écran, voir locate_screenshot_board), aucune perspective n'est
+        calculée : les cases sont découpées par slice_squares.
+        
+        Args:
+            image: Image à traiter (chemin, contenu brut, tableau ou DecodedImage)
+            corners: Les 4 coins extérieurs de l'échiquier
+            
+        Returns:
+            Tuple (succès, cases)
+            - cases: Tableau uint8 (64, SQUARE_SIZE, SQUARE_SIZE, 3) RGB, None en cas d'échec
+        """
+        try:
+            decoded = self.load_image(image)
+            if decoded is None:
+                return False, None
+            
+            rect = self._axis_aligned_rect(corners, decoded.bgr.shape)
+            if rect is not None:
+                return True, self.slice_squares(decoded.bgr, rect)
+            
+            maps = self.build_square_maps(self.perspective_transform(corners))
+            return True, self.remap_squares(decoded.bgr, maps)
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de l'extraction des cases : {str(e)}")
+            return False, None
+
+    def warp_board(self, image: ImageSource, corners: np.ndarray, size: int = 256) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Redresse l'échiquier entier en une image carrée, pour le modèle d'échiquier complet.
+        
+        Args:
+            image: Image à traiter (chemin, contenu brut, tableau ou DecodedImage)
+            corners: Les 4 coins extérieurs de l'échiquier
+            size: Côté de l'image redressée, en pixels
+            
+        Returns:
+            Tuple (succès, échiquier)
+            - échiquier: Image uint8 (size, size, 3) RGB, None en cas d'échec
+        """
+        try:
+            decoded = self.load_image(image)
+            if decoded is None:
+                return False, None
+            
+            rect = self._axis_aligned_rect(corners, decoded.bgr.shape)
+            if rect is not None:
+                x, y, w, h = rect
+                interpolation = cv2.INTER_AREA if min(w, h) > size else cv2.INTER_LINEAR
+                board = cv2.resize(decoded.bgr[y:y + h, x:x + w], (size, size), interpolation=interpolation)
+            else:
+                # Homographie vers WARP_SIZE, ramenée à la taille demandée
+                ratio = (size - 1) / (self.WARP_SIZE - 1)
+                matrix = np.diag([ratio, ratio, 1.0]) @ self.perspective_transform(corners)
+                board = cv2.warpPerspective(decoded.bgr, matrix, (size, size), flags=cv2.INTER_LINEAR)
+            return True, cv2.cvtColor(board, cv2.COLOR_BGR2RGB)
+            
+        except Exception as e:
+            logger.error(f"Erreur lors du redressement de l'échiquier : {str(e)}")
+            return False, None
 
     def _sort_corners(self, corners: np.ndarray) -> np.ndarray:
         """Trie les coins dans l'ordre : haut-gauche, haut-droite, bas-droite, bas-gauche"""
@@ -0,0 +1,297 @@
+import os
+import threading
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple, Type
+
+import numpy as np
+
+from .numpy_inference import NumpyModel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = 'models'
+MODEL_NAME = 'chess_piece_classifier'
+
+class InferenceBackend(ABC):
+    """
+    Interface commune des moteurs d'inférence du classifieur de pièces.
+
+    Chaque moteur reçoit un lot prétraité float32 (N, 100, 100, 3) et renvoie
+    la matrice de probabilités (N, nombre de classes), quel que soit le
+    format du modèle chargé.
+    """
+
+    name = ''
+    extension = ''
+
+    @abstractmethod
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """Matrice de probabilités (N, nombre de classes) d'un lot prétraité (N, 100, 100, 3)"""
+
+    def warm_up(self, batch: np.ndarray):
+        """Premier appel au moteur (allocation des tenseurs, compilation), hors des requêtes"""
+        self.predict(batch)
+
+    @classmethod
+    def default_path(cls) -> str:
+        return os.path.join(MODELS_DIR, MODEL_NAME + cls.extension)
+
+class KerasBackend(InferenceBackend):
+    """
+    Modèle Keras complet (nécessite TensorFlow).
+
+    model.predict construit un adaptateur de données et déroule la mécanique
+    des callbacks à chaque appel, un coût fixe élevé pour des lots de
+    quelques cases. Le modèle est plutôt appelé par une fonction compilée
+    (tf.function) de signature fixe, une par taille de lot de buckets
+    (BUCKETS par défaut) : le lot est complété par des zéros jusqu'à la
+    taille supérieure, si bien qu'aucun retraçage n'a lieu en régime établi.
+    Les lots plus grands que la dernière taille sont découpés. Un modèle qui
+    ne reçoit jamais qu'une image à la fois (modèle d'échiquier) se contente
+    de buckets=(1,).
+    """
+
+    name = 'keras'
+    extension = '.h5'
+    BUCKETS = (1, 16, 64, 128, 256)
+
+    def __init__(self, model, buckets: Optional[Tuple[int, ...]] = None):
+        self.model = model
+        self.buckets = tuple(sorted(buckets)) if buckets else self.BUCKETS
+        self._functions = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, model_path: str, buckets: Optional[Tuple[int, ...]] = None) -> 'KerasBackend':
+        import tensorflow as tf
+        return cls(tf.keras.models.load_model(model_path), buckets=buckets)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        batch = np.asarray(batch, dtype=np.float32)
+        largest = self.buckets[-1]
+        if len(batch) > largest:
+            return np.concatenate([self.predict(batch[i:i + largest]) for i in range(0, len(batch), largest)])
+
+        count = len(batch)
+        size = next(bucket for bucket in self.buckets if bucket >= count)
+        if size != count:
+            padded = np.zeros((size,) + batch.shape[1:], dtype=np.float32)
+            padded[:count] = batch
+            batch = padded
+        return self._function(size, batch.shape[1:])(batch).numpy()[:count]
+
+    def warm_up(self, batch: np.ndarray):
+        """Trace la fonction compilée de chaque taille de lot servie par ce moteur"""
+        for size in self.buckets:
+            self._function(size, batch.shape[1:])(np.zeros((size,) + batch.shape[1:], dtype=np.float32))
+
+    def _function(self, size: int, shape: tuple):
+        """Fonction d'inférence compilée pour des lots de taille size, tracée au premier appel"""
+        with self._lock:
+            function = self._functions.get(size)
+            if function is None:
+                import tensorflow as tf
+                model = self.model
+                function = tf.function(
+                    lambda x: model(x, training=False),
+                    input_signature=[tf.TensorSpec((size,) + tuple(shape), tf.float32)],
+                ).get_concrete_function()
+                self._functions[size] = function
+            return function
+
+class OnnxBackend(InferenceBackend):
+    """Modèle exporté au format ONNX, exécuté par ONNX Runtime sur CPU"""
+
+    name = 'onnx'
+    extension = '.onnx'
+
+    def __init__(self, session):
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+
+    @classmethod
+    def load(cls, model_path: str, num_threads: Optional[int] = None) -> 'OnnxBackend':
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        return cls(ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider']))
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: np.ascontiguousarray(batch, dtype=np.float32)})[0]
+
+class TFLiteBackend(InferenceBackend):
+    """
+    Modèle exporté au format TFLite.
+
+    L'interpréteur autonome (ai_edge_litert ou tflite_runtime) est préféré à
+    celui de TensorFlow, pour ne pas charger TensorFlow dans le processus.
+    Un interpréteur TFLite n'est pas réentrant : les appels sont sérialisés.
+    Les modèles quantifiés en int8 (voir export_tflite) reçoivent et
+    renvoient des tenseurs float32, convertis selon les paramètres de
+    quantification de l'entrée et de la sortie.
+    """
+
+    name = 'tflite'
+    extension = '.tflite'
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.input = interpreter.get_input_details()[0]
+        self.output = interpreter.get_output_details()[0]
+        self._lock = threading.Lock()
+        self._batch_size = None
+
+    @classmethod
+    def load(cls, model_path: Optional[str] = None, num_threads: Optional[int] = None,
+             model_content: Optional[bytes] = None) -> 'TFLiteBackend':
+        return cls(_tflite_interpreter()(model_path=model_path, model_content=model_content, num_threads=num_threads))
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        with self._lock:
+            if self._batch_size != len(batch):
+                self.interpreter.resize_tensor_input(self.input['index'], (len(batch),) + tuple(self.input['shape'][1:]))
+                self.interpreter.allocate_tensors()
+                self._batch_size = len(batch)
+            self.interpreter.set_tensor(self.input['index'], self._quantize(batch))
+            self.interpreter.invoke()
+            return self._dequantize(self.interpreter.get_tensor(self.output['index']))
+
+    @property
+    def quantized(self) -> bool:
+        return np.issubdtype(self.input['dtype'], np.integer)
+
+    def _quantize(self, batch: np.ndarray) -> np.ndarray:
+        """Convertit l'entrée float32 au type attendu par un modèle quantifié"""
+        if not self.quantized:
+            return np.ascontiguousarray(batch, dtype=np.float32)
+        scale, zero_point = self.input['quantization']
+        info = np.iinfo(self.input['dtype'])
+        quantized = np.round(batch / scale + zero_point)
+        return np.clip(quantized, info.min, info.max).astype(self.input['dtype'])
+
+    def _dequantize(self, output: np.ndarray) -> np.ndarray:
+        """Ramène la sortie d'un modèle quantifié en probabilités float32"""
+        if not np.issubdtype(output.dtype, np.integer):
+            return output.copy()
+        scale, zero_point = self.output['quantization']
+        return ((output.astype(np.float32) - zero_point) * scale).astype(np.float32)
+
+class NumpyBackend(InferenceBackend):
+    """
+    Modèle converti au format .npz (voir numpy_inference.convert_model),
+    exécuté en NumPy pur : ni TensorFlow ni autre moteur d'inférence.
+    """
+
+    name = 'numpy'
+    extension = '.npz'
+
+    def __init__(self, model: NumpyModel):
+        self.model = model
+
+    @classmethod
+    def load(cls, model_path: str) -> 'NumpyBackend':
+        return cls(NumpyModel.load(model_path))
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self.model.predict(batch)
+
+def _tflite_interpreter():
+    """Renvoie la classe Interpreter disponible, de la plus légère à la plus lourde"""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+BACKENDS: Dict[str, Type[InferenceBackend]] = {
+    KerasBackend.name: KerasBackend,
+    OnnxBackend.name: OnnxBackend,
+    TFLiteBackend.name: TFLiteBackend,
+    NumpyBackend.name: NumpyBackend,
+}
+
+def load_backend(name: str, model_path: Optional[str] = None) -> InferenceBackend:
+    """
+    Charge un moteur d'inférence.
+
+    Args:
+        name: 'keras', 'onnx', 'tflite' ou 'numpy'
+        model_path: Chemin du modèle ; models/chess_piece_classifier.<ext> si None
+
+    Returns:
+        Le moteur chargé
+
+    Raises:
+        ValueError: Si le moteur est inconnu
+        FileNotFoundError: Si le modèle n'existe pas
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Moteur d'inférence inconnu : {name} (disponibles : {', '.join(BACKENDS)})")
+    backend_class = BACKENDS[name]
+    model_path = model_path or backend_class.default_path()
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Modèle non trouvé : {model_path}")
+    backend = backend_class.load(model_path)
+    logger.info(f"Moteur d'inférence {name} chargé depuis {model_path}")
+    return backend
+
+QUANTIZATIONS = ('float16', 'int8')
+
+def export_tflite(model, output_path: Optional[str] = None, quantization: Optional[str] = None,
+                  representative_data: Optional[np.ndarray] = None) -> bytes:
+    """
+    Convertit un modèle Keras au format TFLite.
+
+    Args:
+        model: Modèle Keras
+        output_path: Fichier de sortie (optionnel)
+        quantization: None (float32), 'float16' (poids en float16) ou 'int8'
+                      (poids, activations, entrée et sortie en int8)
+        representative_data: Lot prétraité (N, 100, 100, 3) servant à calibrer
+                             les plages des activations, requis pour 'int8'
+
+    Returns:
+        Le modèle TFLite sérialisé
+    """
+    import tensorflow as tf
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantization == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == 'int8':
+        if representative_data is None or len(representative_data) == 0:
+            raise ValueError("La quantification int8 nécessite des données représentatives")
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([sample[np.newaxis].astype(np.float32)] for sample in representative_data)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    elif quantization is not None:
+        raise ValueError(f"Quantification inconnue : {quantization} (disponibles : {', '.join(QUANTIZATIONS)})")
+
+    content = converter.convert()
+    if output_path:
+        with open(output_path, 'wb') as f:
+            f.write(content)
+    return content
+
+def export_onnx(model, output_path: str, opset: int = 13):
+    """
+    Convertit un modèle Keras au format ONNX, avec une dimension de lot variable.
+
+    Args:
+        model: Modèle Keras
+        output_path: Fichier de sortie
+        opset: Version de l'opset ONNX
+    """
+    import tensorflow as tf
+    import tf2onnx
+    spec = (tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32, name='input'),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=opset, output_path=output_path)
@@ -5,6 +5,9 @@ from tensorflow.keras import layers, models
 from PIL import Image
 from typing import Tuple, List
 import random
+from .dataset_generator import BoardDatasetGenerator
+from .piece_classifier import PieceClassifier
+from .preprocessing import BOARD_INPUT_SIZE, preprocess_batch
 
 class ChessModelTrainer:
     def __init__(self, data_dir: str = 'data/pieces'):
@@ -150,3 +153,113 @@ class ChessModelTrainer:
         )
         
         return history
+    
+    def create_board_model(self, board_size: int = BOARD_INPUT_SIZE) -> tf.keras.Model:
+        """
+        Crée le modèle d'échiquier complet : l'échiquier redressé en entrée,
+        une grille 8x8 de probabilités par classe en sortie, en une seule passe.
+        
+        Le réseau est entièrement convolutif : cinq réductions de moitié
+        ramènent l'échiquier (board_size = 8 x 32) à une grille 8x8 où chaque
+        position correspond à une case, classée par une convolution 1x1. Les
+        convolutions sont partagées entre cases voisines, au lieu d'être
+        refaites sur 64 recadrages.
+        
+        Args:
+            board_size: Côté de l'échiquier en entrée, multiple de 32
+        """
+        if board_size % 32:
+            raise ValueError(f"La taille de l'échiquier doit être un multiple de 32 : {board_size}")
+        
+        model = models.Sequential([
+            layers.Input(shape=(board_size, board_size, 3)),
+            layers.Conv2D(32, (3, 3), padding='same', activation='relu'),
+            layers.MaxPooling2D((2, 2)),
+            layers.Conv2D(64, (3, 3), padding='same', activation='relu'),
+            layers.MaxPooling2D((2, 2)),
+            layers.Conv2D(64, (3, 3), padding='same', activation='relu'),
+            layers.MaxPooling2D((2, 2)),
+            layers.Conv2D(128, (3, 3), padding='same', activation='relu'),
+            layers.MaxPooling2D((2, 2)),
+            layers.Conv2D(128, (3, 3), padding='same', activation='relu'),
+            layers.MaxPooling2D((2, 2)),
+            layers.Dropout(0.3),
+            layers.Conv2D(len(PieceClassifier.PIECES), (1, 1), activation='softmax')
+        ])
+        
+        model.compile(
+            optimizer='adam',
+            loss='sparse_categorical_crossentropy',
+            metrics=['accuracy']
+        )
+        
+        return model
+    
+    def prepare_board_dataset(self, samples: int = 2000, validation_split: float = 0.2,
+                              board_size: int = BOARD_INPUT_SIZE,
+                              seed: int = 42) -> Tuple[tf.data.Dataset, tf.data.Dataset]:
+        """
+        Génère les datasets d'entraînement et de validation du modèle d'échiquier.
+        
+        Args:
+            samples: Nombre d'échiquiers rendus
+            validation_split: Proportion des données à utiliser pour la validation
+            board_size: Côté des échiquiers
+            seed: Graine des positions générées
+            
+        Returns:
+            Dataset d'entraînement et dataset de validation
+        """
+        generator = BoardDatasetGenerator(sprites_dir=self.data_dir, size=board_size, seed=seed)
+        boards, labels = generator.generate(samples)
+        # Même prétraitement qu'à l'inférence (PieceClassifier en mode board)
+        images = preprocess_batch(boards, size=board_size)
+        
+        split_idx = int(len(images) * (1 - validation_split))
+        train_ds = tf.data.Dataset.from_tensor_slices((images[:split_idx], labels[:split_idx]))
+        val_ds = tf.data.Dataset.from_tensor_slices((images[split_idx:], labels[split_idx:]))
+        
+        BATCH_SIZE = 16
+        train_ds = train_ds.shuffle(1000).batch(BATCH_SIZE).prefetch(tf.data.AUTOTUNE)
+        val_ds = val_ds.batch(BATCH_SIZE).prefetch(tf.data.AUTOTUNE)
+        
+        return train_ds, val_ds
+    
+    def train_board_model(self, epochs: int = 20, samples: int = 2000,
+                          model_path: str = 'models/chess_board_classifier.h5',
+                          board_size: int = BOARD_INPUT_SIZE):
+        """
+        Entraîne le modèle d'échiquier complet sur des positions rendues.
+        
+        Args:
+            epochs: Nombre d'époques d'entraînement
+            samples: Nombre d'échiquiers générés
+            model_path: Chemin où sauvegarder le modèle
+            board_size: Côté des échiquiers
+        """
+        os.makedirs(os.path.dirname(model_path), exist_ok=True)
+        
+        train_ds, val_ds = self.prepare_board_dataset(samples, board_size=board_size)
+        model = self.create_board_model(board_size)
+        
+        callbacks = [
+            tf.keras.callbacks.ModelCheckpoint(
+                model_path,
+                save_best_only=True,
+                monitor='val_accuracy'
+            ),
+            tf.keras.callbacks.EarlyStopping(
+                monitor='val_accuracy',
+                patience=3,
+                restore_best_weights=True
+            )
+        ]
+        
+        history = model.fit(
+            train_ds,
+            validation_data=val_ds,
+            epochs=epochs,
+            callbacks=callbacks
+        )
+        
+        return history
@@ -0,0 +1,239 @@
+import json
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# Couches Keras prises en charge
+SUPPORTED_LAYERS = ('InputLayer', 'Conv2D', 'MaxPooling2D', 'Flatten', 'Dense', 'Dropout',
+                    'Activation', 'BatchNormalization', 'GlobalAveragePooling2D')
+
+SMALL_CHANNELS = 8  # En dessous, une convolution passe par einsum sur les fenêtres
+CHUNK_SIZE = 4  # Images traitées à la fois par les convolutions à nombreux canaux
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    x = x - x.max(axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=-1, keepdims=True)
+    return x
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0, out=x),
+    'sigmoid': lambda x: 1 / (1 + np.exp(-x)),
+    'tanh': np.tanh,
+    'softmax': _softmax,
+}
+
+def _same_padding(size: int, kernel: int, stride: int) -> Tuple[int, int]:
+    """Marges (avant, après) du padding 'same' de Keras pour une dimension"""
+    out = -(-size // stride)
+    total = max((out - 1) * stride + kernel - size, 0)
+    return total // 2, total - total // 2
+
+def _pad(x: np.ndarray, kernel: Tuple[int, int], strides: Tuple[int, int], value: float = 0.0) -> np.ndarray:
+    top, bottom = _same_padding(x.shape[1], kernel[0], strides[0])
+    left, right = _same_padding(x.shape[2], kernel[1], strides[1])
+    if top == bottom == left == right == 0:
+        return x
+    return np.pad(x, ((0, 0), (top, bottom), (left, right), (0, 0)), constant_values=value)
+
+def conv2d(x: np.ndarray, kernel: np.ndarray, bias: np.ndarray, strides: Tuple[int, int] = (1, 1),
+           padding: str = 'valid') -> np.ndarray:
+    """
+    Convolution 2D NHWC, équivalente à keras.layers.Conv2D.
+
+    Avec peu de canaux d'entrée (première couche), im2col est une vue des
+    fenêtres (sliding_window_view) contractée avec le noyau par einsum.
+    Sinon, la contraction est découpée par position du noyau : chaque
+    position est un produit matriciel (BLAS) accumulé dans la sortie, par
+    paquets de CHUNK_SIZE images pour rester dans le cache.
+
+    Args:
+        x: Lot float32 (N, H, W, C)
+        kernel: Noyau (kh, kw, C, F)
+        bias: Biais (F,)
+        strides: Pas vertical et horizontal
+        padding: 'valid' ou 'same'
+
+    Returns:
+        Lot float32 (N, H', W', F)
+    """
+    kh, kw, channels, filters = kernel.shape
+    sh, sw = strides
+    if padding == 'same':
+        x = _pad(x, (kh, kw), strides)
+    n, h, w, _ = x.shape
+    oh, ow = (h - kh) // sh + 1, (w - kw) // sw + 1
+
+    if channels < SMALL_CHANNELS:
+        windows = sliding_window_view(x, (kh, kw), axis=(1, 2))[:, ::sh, ::sw]
+        out = np.einsum('nhwcij,ijcf->nhwf', windows, kernel, optimize=True)
+    else:
+        out = np.zeros((n, oh, ow, filters), dtype=np.float32)
+        for start in range(0, n, CHUNK_SIZE):
+            chunk, target = x[start:start + CHUNK_SIZE], out[start:start + CHUNK_SIZE]
+            for i in range(kh):
+                for j in range(kw):
+                    target += chunk[:, i:i + sh * (oh - 1) + 1:sh, j:j + sw * (ow - 1) + 1:sw] @ kernel[i, j]
+    out += bias
+    return out
+
+def max_pool2d(x: np.ndarray, pool_size: Tuple[int, int], strides: Tuple[int, int],
+               padding: str = 'valid') -> np.ndarray:
+    """Max pooling NHWC, équivalent à keras.layers.MaxPooling2D"""
+    ph, pw = pool_size
+    if padding == 'same':
+        x = _pad(x, pool_size, strides, value=-np.inf)
+    h, w = x.shape[1:3]
+    if tuple(strides) == tuple(pool_size):
+        # Fenêtres disjointes : maximum élément par élément des ph x pw sous-grilles décalées,
+        # plus rapide qu'une réduction sur un tableau remis en forme
+        oh, ow = h // ph, w // pw
+        out = x[:, 0:oh * ph:ph, 0:ow * pw:pw].copy()
+        for i in range(ph):
+            for j in range(pw):
+                if i or j:
+                    np.maximum(out, x[:, i:oh * ph:ph, j:ow * pw:pw], out=out)
+        return out
+    windows = sliding_window_view(x, (ph, pw), axis=(1, 2))[:, ::strides[0], ::strides[1]]
+    return windows.max(axis=(-2, -1))
+
+class NumpyModel:
+    """
+    Exécute en NumPy pur un modèle séquentiel Keras converti (voir convert_model).
+
+    Seules les couches de SUPPORTED_LAYERS sont prises en charge, ce qui
+    couvre les CNN de PieceClassifier et de ChessModelTrainer. Aucun import
+    de TensorFlow n'est nécessaire pour charger le fichier .npz ni pour
+    l'inférence ; les couches de normalisation sont réduites à une mise à
+    l'échelle et un décalage lors de la conversion.
+    """
+
+    def __init__(self, layers: List[dict], weights: Dict[str, np.ndarray], input_shape: Tuple[int, ...]):
+        """
+        Initialise le modèle.
+
+        Args:
+            layers: Configuration des couches, dans l'ordre
+            weights: Poids float32, sous les clés '<indice>/<nom>'
+            input_shape: Forme d'une entrée, sans la dimension du lot
+        """
+        self.layers = layers
+        self.weights = weights
+        self.input_shape = tuple(input_shape)
+
+    @classmethod
+    def load(cls, path: str) -> 'NumpyModel':
+        """Charge un modèle écrit par convert_model"""
+        with np.load(path, allow_pickle=False) as data:
+            config = json.loads(str(data['config']))
+            if config.get('version') != FORMAT_VERSION:
+                raise ValueError(f"Version de format non prise en charge : {config.get('version')}")
+            weights = {key: data[key].astype(np.float32) for key in data.files if key != 'config'}
+        return cls(config['layers'], weights, config['input_shape'])
+
+    def save(self, path: str):
+        config = json.dumps({'version': FORMAT_VERSION, 'input_shape': list(self.input_shape), 'layers': self.layers})
+        np.savez(path, config=np.array(config), **self.weights)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Passe avant sur un lot.
+
+        Args:
+            batch: Lot float32 (N,) + input_shape
+
+        Returns:
+            Sortie de la dernière couche, float32
+        """
+        x = np.ascontiguousarray(batch, dtype=np.float32)
+        for index, layer in enumerate(self.layers):
+            x = self._apply(index, layer, x)
+        return x
+
+    def _apply(self, index: int, layer: dict, x: np.ndarray) -> np.ndarray:
+        kind = layer['type']
+        if kind == 'Conv2D':
+            x = conv2d(x, self.weights[f'{index}/kernel'], self.weights[f'{index}/bias'],
+                       tuple(layer['strides']), layer['padding'])
+        elif kind == 'Dense':
+            x = x @ self.weights[f'{index}/kernel'] + self.weights[f'{index}/bias']
+        elif kind == 'MaxPooling2D':
+            return max_pool2d(x, tuple(layer['pool_size']), tuple(layer['strides']), layer['padding'])
+        elif kind == 'BatchNormalization':
+            return x * self.weights[f'{index}/scale'] + self.weights[f'{index}/shift']
+        elif kind == 'Flatten':
+            return x.reshape(len(x), -1)
+        elif kind == 'GlobalAveragePooling2D':
+            return x.mean(axis=(1, 2))
+        elif kind in ('InputLayer', 'Dropout'):
+            return x
+        return ACTIVATIONS[layer.get('activation', 'linear')](x)
+
+def convert_model(model, output_path: str) -> NumpyModel:
+    """
+    Convertit un modèle séquentiel Keras au format .npz de NumpyModel.
+
+    Seule la conversion utilise le modèle Keras (et donc TensorFlow) ;
+    le fichier produit se charge avec NumPy seul.
+
+    Args:
+        model: Modèle Keras séquentiel
+        output_path: Fichier .npz de sortie
+
+    Returns:
+        Le modèle converti
+
+    Raises:
+        ValueError: Si une couche ou une option n'est pas prise en charge
+    """
+    layers: List[dict] = []
+    weights: Dict[str, np.ndarray] = {}
+    for index, layer in enumerate(model.layers):
+        kind = type(layer).__name__
+        if kind not in SUPPORTED_LAYERS:
+            raise ValueError(f"Couche non prise en charge : {layer.name} ({kind})")
+        config = layer.get_config()
+        entry = {'type': kind}
+
+        if kind in ('Conv2D', 'Dense'):
+            if kind == 'Conv2D' and (tuple(config['dilation_rate']) != (1, 1) or config.get('groups', 1) != 1
+                                     or config.get('data_format', 'channels_last') != 'channels_last'):
+                raise ValueError(f"Options de convolution non prises en charge : {layer.name}")
+            kernel = layer.get_weights()[0]
+            bias = layer.get_weights()[1] if config['use_bias'] else np.zeros(kernel.shape[-1])
+            weights[f'{index}/kernel'] = kernel.astype(np.float32)
+            weights[f'{index}/bias'] = bias.astype(np.float32)
+            entry['activation'] = config['activation']
+            if kind == 'Conv2D':
+                entry.update(strides=list(config['strides']), padding=config['padding'])
+        elif kind == 'MaxPooling2D':
+            strides = config['strides'] or config['pool_size']
+            entry.update(pool_size=list(config['pool_size']), strides=list(strides), padding=config['padding'])
+        elif kind == 'BatchNormalization':
+            if config['axis'] not in (-1, [-1], len(layer.input.shape) - 1, [len(layer.input.shape) - 1]):
+                raise ValueError(f"Normalisation hors du dernier axe non prise en charge : {layer.name}")
+            # Normalisation d'inférence réduite à x * scale + shift
+            gamma = np.asarray(layer.gamma) if layer.gamma is not None else 1.0
+            beta = np.asarray(layer.beta) if layer.beta is not None else 0.0
+            scale = gamma / np.sqrt(np.asarray(layer.moving_variance) + config['epsilon'])
+            weights[f'{index}/scale'] = np.asarray(scale, dtype=np.float32)
+            weights[f'{index}/shift'] = np.asarray(beta - np.asarray(layer.moving_mean) * scale, dtype=np.float32)
+        elif kind == 'Activation':
+            entry['activation'] = config['activation']
+
+        if entry.get('activation', 'linear') not in ACTIVATIONS:
+            raise ValueError(f"Activation non prise en charge : {entry['activation']} ({layer.name})")
+        layers.append(entry)
+
+    converted = NumpyModel(layers, weights, model.input_shape[1:])
+    converted.save(output_path)
+    logger.info(f"Modèle converti vers {output_path} ({len(layers)} couches)")
+    return converted
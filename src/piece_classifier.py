@@ -1,9 +1,18 @@
 import cv2
 import numpy as np
-import tensorflow as tf
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Union, TYPE_CHECKING
 import logging
 import os
+import time
+from .debug_sink import DebugSink
+from .batching import DynamicBatcher
+from .prediction_cache import PredictionCache
+from .empty_filter import EmptySquareFilter
+from . import preprocessing
+from .inference_backends import InferenceBackend, KerasBackend, load_backend
+
+if TYPE_CHECKING:
+    import tensorflow as tf
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,27 +29,89 @@ class PieceClassifier:
         6: 'R'   # Rook (Tour)
     }
     
-    def __init__(self, model_path: Optional[str] = None):
+    # Taille d'entrée attendue par le modèle
+    INPUT_SIZE = preprocessing.INPUT_SIZE
+    # Côté de l'échiquier redressé attendu par le modèle d'échiquier
+    BOARD_INPUT_SIZE = preprocessing.BOARD_INPUT_SIZE
+    BOARD_MODEL_PATH = os.path.join('models', 'chess_board_classifier.h5')
+    
+    # En dessous de ce seuil de confiance, la case est considérée vide
+    CONFIDENCE_THRESHOLD = 0.3
+    
+    def __init__(self, model_path: Optional[str] = None, debug_sink: Optional[DebugSink] = None,
+                 backend: str = 'keras', cache: Optional[PredictionCache] = None,
+                 empty_filter: Optional[EmptySquareFilter] = None, board_model_path: Optional[str] = None):
         """
         Initialise le classifieur de pièces.
         Si model_path est None, cherche le modèle dans le dossier models.
+        Les images de debug sont envoyées à debug_sink s'il est fourni.
+        
+        backend choisit le moteur d'inférence ('keras', 'onnx', 'tflite' ou
+        'numpy', voir inference_backends) ; seul 'keras' importe TensorFlow.
+        Les modèles ONNX, TFLite et NumPy (.npz) sont produits par
+        scripts/export_model.py.
+        
+        Si cache est fourni, les cases déjà vues ne repassent ni par le
+        prétraitement ni par le modèle (voir PredictionCache). De même pour
+        les cases que empty_filter déclare vides (voir EmptySquareFilter).
+        
+        Si board_model_path est fourni, le modèle d'échiquier complet (voir
+        ChessModelTrainer.create_board_model) est chargé : classify_board_image
+        classe alors les 64 cases d'un échiquier redressé en une seule passe,
+        et mode vaut 'board'.
         """
+        self.debug_sink = debug_sink
+        self.batcher: Optional[DynamicBatcher] = None
+        self.cache = cache
+        self.empty_filter = empty_filter
+        
+        self.board_backend: Optional[KerasBackend] = None
+        if board_model_path is not None:
+            try:
+                # Un seul échiquier par requête : seule la taille de lot 1 est tracée
+                self.board_backend = KerasBackend.load(board_model_path, buckets=(1,))
+                logger.info(f"Modèle d'échiquier chargé depuis {board_model_path}")
+            except Exception as e:
+                logger.error(f"Erreur lors du chargement du modèle d'échiquier : {str(e)}, classification case par case")
+        
+        self.backend: InferenceBackend
+        if backend != KerasBackend.name:
+            try:
+                self.backend = load_backend(backend, model_path)
+                return
+            except Exception as e:
+                logger.error(f"Erreur lors du chargement du moteur {backend} : {str(e)}, repli sur keras")
+                model_path = None
+        
         if model_path is None:
-            model_path = os.path.join('models', 'chess_piece_classifier.h5')
+            model_path = KerasBackend.default_path()
         
         if os.path.exists(model_path):
             try:
-                self.model = tf.keras.models.load_model(model_path)
+                self.backend = load_backend(KerasBackend.name, model_path)
                 logger.info(f"Modèle chargé depuis {model_path}")
             except Exception as e:
                 logger.error(f"Erreur lors du chargement du modèle : {str(e)}")
-                self.model = self._create_default_model()
+                self.backend = KerasBackend(self._create_default_model())
         else:
             logger.warning(f"Modèle non trouvé à {model_path}, création d'un modèle par défaut")
-            self.model = self._create_default_model()
+            self.backend = KerasBackend(self._create_default_model())
+    
+    @property
+    def mode(self) -> str:
+        """'board' si le modèle d'échiquier complet est chargé, 'squares' sinon"""
+        return 'board' if self.board_backend is not None else 'squares'
+    
+    @property
+    def model(self) -> 'tf.keras.Model':
+        """Modèle Keras sous-jacent (uniquement avec le moteur keras)"""
+        if not isinstance(self.backend, KerasBackend):
+            raise AttributeError(f"Le moteur {self.backend.name} n'expose pas de modèle Keras")
+        return self.backend.model
             
-    def _create_default_model(self) -> tf.keras.Model:
+    def _create_default_model(self) -> 'tf.keras.Model':
         """Crée un modèle CNN simple pour la classification des pièces"""
+        import tensorflow as tf
         model = tf.keras.Sequential([
             tf.keras.layers.Conv2D(32, (3, 3), activation='relu', input_shape=(100, 100, 3)),
             tf.keras.layers.MaxPooling2D((2, 2)),
@@ -58,6 +129,7 @@ class PieceClassifier:
     
     def create_model(self, num_classes):
         """Crée un nouveau modèle CNN avec une architecture améliorée"""
+        import tensorflow as tf
         model = tf.keras.Sequential([
             # Premier bloc convolutif
             tf.keras.layers.Conv2D(64, (3, 3), padding='same', input_shape=(100, 100, 3)),
@@ -115,38 +187,9 @@ class PieceClassifier:
         return model
         
     def preprocess_image(self, img: np.ndarray) -> np.ndarray:
-        """Prétraite une image pour la classification"""
+        """Prétraite une image pour la classification (voir preprocessing.preprocess_batch)"""
         try:
-            # Convert RGBA to RGB if necessary
-            if img.shape[-1] == 4:
-                img = cv2.cvtColor(img, cv2.COLOR_RGBA2RGB)
-            elif len(img.shape) == 2:  # Grayscale
-                img = cv2.cvtColor(img, cv2.COLOR_GRAY2RGB)
-                
-            # Resize
-            img = cv2.resize(img, (100, 100))
-            
-            # Enhance contrast using CLAHE
-            lab = cv2.cvtColor(img, cv2.COLOR_RGB2LAB)
-            l, a, b = cv2.split(lab)
-            clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-            cl = clahe.apply(l)
-            enhanced = cv2.merge((cl,a,b))
-            img = cv2.cvtColor(enhanced, cv2.COLOR_LAB2RGB)
-            
-            # Add additional preprocessing steps
-            # 1. Gaussian blur to reduce noise
-            img = cv2.GaussianBlur(img, (3, 3), 0)
-            
-            # 2. Normalize pixel values
-            img = img.astype(np.float32) / 255.0
-            
-            # 3. Standardize
-            mean = np.mean(img)
-            std = np.std(img)
-            img = (img - mean) / (std + 1e-7)
-            
-            return img
+            return preprocessing.preprocess_batch([img])[0]
             
         except Exception as e:
             logger.error(f"Erreur lors du prétraitement de l'image : {str(e)}")
@@ -155,11 +198,11 @@ class PieceClassifier:
     def classify_square(self, image: np.ndarray, debug_prefix: Optional[str] = None) -> Tuple[str, float]:
         """Classifie une case de l'échiquier"""
         try:
+            debug = bool(debug_prefix) and self.debug_sink is not None
+            
             # Sauvegarde l'image originale pour le debug
-            if debug_prefix:
-                debug_dir = os.path.join('debug', 'squares')
-                os.makedirs(debug_dir, exist_ok=True)
-                cv2.imwrite(os.path.join(debug_dir, f'{debug_prefix}_original.png'), image)
+            if debug:
+                self.debug_sink.submit(debug_prefix, 'original', image)
             
             # Prétraite l'image
             processed = self.preprocess_image(image)
@@ -167,16 +210,16 @@ class PieceClassifier:
                 return 'empty', 0.0
                 
             # Sauvegarde l'image prétraitée pour le debug
-            if debug_prefix:
+            if debug:
                 processed_debug = (processed * 255).astype(np.uint8)
-                cv2.imwrite(os.path.join(debug_dir, f'{debug_prefix}_processed.png'), 
-                           cv2.cvtColor(processed_debug, cv2.COLOR_RGB2BGR))
+                self.debug_sink.submit(debug_prefix, 'processed',
+                                       cv2.cvtColor(processed_debug, cv2.COLOR_RGB2BGR))
             
             # Prépare l'image pour le modèle
             processed = np.expand_dims(processed, axis=0)
             
             # Fait la prédiction
-            predictions = self.model.predict(processed, verbose=0)[0]
+            predictions = self.predict_proba(processed)[0]
             
             # Log les probabilités pour chaque classe
             logger.info("Prédictions pour la case :")
@@ -185,10 +228,7 @@ class PieceClassifier:
             
             # Trouve la classe avec la plus haute probabilité
             max_prob = np.max(predictions)
-            if max_prob < 0.3:  # Augmente le seuil de confiance à 30%
-                predicted_class = 'empty'
-            else:
-                predicted_class = list(self.PIECES.values())[np.argmax(predictions)]
+            predicted_class = self.decode_predictions(predictions[np.newaxis])[0]
             
             logger.info(f"Classe choisie : {predicted_class} (confiance : {max_prob*100:.2f}%)")
             
@@ -198,21 +238,191 @@ class PieceClassifier:
             logger.error(f"Erreur lors de la classification : {str(e)}")
             return 'empty', 0.0
     
-    def classify_board(self, squares: List[np.ndarray]) -> List[str]:
+    def preprocess_batch(self, squares: Union[List[np.ndarray], np.ndarray], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Prétraite un lot de cases en un unique tenseur.
+        
+        Args:
+            squares: Liste d'images de cases ou tableau (N, H, W, 3)
+            out: Tampon float32 (N, 100, 100, 3) préalloué (optionnel)
+            
+        Returns:
+            Tenseur float32 de forme (N, 100, 100, 3)
+        """
+        return preprocessing.preprocess_batch(squares, out=out)
+    
+    def predict_proba(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Exécute une seule passe du modèle sur un lot prétraité.
+        
+        Args:
+            batch: Tenseur float32 de forme (N, 100, 100, 3)
+            
+        Returns:
+            Matrice de probabilités de forme (N, nombre de classes)
+        """
+        if len(batch) == 0:
+            return np.zeros((0, len(self.PIECES)), dtype=np.float32)
+        return self.backend.predict(batch)
+    
+    def warm_up(self, batch_size: int = 64) -> float:
+        """
+        Passe un lot factice dans le prétraitement et le modèle.
+        
+        Le premier appel au modèle paie l'initialisation du moteur (traçage du
+        graphe de chaque taille de lot, allocation des tenseurs) ; il est
+        fait ici plutôt que pendant la première requête. Le cache, le filtre
+        des cases vides et le regroupeur sont contournés.
+        
+        Returns:
+            Durée du préchauffage en millisecondes
+        """
+        start = time.perf_counter()
+        squares = np.random.RandomState(0).randint(0, 256, (batch_size, self.INPUT_SIZE, self.INPUT_SIZE, 3), dtype=np.uint8)
+        self.backend.warm_up(self.preprocess_batch(squares))
+        if self.board_backend is not None:
+            board = np.zeros((1, self.BOARD_INPUT_SIZE, self.BOARD_INPUT_SIZE, 3), dtype=np.float32)
+            self.board_backend.warm_up(board)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Classifieur préchauffé en {elapsed_ms:.0f} ms ({batch_size} cases)")
+        return elapsed_ms
+    
+    def enable_batching(self, max_batch_size: int = 256, max_wait_ms: float = 5.0) -> DynamicBatcher:
+        """
+        Regroupe les appels au modèle des requêtes concurrentes (voir DynamicBatcher).
+        
+        Le prétraitement reste exécuté dans le thread de chaque requête ; seule
+        la passe du modèle est mutualisée.
+        
+        Args:
+            max_batch_size: Nombre maximal de cases par appel au modèle
+            max_wait_ms: Attente maximale d'autres requêtes, en millisecondes
+            
+        Returns:
+            Le regroupeur utilisé par classify_batch
+        """
+        self.batcher = DynamicBatcher(self.predict_proba, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        return self.batcher
+    
+    def decode_predictions(self, probabilities: np.ndarray) -> List[str]:
+        """Convertit une matrice de probabilités en noms de pièces"""
+        labels = np.array(list(self.PIECES.values()), dtype=object)
+        predicted = labels[np.argmax(probabilities, axis=1)]
+        predicted[np.max(probabilities, axis=1) < self.CONFIDENCE_THRESHOLD] = 'empty'
+        return predicted.tolist()
+    
+    def classify_batch(self, squares: Union[List[np.ndarray], np.ndarray]) -> Tuple[List[str], np.ndarray]:
+        """
+        Classifie un lot de cases en un seul appel au modèle.
+        
+        Args:
+            squares: Liste d'images de cases ou tableau (N, H, W, 3)
+            
+        Returns:
+            Tuple (pièces, probabilités)
+            - pièces: Liste des N noms de pièces prédits
+            - probabilités: Matrice (N, nombre de classes) renvoyée par le modèle
+        """
+        probabilities = np.empty((len(squares), len(self.PIECES)), dtype=np.float32)
+        pending = np.arange(len(squares))
+        
+        # Cases vides avec certitude : probabilité 1 pour la classe vide, sans prétraitement
+        if self.empty_filter is not None and len(squares):
+            empty = self.empty_filter.predict(squares)
+            probabilities[empty] = np.eye(len(self.PIECES), dtype=np.float32)[self._empty_index]
+            pending = np.flatnonzero(~empty)
+            logger.debug(f"Filtre des cases vides : {int(empty.sum())}/{len(squares)} cases sans inférence")
+        
+        if len(pending):
+            probabilities[pending] = self._predict_squares([squares[i] for i in pending])
+        return self.decode_predictions(probabilities), probabilities
+    
+    @property
+    def _empty_index(self) -> int:
+        return list(self.PIECES.values()).index('empty')
+    
+    def _predict_squares(self, squares: List[np.ndarray]) -> np.ndarray:
+        """Probabilités des cases, en passant par le cache des prédictions s'il est actif"""
+        if self.cache is None:
+            return self._run_model(squares)
+        
+        keys = self.cache.keys(squares)
+        cached = self.cache.get_many(keys)
+        probabilities = np.empty((len(squares), len(self.PIECES)), dtype=np.float32)
+        
+        # Une seule inférence par contenu absent du cache, même répété dans le lot
+        missing = {}
+        for i, (key, row) in enumerate(zip(keys, cached)):
+            if row is not None:
+                probabilities[i] = row
+            else:
+                missing.setdefault(key, []).append(i)
+        
+        if missing:
+            first = [indices[0] for indices in missing.values()]
+            computed = self._run_model([squares[i] for i in first])
+            self.cache.put_many(list(missing), computed)
+            for indices, row in zip(missing.values(), computed):
+                probabilities[indices] = row
+        
+        logger.debug(f"Cache des prédictions : {len(squares) - len(missing)}/{len(squares)} cases sans inférence")
+        return probabilities
+    
+    def _run_model(self, squares: Union[List[np.ndarray], np.ndarray]) -> np.ndarray:
+        """Prétraite les cases et les passe dans le modèle, via le regroupeur s'il est actif"""
+        batch = self.preprocess_batch(squares)
+        if self.batcher is not None:
+            return self.batcher.predict_proba(batch)
+        return self.predict_proba(batch)
+    
+    def classify_board(self, squares: Union[List[np.ndarray], np.ndarray], debug_prefix: Optional[str] = None) -> List[str]:
         """Classifie toutes les cases d'un échiquier"""
         try:
             if len(squares) != 64:
                 raise ValueError(f"Expected 64 squares, got {len(squares)}")
             
-            pieces = []
-            for i, square in enumerate(squares):
-                piece, _ = self.classify_square(square)
-                pieces.append(piece)
-                if (i + 1) % 8 == 0:
-                    logger.debug(f"Rang {i//8 + 1} : {' '.join(pieces[-8:])}")
+            # Une seule mosaïque 8x8 des cases pour le debug, plutôt que 64 fichiers
+            if debug_prefix and self.debug_sink is not None:
+                mosaic = np.vstack([np.hstack(squares[rank * 8:(rank + 1) * 8]) for rank in range(8)])
+                self.debug_sink.submit(debug_prefix, 'squares', cv2.cvtColor(mosaic, cv2.COLOR_RGB2BGR))
+            
+            pieces, _ = self.classify_batch(squares)
+            for rank in range(8):
+                logger.debug(f"Rang {rank + 1} : {' '.join(pieces[rank * 8:(rank + 1) * 8])}")
             
             return pieces
             
         except Exception as e:
             logger.error(f"Erreur lors de la classification de l'échiquier : {str(e)}")
             return ['empty'] * 64  # Par défaut, retourne un échiquier vide
+    
+    def classify_board_image(self, board: np.ndarray, debug_prefix: Optional[str] = None) -> List[str]:
+        """
+        Classifie les 64 cases d'un échiquier redressé en une seule passe du modèle d'échiquier.
+        
+        Args:
+            board: Échiquier redressé uint8 RGB (voir ImageProcessor.warp_board),
+                   redimensionné si besoin à BOARD_INPUT_SIZE
+            debug_prefix: Préfixe des images de debug (optionnel)
+            
+        Returns:
+            Liste des 64 pièces, de a8 à h1 comme classify_board
+        """
+        try:
+            if self.board_backend is None:
+                raise RuntimeError("Aucun modèle d'échiquier chargé")
+            
+            if debug_prefix and self.debug_sink is not None:
+                self.debug_sink.submit(debug_prefix, 'board', cv2.cvtColor(board, cv2.COLOR_RGB2BGR))
+            
+            batch = preprocessing.preprocess_batch([board], size=self.BOARD_INPUT_SIZE)
+            probabilities = self.board_backend.predict(batch)
+            pieces = self.decode_predictions(probabilities.reshape(64, len(self.PIECES)))
+            for rank in range(8):
+                logger.debug(f"Rang {rank + 1} : {' '.join(pieces[rank * 8:(rank + 1) * 8])}")
+            
+            return pieces
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la classification de l'échiquier : {str(e)}")
+            return ['empty'] * 64
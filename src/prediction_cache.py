@@ -0,0 +1,180 @@
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Union
+
+import cv2
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class PredictionCache:
+    """
+    Cache LRU des probabilités du classifieur, adressé par le contenu des cases.
+
+    La clé d'une case est calculée sur ses pixels bruts (avant prétraitement) :
+    - 'exact' : empreinte blake2b d'une vignette réduite ; seules des cases
+      identiques (mêmes sprites d'un thème de site, cases vides) partagent
+      une entrée.
+    - 'phash' : hachage perceptuel de 64 bits (signe des basses fréquences de
+      la DCT par rapport à leur médiane) et couleur moyenne. Une case absente
+      réutilise l'entrée la plus proche si au plus PHASH_MAX_DISTANCE bits
+      diffèrent et si les couleurs moyennes sont proches, ce qui tolère le
+      bruit de compression et de légers décalages.
+
+    La mémoire occupée est bornée par max_bytes : au-delà, les entrées les
+    moins récemment utilisées sont évincées.
+    """
+
+    MODES = ('exact', 'phash')
+    THUMBNAIL_SIZE = 16  # Côté de la vignette hachée en mode exact
+    PHASH_SIZE = 32  # Côté de l'image transformée par la DCT en mode phash
+    PHASH_MAX_DISTANCE = 5  # Bits différents tolérés entre deux hachages perceptuels
+    COLOR_TOLERANCE = 8  # Écart maximal de la couleur moyenne, par canal
+    ENTRY_OVERHEAD = 200  # Estimation du coût mémoire d'une entrée, hors probabilités
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, mode: str = 'exact'):
+        """
+        Initialise le cache.
+
+        Args:
+            max_bytes: Mémoire maximale occupée par les entrées
+            mode: 'exact' ou 'phash'
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Mode de cache inconnu : {mode} (disponibles : {', '.join(self.MODES)})")
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self._entries: 'OrderedDict[bytes, np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Index des hachages perceptuels, pour la recherche par distance de Hamming
+        self._slots: Dict[bytes, int] = {}
+        self._slot_keys: List[Optional[bytes]] = []
+        self._free: List[int] = []
+        self._hashes = np.zeros((0, 8), dtype=np.uint8)
+        self._colors = np.zeros((0, 3), dtype=np.int16)
+        self._used = np.zeros(0, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def key(self, square: np.ndarray) -> bytes:
+        """Calcule la clé d'une case (image uint8 RGB)"""
+        if self.mode == 'phash':
+            return self._phash(square)
+        size = self.THUMBNAIL_SIZE
+        thumbnail = cv2.resize(square, (size, size), interpolation=cv2.INTER_AREA)
+        return hashlib.blake2b(thumbnail.tobytes(), digest_size=16).digest()
+
+    def keys(self, squares: Union[Sequence[np.ndarray], np.ndarray]) -> List[bytes]:
+        return [self.key(square) for square in squares]
+
+    def _phash(self, square: np.ndarray) -> bytes:
+        """8 octets de hachage perceptuel suivis de la couleur moyenne (3 × int16)"""
+        gray = square if square.ndim == 2 else cv2.cvtColor(square, cv2.COLOR_RGB2GRAY)
+        small = cv2.resize(gray, (self.PHASH_SIZE, self.PHASH_SIZE), interpolation=cv2.INTER_AREA)
+        low = cv2.dct(small.astype(np.float32))[:8, :8].ravel()
+        bits = np.packbits(low > np.median(low[1:]))
+        # Le hachage ignore la luminosité moyenne : la couleur distingue une case claire d'une case foncée
+        color = np.round(cv2.mean(square)[:3]).astype(np.int16)
+        return bits.tobytes() + color.tobytes()
+
+    def get_many(self, keys: Sequence[bytes]) -> List[Optional[np.ndarray]]:
+        """
+        Cherche les probabilités de plusieurs cases.
+
+        Returns:
+            Liste alignée sur keys : le vecteur de probabilités, ou None si absent
+        """
+        results = []
+        with self._lock:
+            for key in keys:
+                if key not in self._entries and self.mode == 'phash':
+                    key = self._nearest(key)
+                probabilities = self._entries.get(key) if key is not None else None
+                if probabilities is None:
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                results.append(probabilities)
+        return results
+
+    def put_many(self, keys: Sequence[bytes], probabilities: np.ndarray):
+        """Mémorise les probabilités (une ligne par clé) et évince au-delà de max_bytes"""
+        with self._lock:
+            for key, row in zip(keys, probabilities):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    continue
+                row = np.array(row, dtype=np.float32)
+                row.setflags(write=False)
+                self._entries[key] = row
+                self.nbytes += self._entry_size(key, row)
+                if self.mode == 'phash':
+                    self._index(key)
+
+            while self.nbytes > self.max_bytes and self._entries:
+                key, row = self._entries.popitem(last=False)
+                self.nbytes -= self._entry_size(key, row)
+                self.evictions += 1
+                if self.mode == 'phash':
+                    slot = self._slots.pop(key)
+                    self._used[slot] = False
+                    self._slot_keys[slot] = None
+                    self._free.append(slot)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._slots.clear()
+            self._slot_keys = [None] * len(self._used)
+            self._free = list(range(len(self._used)))
+            self._used[:] = False
+            self.nbytes = 0
+
+    def _index(self, key: bytes):
+        """Ajoute un hachage perceptuel à l'index, en doublant sa capacité si nécessaire"""
+        if not self._free:
+            capacity = len(self._used)
+            grown = max(64, 2 * capacity)
+            self._hashes = np.concatenate([self._hashes, np.zeros((grown - capacity, 8), dtype=np.uint8)])
+            self._colors = np.concatenate([self._colors, np.zeros((grown - capacity, 3), dtype=np.int16)])
+            self._used = np.concatenate([self._used, np.zeros(grown - capacity, dtype=bool)])
+            self._slot_keys.extend([None] * (grown - capacity))
+            self._free = list(range(grown - 1, capacity - 1, -1))
+        slot = self._free.pop()
+        self._hashes[slot] = np.frombuffer(key[:8], dtype=np.uint8)
+        self._colors[slot] = np.frombuffer(key[8:], dtype=np.int16)
+        self._used[slot] = True
+        self._slots[key] = slot
+        self._slot_keys[slot] = key
+
+    def _nearest(self, key: bytes) -> Optional[bytes]:
+        """Clé de l'entrée la plus proche au sens du hachage perceptuel, None si aucune n'est assez proche"""
+        if not self._slots:
+            return None
+        hashes = np.frombuffer(key[:8], dtype=np.uint8)
+        color = np.frombuffer(key[8:], dtype=np.int16)
+        distances = np.unpackbits(self._hashes ^ hashes, axis=1).sum(axis=1)
+        close = self._used & (np.abs(self._colors - color).max(axis=1) <= self.COLOR_TOLERANCE)
+        distances[~close] = self.PHASH_MAX_DISTANCE + 1
+        slot = int(np.argmin(distances))
+        if distances[slot] > self.PHASH_MAX_DISTANCE:
+            return None
+        return self._slot_keys[slot]
+
+    def _entry_size(self, key: bytes, row: np.ndarray) -> int:
+        return len(key) + row.nbytes + self.ENTRY_OVERHEAD
@@ -0,0 +1,103 @@
+import threading
+import logging
+from typing import Optional, Sequence, Union
+
+import cv2
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INPUT_SIZE = 100  # Taille d'entrée du modèle
+BOARD_INPUT_SIZE = 256  # Côté de l'échiquier redressé, entrée du modèle d'échiquier
+CLAHE_CLIP_LIMIT = 3.0
+CLAHE_TILE_GRID = (8, 8)
+
+_local = threading.local()
+
+def _clahe() -> 'cv2.CLAHE':
+    """Instance CLAHE réutilisée, une par thread (un objet CLAHE n'est pas réentrant)"""
+    clahe = getattr(_local, 'clahe', None)
+    if clahe is None:
+        clahe = _local.clahe = cv2.createCLAHE(clipLimit=CLAHE_CLIP_LIMIT, tileGridSize=CLAHE_TILE_GRID)
+    return clahe
+
+def stack_squares(squares: Union[Sequence[np.ndarray], np.ndarray], size: int = INPUT_SIZE) -> np.ndarray:
+    """
+    Empile des cases en un lot uint8 RGB (N, size, size, 3).
+
+    Un tableau déjà au bon format est renvoyé tel quel ; sinon chaque case
+    est convertie (niveaux de gris, RGBA) et redimensionnée.
+    """
+    if isinstance(squares, np.ndarray) and squares.ndim == 4 and squares.shape[1:] == (size, size, 3) \
+            and squares.dtype == np.uint8:
+        return squares
+
+    batch = np.empty((len(squares), size, size, 3), dtype=np.uint8)
+    for i, img in enumerate(squares):
+        if img.ndim == 2:
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2RGB)
+        elif img.shape[-1] == 4:
+            img = cv2.cvtColor(img, cv2.COLOR_RGBA2RGB)
+        if img.dtype != np.uint8:
+            img = np.clip(img, 0, 255).astype(np.uint8)
+        if img.shape[:2] != (size, size):
+            img = cv2.resize(img, (size, size))
+        batch[i] = img
+    return batch
+
+def preprocess_batch(squares: Union[Sequence[np.ndarray], np.ndarray], out: Optional[np.ndarray] = None,
+                     blur: bool = True, standardize: bool = True, size: int = INPUT_SIZE) -> np.ndarray:
+    """
+    Prétraite un lot de cases pour le classifieur, à l'entraînement comme à l'inférence.
+
+    Étapes : égalisation CLAHE de la luminance (espace LAB), flou gaussien
+    3x3, mise à l'échelle [0, 1] puis standardisation de chaque case (moyenne
+    nulle, écart-type unitaire). Les conversions de couleur portent sur tout
+    le lot à la fois, vu comme une seule image haute ; CLAHE et le flou, qui
+    dépendent du voisinage, sont appliqués case par case sans allocation.
+    Le même prétraitement s'applique aux échiquiers entiers redressés du
+    modèle d'échiquier (size = côté de l'échiquier) : la grille CLAHE 8x8
+    correspond alors aux cases.
+
+    Args:
+        squares: Cases RGB, tableau uint8 (N, H, W, 3) ou liste d'images
+        out: Tampon float32 (N, size, size, 3) préalloué où écrire le résultat (optionnel)
+        blur: Applique le flou gaussien
+        standardize: Standardise chaque case ; sinon les valeurs restent dans [0, 1]
+        size: Côté des images du lot
+
+    Returns:
+        Lot float32 (N, size, size, 3) (out s'il est fourni)
+    """
+    batch = stack_squares(squares, size)
+    count = len(batch)
+    shape = (count, size, size, 3)
+    if out is None:
+        out = np.empty(shape, dtype=np.float32)
+    elif out.shape != shape or out.dtype != np.float32:
+        raise ValueError(f"Tampon de sortie invalide : {out.shape} {out.dtype}, attendu {shape} float32")
+    if count == 0:
+        return out
+
+    # Conversion LAB de tout le lot en un appel
+    lab = cv2.cvtColor(batch.reshape(count * size, size, 3), cv2.COLOR_RGB2LAB)
+    luminance = np.ascontiguousarray(lab[:, :, 0]).reshape(count, size, size)
+    clahe = _clahe()
+    for i in range(count):
+        clahe.apply(luminance[i], dst=luminance[i])
+    lab[:, :, 0] = luminance.reshape(count * size, size)
+    enhanced = cv2.cvtColor(lab, cv2.COLOR_LAB2RGB).reshape(shape)
+
+    if blur:
+        for i in range(count):
+            cv2.GaussianBlur(enhanced[i], (3, 3), 0, dst=enhanced[i])
+
+    np.divide(enhanced, np.float32(255.0), out=out)
+    if standardize:
+        # Même calcul que np.std, sans recalculer l'écart à la moyenne
+        flat = out.reshape(count, -1)
+        flat -= flat.mean(axis=1, keepdims=True)
+        std = np.sqrt(np.square(flat).mean(axis=1, keepdims=True))
+        flat /= std + 1e-7
+    return out
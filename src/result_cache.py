@@ -0,0 +1,224 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ResultCache:
+    """
+    Cache des réponses complètes de /upload, à deux niveaux.
+
+    - exact : clé SHA-256 des octets envoyés ; une capture renvoyée telle
+      quelle ne repasse par aucune étape du traitement.
+    - near : signature perceptuelle de l'échiquier redressé (niveau de gris
+      moyen de CELLS x CELLS zones par case, après un léger flou qui absorbe
+      les décalages de rééchantillonnage). Une autre capture de la même
+      position (recompressée, redimensionnée) réutilise la réponse si aucune
+      zone ne diffère de plus de CELL_TOLERANCE ; une pièce ajoutée, retirée,
+      déplacée ou remplacée par une autre sur la même case change nettement
+      au moins une zone. Un échiquier réduit à moins d'environ 200 pixels
+      perd trop de détails pour être reconnu : la réponse est recalculée.
+
+    Chaque niveau est un LRU borné à max_entries, dont les entrées expirent
+    ttl secondes après leur création. Si db_path est fourni, les entrées sont
+    aussi écrites dans une base SQLite, relue au démarrage ; le niveau exact
+    y est aussi cherché en cas d'absence en mémoire.
+    """
+
+    TIERS = ('exact', 'near')
+    SIGNATURE_BOARD_SIZE = 128  # Côté de l'échiquier redressé servant à la signature
+    SIGNATURE_BLUR = 1.0  # Écart type (en pixels de l'échiquier redressé) du flou appliqué avant le découpage en zones
+    CELLS = 8  # Zones par côté de case dans la signature
+    CELL_TOLERANCE = 14  # Écart maximal de niveau de gris d'une zone entre deux quasi-doublons
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0, db_path: Optional[str] = None):
+        """
+        Initialise le cache.
+
+        Args:
+            max_entries: Nombre maximal d'entrées en mémoire, par niveau
+            ttl: Durée de vie d'une entrée, en secondes
+            db_path: Base SQLite de persistance (optionnelle)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, 'OrderedDict[bytes, Tuple[float, dict]]'] = {tier: OrderedDict() for tier in self.TIERS}
+        self.hits = {tier: 0 for tier in self.TIERS}
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        # Signatures du niveau near, empilées pour la recherche du plus proche
+        self._signature_keys: list = []
+        self._signatures = np.zeros((0, 64 * self.CELLS * self.CELLS), dtype=np.uint8)
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (tier TEXT, key BLOB, created REAL, response TEXT, "
+                             "PRIMARY KEY (tier, key))")
+            self._db.commit()
+            self._load()
+
+    @staticmethod
+    def exact_key(data: bytes) -> bytes:
+        """Clé du niveau exact : SHA-256 du contenu envoyé"""
+        return hashlib.sha256(data).digest()
+
+    def board_signature(self, board: np.ndarray) -> bytes:
+        """
+        Clé du niveau near : signature perceptuelle d'un échiquier redressé.
+
+        Args:
+            board: Échiquier redressé uint8 RGB (voir ImageProcessor.warp_board)
+
+        Returns:
+            64 x CELLS x CELLS octets, niveaux de gris moyens des zones, case par case
+        """
+        gray = board if board.ndim == 2 else cv2.cvtColor(board, cv2.COLOR_RGB2GRAY)
+        size = self.SIGNATURE_BOARD_SIZE
+        if gray.shape[:2] != (size, size):
+            gray = cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA)
+        gray = cv2.GaussianBlur(gray, (0, 0), self.SIGNATURE_BLUR)
+        side = 8 * self.CELLS
+        cells = cv2.resize(gray, (side, side), interpolation=cv2.INTER_AREA)
+        # Regroupe les zones par case, pour que la signature suive l'ordre des cases
+        return cells.reshape(8, self.CELLS, 8, self.CELLS).swapaxes(1, 2).tobytes()
+
+    def get(self, tier: str, key: bytes) -> Optional[dict]:
+        """
+        Cherche une réponse.
+
+        Args:
+            tier: 'exact' ou 'near'
+            key: exact_key ou board_signature
+
+        Returns:
+            La réponse mémorisée, None si absente ou expirée
+        """
+        with self._lock:
+            if tier == 'near':
+                key = self._nearest(key)
+            entry = self._lookup(tier, key) if key is not None else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits[tier] += 1
+            return entry
+
+    def put(self, tier: str, key: bytes, response: dict):
+        """Mémorise une réponse (en mémoire, et dans la base si elle est configurée)"""
+        created = time.time()
+        with self._lock:
+            self._insert(tier, key, created, response)
+            if self._db is not None:
+                try:
+                    self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                                     (tier, key, created, json.dumps(response)))
+                    self._db.execute("DELETE FROM results WHERE created < ?", (created - self.ttl,))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Erreur lors de l'écriture du cache des résultats : {str(e)}")
+
+    def metrics(self) -> dict:
+        """Compteurs du cache, pour /metrics"""
+        with self._lock:
+            hits = sum(self.hits.values())
+            total = hits + self.misses
+            return {
+                'entries': {tier: len(entries) for tier, entries in self._entries.items()},
+                'hits': dict(self.hits),
+                'misses': self.misses,
+                'hit_rate': hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'persistent': self._db is not None,
+            }
+
+    def clear(self):
+        with self._lock:
+            for entries in self._entries.values():
+                entries.clear()
+            self._signature_keys = []
+            self._signatures = self._signatures[:0]
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def _lookup(self, tier: str, key: bytes) -> Optional[dict]:
+        entries = self._entries[tier]
+        entry = entries.get(key)
+        if entry is None and self._db is not None and tier == 'exact':
+            row = self._db.execute("SELECT created, response FROM results WHERE tier = ? AND key = ?",
+                                   (tier, key)).fetchone()
+            if row is not None:
+                entry = (row[0], json.loads(row[1]))
+                self._insert(tier, key, *entry)
+        if entry is None:
+            return None
+
+        created, response = entry
+        if time.time() - created > self.ttl:
+            self._remove(tier, key)
+            self.expirations += 1
+            if self._db is not None:
+                self._db.execute("DELETE FROM results WHERE tier = ? AND key = ?", (tier, key))
+                self._db.commit()
+            return None
+        entries.move_to_end(key)
+        return response
+
+    def _insert(self, tier: str, key: bytes, created: float, response: dict):
+        entries = self._entries[tier]
+        if tier == 'near' and key not in entries:
+            self._signature_keys.append(key)
+            self._signatures = np.vstack([self._signatures, np.frombuffer(key, dtype=np.uint8)])
+        entries[key] = (created, response)
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            oldest = next(iter(entries))
+            self._remove(tier, oldest)
+            self.evictions += 1
+
+    def _remove(self, tier: str, key: bytes):
+        del self._entries[tier][key]
+        if tier == 'near':
+            index = self._signature_keys.index(key)
+            del self._signature_keys[index]
+            self._signatures = np.delete(self._signatures, index, axis=0)
+
+    def _nearest(self, signature: bytes) -> Optional[bytes]:
+        """Signature mémorisée dont toutes les zones sont à moins de CELL_TOLERANCE, la plus proche"""
+        if not self._signature_keys:
+            return None
+        query = np.frombuffer(signature, dtype=np.uint8).astype(np.int16)
+        distances = np.abs(self._signatures.astype(np.int16) - query).max(axis=1)
+        index = int(np.argmin(distances))
+        if distances[index] > self.CELL_TOLERANCE:
+            return None
+        return self._signature_keys[index]
+
+    def _load(self):
+        """Recharge en mémoire les entrées encore valides de la base, les plus récentes en dernier"""
+        now = time.time()
+        self._db.execute("DELETE FROM results WHERE created < ?", (now - self.ttl,))
+        self._db.commit()
+        for tier in self.TIERS:
+            rows = self._db.execute("SELECT key, created, response FROM results WHERE tier = ? "
+                                    "ORDER BY created DESC LIMIT ?", (tier, self.max_entries)).fetchall()
+            for key, created, response in reversed(rows):
+                # Signatures d'un autre format (base écrite par une version antérieure)
+                if tier == 'near' and len(key) != self._signatures.shape[1]:
+                    continue
+                self._insert(tier, key, created, json.loads(response))
+        logger.info(f"Cache des résultats : {sum(len(e) for e in self._entries.values())} entrées rechargées")
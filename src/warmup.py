@@ -0,0 +1,102 @@
+import threading
+import time
+import logging
+from typing import Callable, Generic, Optional, TypeVar
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+class BackgroundInitializer(Generic[T]):
+    """
+    Construit des composants coûteux dans un thread d'arrière-plan.
+
+    La fabrique (imports lourds, chargement du modèle, lancement du moteur)
+    puis la fonction de préchauffage s'exécutent hors du démarrage du
+    processus ; l'application peut répondre tout de suite, et signaler
+    qu'elle est prête une fois le préchauffage terminé. Rien n'est lancé
+    avant start() (ou le premier get()) : importer le module qui crée
+    l'instance ne charge rien.
+    """
+
+    def __init__(self, factory: Callable[[], T], warmup: Optional[Callable[[T], None]] = None,
+                 name: str = 'warmup'):
+        """
+        Initialise le constructeur différé.
+
+        Args:
+            factory: Fonction qui construit et renvoie les composants
+            warmup: Fonction appelée sur les composants construits, avant d'être prêt
+            name: Nom du thread
+        """
+        self.factory = factory
+        self.warmup = warmup
+        self.name = name
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._value: Optional[T] = None
+        self.error: Optional[BaseException] = None
+        self.elapsed_ms: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set() and self.error is None
+
+    @property
+    def started(self) -> bool:
+        return self._thread is not None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+    def start(self) -> 'BackgroundInitializer[T]':
+        """Lance la construction en arrière-plan (sans effet si elle est déjà lancée)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def get(self, timeout: Optional[float] = None) -> T:
+        """
+        Renvoie les composants, en attendant la fin du préchauffage si nécessaire.
+
+        Args:
+            timeout: Attente maximale en secondes (None = sans limite)
+
+        Raises:
+            TimeoutError: Si les composants ne sont pas prêts à temps
+            RuntimeError: Si la construction a échoué
+        """
+        self.start()
+        if not self._ready.wait(timeout):
+            raise TimeoutError("Initialisation en cours")
+        if self.error is not None:
+            raise RuntimeError(f"Échec de l'initialisation : {self.error}") from self.error
+        return self._value
+
+    def status(self) -> dict:
+        """État de l'initialisation, pour un point de contrôle de disponibilité"""
+        status = {'started': self.started, 'ready': self.ready, 'elapsed_ms': self.elapsed_ms}
+        if self.error is not None:
+            status['error'] = str(self.error)
+        return status
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            value = self.factory()
+            if self.warmup is not None:
+                self.warmup(value)
+            self._value = value
+        except Exception as e:
+            logger.error(f"Erreur lors de l'initialisation en arrière-plan : {str(e)}")
+            self.error = e
+        finally:
+            self.elapsed_ms = (time.perf_counter() - start) * 1000
+            self._ready.set()
+        if self.error is None:
+            logger.info(f"Composants prêts en {self.elapsed_ms:.0f} ms")
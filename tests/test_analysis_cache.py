@@ -0,0 +1,66 @@
+import chess
+import chess.engine
+from src.analysis_cache import AnalysisCache
+from src.chess_analyzer import ChessAnalyzer
+from src.engine_pool import EnginePool
+
+FEN = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+
+class CountingEngine:
+    """Moteur factice qui compte ses recherches"""
+
+    def __init__(self):
+        self.searches = 0
+
+    def ping(self):
+        pass
+
+    def analyse(self, board, limit, multipv=1, info=None):
+        self.searches += 1
+        moves = list(board.legal_moves)[:multipv]
+        return [{'score': chess.engine.PovScore(chess.engine.Cp(80 - 10 * i), board.turn), 'pv': [move]}
+                for i, move in enumerate(moves)]
+
+    def quit(self):
+        pass
+
+def make_analyzer(cache):
+    engine = CountingEngine()
+    return ChessAnalyzer(pool=EnginePool(lambda: engine, size=1), cache=cache), engine
+
+def test_deeper_entry_serves_shallower_request():
+    cache = AnalysisCache()
+    board = chess.Board(FEN)
+    results = [{'score': 30, 'best_move': 'Bb5', 'pv': ['Bb5'], 'mate_in': None},
+               {'score': 20, 'best_move': 'd4', 'pv': ['d4'], 'mate_in': None}]
+    cache.put(board, 20, 2, results)
+
+    assert cache.get(board, 18, 1) == results[:1]
+    assert cache.get(board, 20, 2) == results
+    assert cache.get(board, 22, 1) is None
+    assert cache.get(board, 20, 3) is None
+    # Les compteurs de coups ne font pas partie de la clé
+    assert cache.get(chess.Board(FEN.replace(" 2 3", " 0 7")), 20, 2) == results
+    assert cache.metrics()['hits'] == 3
+
+def test_summary_reuses_analysis():
+    analyzer, engine = make_analyzer(AnalysisCache())
+    analysis = analyzer.analyze_position(FEN)
+    assert len(analysis) == 3 and engine.searches == 1
+
+    # Avec l'analyse fournie, ou via le cache, le résumé ne relance pas de recherche
+    assert analyzer.get_position_summary(FEN, analysis) == analyzer.get_position_summary(FEN)
+    assert analyzer.analyze_position(FEN, depth=20, multipv=3) == analysis
+    assert engine.searches == 1
+
+def test_persistent_cache(tmp_path):
+    db_path = str(tmp_path / "analyses.db")
+    analyzer, engine = make_analyzer(AnalysisCache(db_path=db_path))
+    analysis = analyzer.analyze_position(FEN, depth=12, multipv=2)
+
+    # Une nouvelle instance relit la base
+    analyzer, engine = make_analyzer(AnalysisCache(db_path=db_path))
+    assert analyzer.analyze_position(FEN, depth=10, multipv=1) == analysis[:1]
+    assert engine.searches == 0
+    analyzer.analyze_position(FEN, depth=16, multipv=2)
+    assert engine.searches == 1
@@ -0,0 +1,96 @@
+import asyncio
+import chess
+import chess.engine
+from src.analysis_cache import AnalysisCache
+from src.async_analyzer import AsyncChessAnalyzer
+
+FEN = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+
+class FakeProtocol:
+    """Moteur asynchrone factice : analyse en delay secondes, interrompue si la tâche est annulée"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.returncode = asyncio.get_running_loop().create_future()
+        self.searches = 0
+        self.stopped = 0
+        self.fail = False
+
+    async def analyse(self, board, limit, multipv=1, info=None):
+        self.searches += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.stopped += 1
+            raise
+        if self.fail:
+            self.returncode.set_result(1)
+            raise chess.engine.EngineTerminatedError("plantage")
+        moves = list(board.legal_moves)[:multipv]
+        return [{'score': chess.engine.PovScore(chess.engine.Cp(40), board.turn), 'pv': [move]} for move in moves]
+
+    async def quit(self):
+        if not self.returncode.done():
+            self.returncode.set_result(0)
+
+async def make_analyzer(size=2, delay=0.0, **kwargs):
+    engines = []
+    async def factory():
+        engines.append(FakeProtocol(delay))
+        return engines[-1]
+    analyzer = await AsyncChessAnalyzer(size=size, engine_factory=factory, **kwargs).start()
+    return analyzer, engines
+
+def test_concurrent_analyses_share_engines():
+    async def scenario():
+        analyzer, engines = await make_analyzer(size=2, delay=0.05)
+        results = await asyncio.gather(*(analyzer.analyze_position(FEN, multipv=2) for _ in range(6)))
+        assert all(len(result) == 2 and result[0].score == 40 for result in results)
+        assert sum(engine.searches for engine in engines) == 6
+        assert analyzer.metrics()['idle'] == 2 and analyzer.metrics()['in_flight'] == 0
+        assert await analyzer.get_position_summary(FEN, results[0]) == f"Position égale. Meilleur coup : {results[0][0].best_move}."
+        await analyzer.close()
+    asyncio.run(scenario())
+
+def test_timeout_and_disconnect_stop_search():
+    async def scenario():
+        analyzer, engines = await make_analyzer(size=1, delay=10)
+        assert await analyzer.analyze_position(FEN, timeout=0.05) == []
+
+        calls = []
+        async def is_disconnected():
+            calls.append(1)
+            return len(calls) >= 2
+        assert await analyzer.analyze_position(FEN, is_disconnected=is_disconnected) == []
+
+        assert engines[0].stopped == 2
+        metrics = analyzer.metrics()
+        assert metrics['timeouts'] == 1 and metrics['cancellations'] == 1 and metrics['idle'] == 1
+        await analyzer.close()
+    asyncio.run(scenario())
+
+def test_cancelled_task_releases_engine():
+    async def scenario():
+        analyzer, engines = await make_analyzer(size=1, delay=10)
+        task = asyncio.ensure_future(analyzer.analyze_position(FEN))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert task.cancelled() and engines[0].stopped == 1
+        assert analyzer.metrics()['idle'] == 1
+        await analyzer.close()
+    asyncio.run(scenario())
+
+def test_failed_engine_is_replaced_and_cache_is_used():
+    async def scenario():
+        analyzer, engines = await make_analyzer(size=1, cache=AnalysisCache())
+        engines[0].fail = True
+        assert await analyzer.analyze_position(FEN) == []
+
+        # Le moteur remplaçant prend le relais, puis le cache évite une nouvelle recherche
+        results = await analyzer.analyze_position(FEN)
+        assert len(engines) == 2 and len(results) == 3
+        assert await analyzer.analyze_position(FEN, depth=12, multipv=1) == results[:1]
+        assert engines[1].searches == 1 and analyzer.metrics()['failures'] == 1
+        await analyzer.close()
+    asyncio.run(scenario())
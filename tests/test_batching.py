@@ -0,0 +1,50 @@
+import threading
+import numpy as np
+import pytest
+from src.batching import DynamicBatcher
+
+def _slow_identity(calls):
+    # Renvoie l'entrée (N, 1) telle quelle, en notant la taille de chaque lot
+    def predict(batch):
+        calls.append(len(batch))
+        threading.Event().wait(0.01)
+        return batch.reshape(len(batch), -1)
+    return predict
+
+def test_concurrent_requests_are_grouped():
+    calls = []
+    batcher = DynamicBatcher(_slow_identity(calls), max_batch_size=64, max_wait_ms=50)
+    results = {}
+
+    def request(i):
+        batch = np.full((4, 1), i, dtype=np.float32)
+        results[i] = batcher.predict_proba(batch, timeout=5)
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Chaque requête récupère ses propres lignes
+    for i in range(8):
+        assert results[i].shape == (4, 1)
+        assert np.all(results[i] == i)
+    assert sum(calls) == 32
+    assert len(calls) < 8
+    assert batcher.requests == 8 and batcher.items == 32
+
+def test_max_batch_size_is_respected():
+    calls = []
+    batcher = DynamicBatcher(_slow_identity(calls), max_batch_size=10, max_wait_ms=50)
+    futures = [batcher.submit(np.full((4, 1), i, dtype=np.float32)) for i in range(6)]
+    for i, future in enumerate(futures):
+        assert np.all(future.result(timeout=5) == i)
+    assert max(calls) <= 10
+
+def test_model_error_is_propagated():
+    def failing(batch):
+        raise RuntimeError("modèle indisponible")
+    batcher = DynamicBatcher(failing, max_wait_ms=1)
+    with pytest.raises(RuntimeError):
+        batcher.predict_proba(np.zeros((2, 1), dtype=np.float32), timeout=5)
@@ -0,0 +1,92 @@
+import chess
+import chess.engine
+from src.analysis_cache import AnalysisCache
+from src.chess_analyzer import ChessAnalyzer
+from src.engine_pool import EnginePool
+
+FEN = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+
+class FakeAnalysis:
+    """Recherche factice : une ligne d'informations par variante et par profondeur"""
+
+    def __init__(self, board, limit, multipv):
+        self.board = board
+        self.max_depth = limit.depth or 10
+        self.lines = min(multipv or 1, board.legal_moves.count())
+        self.multipv = []
+        self.stopped = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.stopped = True
+
+    def __iter__(self):
+        moves = list(self.board.legal_moves)
+        for depth in range(1, self.max_depth + 1):
+            if self.stopped:
+                return
+            yield {'depth': depth}
+            for rank in range(self.lines):
+                info = {'depth': depth, 'multipv': rank + 1, 'pv': [moves[rank]], 'nodes': depth * 100,
+                        'time': depth / 1000,
+                        'score': chess.engine.PovScore(chess.engine.Cp(10 * depth - rank), self.board.turn)}
+                self.multipv[rank:rank + 1] = [info]
+                yield info
+
+class StreamingEngine:
+    def __init__(self):
+        self.searches = []
+
+    def ping(self):
+        pass
+
+    def analysis(self, board, limit, multipv=None, info=None):
+        self.searches.append(FakeAnalysis(board, limit, multipv))
+        return self.searches[-1]
+
+    def quit(self):
+        pass
+
+def make_analyzer(cache=None):
+    engine = StreamingEngine()
+    pool = EnginePool(lambda: engine, size=1)
+    return ChessAnalyzer(pool=pool, cache=cache), engine, pool
+
+def test_stream_yields_each_depth_then_final():
+    cache = AnalysisCache()
+    analyzer, engine, pool = make_analyzer(cache)
+    updates = list(analyzer.analyze_stream(FEN, depth=5, multipv=2))
+
+    assert [update.depth for update in updates] == [1, 2, 3, 4, 5, 5]
+    assert [update.final for update in updates] == [False] * 5 + [True]
+    assert all(len(update.results) == 2 for update in updates)
+    assert updates[-1].results[0].score == 50 and updates[-1].nodes == 500
+    assert pool.metrics()['idle'] == 1
+
+    # Le résultat final est mémorisé et sert les demandes moins profondes
+    assert analyzer.analyze_position(FEN, depth=4, multipv=1) == updates[-1].results[:1]
+    cached = list(analyzer.analyze_stream(FEN, depth=5, multipv=2))
+    assert len(cached) == 1 and cached[0].final and len(engine.searches) == 1
+
+def test_closing_stream_stops_search_and_releases_engine():
+    analyzer, engine, pool = make_analyzer()
+    updates = analyzer.analyze_stream(FEN, depth=30)
+    assert next(updates).depth == 1
+    updates.close()
+
+    assert engine.searches[0].stopped
+    assert pool.metrics()['idle'] == 1 and pool.metrics()['failures'] == 0
+
+def test_adaptive_limit_depends_on_piece_count():
+    analyzer, _, _ = make_analyzer()
+    opening = analyzer.adaptive_limit(chess.Board(FEN))
+    endgame = analyzer.adaptive_limit(chess.Board("8/8/4k3/8/3KP3/8/8/8 w - - 0 1"))
+    assert endgame.depth > opening.depth
+    assert opening.time is not None
+
+def test_stream_without_legal_moves():
+    analyzer, _, _ = make_analyzer()
+    updates = list(analyzer.analyze_stream("7k/6Q1/6K1/8/8/8/8/8 b - - 0 1", depth=3))
+    assert len(updates) == 1 and updates[0].final and updates[0].results == []
@@ -0,0 +1,97 @@
+import pytest
+import cv2
+import numpy as np
+from src.chess_detector import ChessboardDetector
+
+def _digital_board(pieces=True):
+    # Capture d'écran : échiquier aligné sur les axes, sur un fond uniforme
+    rng = np.random.RandomState(3)
+    img = np.full((900, 1400, 3), 40, dtype=np.uint8)
+    for i in range(8):
+        for j in range(8):
+            color = (181, 217, 240) if (i + j) % 2 == 0 else (99, 136, 181)
+            img[100 + i * 80:180 + i * 80, 300 + j * 80:380 + j * 80] = color
+    for k in range(20 if pieces else 0):
+        i, j = rng.randint(0, 8, 2)
+        cv2.circle(img, (340 + j * 80, 140 + i * 80), 25, (255, 255, 255) if k % 2 else (0, 0, 0), -1)
+    return img
+
+def _photo_board():
+    # Même échiquier vu en perspective, sur un fond texturé
+    src = np.float32([[300, 100], [940, 100], [940, 740], [300, 740]])
+    dst = np.float32([[350, 150], [1000, 120], [1050, 800], [280, 760]])
+    background = cv2.GaussianBlur(np.random.RandomState(0).randint(60, 120, (900, 1400, 3)).astype(np.uint8), (15, 15), 0)
+    matrix = cv2.getPerspectiveTransform(src, dst)
+    return cv2.warpPerspective(_digital_board(), matrix, (1400, 900),
+                               borderMode=cv2.BORDER_TRANSPARENT, dst=background), dst
+
+def test_screenshot_stage_stops_cascade():
+    result = ChessboardDetector().detect(_digital_board())
+    assert result.success
+    assert result.stage == 'screenshot'
+    assert [t.name for t in result.timings] == ['screenshot']
+    assert np.allclose(result.corners, [[300, 100], [939, 100], [939, 739], [300, 739]], atol=0)
+
+def test_hough_stage_on_perspective_photo():
+    image, expected = _photo_board()
+    result = ChessboardDetector().detect(image)
+    assert result.success
+    assert result.stage == 'hough'
+    assert [t.name for t in result.timings] == ['screenshot', 'hough']
+    assert not result.timings[0].success
+    assert np.abs(result.corners - expected).max() < 8
+
+def test_stages_skipped_when_total_budget_exhausted():
+    detector = ChessboardDetector(max_total_ms=0)
+    result = detector.detect(np.full((400, 400, 3), 128, dtype=np.uint8))
+    assert not result.success
+    assert all(t.skipped for t in result.timings)
+    assert [t.name for t in result.timings] == list(ChessboardDetector.STAGES)
+
+def test_slow_stage_consumes_budget_of_later_stages():
+    import time
+    detector = ChessboardDetector(max_total_ms=60)
+    calls = []
+    def slow_screenshot(decoded, deadline):
+        time.sleep(0.08)
+        return None
+    detector._detect_screenshot = slow_screenshot
+    detector._detect_hough_grid = lambda decoded, deadline: calls.append('hough')
+    result = detector.detect(np.full((400, 400, 3), 128, dtype=np.uint8))
+    assert not result.success
+    assert not calls
+    assert [t.skipped for t in result.timings] == [False, True, True]
+
+def test_corner_stage_searches_coarser_level_when_short_of_time():
+    detector = ChessboardDetector()
+    side = detector.processor.PYRAMID_MAX_SIDE
+    # Budget complet : niveau habituel
+    assert detector._corner_search_side(_deadline(500.0)) is None
+    # Un quart du budget : côté divisé par deux, jamais sous CORNERS_MIN_SIDE
+    assert detector._corner_search_side(_deadline(125.0)) <= side // 2
+    assert detector._corner_search_side(_deadline(1.0)) == ChessboardDetector.CORNERS_MIN_SIDE
+
+def _deadline(budget_ms):
+    from src.chess_detector import _Deadline
+    return _Deadline(budget_ms)
+
+def test_hough_stage_rejects_false_grids():
+    from src.chess_detector import _Deadline
+    from src.image_processor import DecodedImage
+    detector = ChessboardDetector()
+    # Droites parallèles supplémentaires, au même pas que les cases, autour de l'échiquier
+    image = _digital_board()
+    for y in (20, 820):
+        cv2.line(image, (0, y), (1399, y), (230, 230, 230), 3)
+    for x in (220, 1020):
+        cv2.line(image, (x, 0), (x, 899), (230, 230, 230), 3)
+    corners = detector._detect_hough_grid(DecodedImage.from_array(image), _Deadline(1000))
+    assert corners is not None
+    assert np.abs(corners - [[300, 100], [939, 100], [939, 739], [300, 739]]).max() < 8
+    
+    # Grille de lignes sans échiquier
+    lines = np.full((900, 1400, 3), 40, dtype=np.uint8)
+    for k in range(9):
+        cv2.line(lines, (0, 100 + 80 * k), (1399, 100 + 80 * k), (230, 230, 230), 3)
+        cv2.line(lines, (300 + 80 * k, 0), (300 + 80 * k, 899), (230, 230, 230), 3)
+    assert detector._detect_hough_grid(DecodedImage.from_array(lines), _Deadline(1000)) is None
@@ -0,0 +1,19 @@
+import numpy as np
+from src.dataset_generator import BoardDatasetGenerator
+from src.piece_classifier import PieceClassifier
+
+def test_board_dataset():
+    generator = BoardDatasetGenerator(size=128, seed=0)
+    boards, labels = generator.generate(3)
+    assert boards.shape == (3, 128, 128, 3) and boards.dtype == np.uint8
+    assert labels.shape == (3, 8, 8)
+
+    # Un roi de chaque couleur, aux cases indiquées par les étiquettes
+    king = list(PieceClassifier.PIECES.values()).index('K')
+    assert np.all((labels == king).sum(axis=(1, 2)) == 2)
+
+    # Les cases vides sont unies, les cases occupées non
+    empty = list(PieceClassifier.PIECES.values()).index('empty')
+    tiles = boards[0].reshape(8, 16, 8, 16, 3).swapaxes(1, 2).astype(np.float32)
+    spread = tiles.reshape(8, 8, -1, 3).std(axis=2).max(axis=2)
+    assert spread[labels[0] == empty].mean() < spread[labels[0] != empty].mean()
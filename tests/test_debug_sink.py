@@ -0,0 +1,41 @@
+import os
+import threading
+import numpy as np
+from src.debug_sink import DebugSink
+
+def test_disabled_by_default(tmp_path):
+    sink = DebugSink(output_dir=str(tmp_path))
+    assert not sink.enabled
+    assert all(sink.sample() is None for _ in range(100))
+
+def test_sampled_prefixes_are_unique(tmp_path):
+    sink = DebugSink(output_dir=str(tmp_path), sample_rate=1.0)
+    prefixes = {sink.sample() for _ in range(100)}
+    assert None not in prefixes
+    assert len(prefixes) == 100
+
+def test_submit_writes_in_background(tmp_path):
+    sink = DebugSink(output_dir=str(tmp_path), sample_rate=1.0)
+    prefix = sink.sample()
+    assert sink.submit(prefix, 'board', np.zeros((10, 10, 3), dtype=np.uint8))
+    
+    sink.flush()
+    assert os.path.exists(os.path.join(tmp_path, f'{prefix}_board.png'))
+    assert sink.written == 1
+
+def test_overflow_drops_images(tmp_path, monkeypatch):
+    sink = DebugSink(output_dir=str(tmp_path), sample_rate=1.0, max_queue_size=2)
+    
+    # Bloque l'écriture pour remplir la file
+    release = threading.Event()
+    import src.debug_sink as debug_sink
+    original_imwrite = debug_sink.cv2.imwrite
+    monkeypatch.setattr(debug_sink.cv2, 'imwrite', lambda *args: release.wait() and original_imwrite(*args))
+    
+    image = np.zeros((10, 10, 3), dtype=np.uint8)
+    results = [sink.submit('req', f'img{i}', image) for i in range(10)]
+    release.set()
+    sink.flush()
+    
+    assert not all(results)
+    assert sink.dropped == results.count(False)
@@ -0,0 +1,41 @@
+import cv2
+import numpy as np
+from src.empty_filter import EmptySquareFilter
+
+def _tiles(count, piece, seed=0):
+    # Cases extraites : marge blanche, case unie légèrement bruitée, pièce éventuelle au centre
+    rng = np.random.RandomState(seed)
+    tiles = np.full((count, 100, 100, 3), 255, dtype=np.uint8)
+    for i in range(count):
+        color = (240, 217, 181) if i % 2 else (181, 136, 99)
+        noise = rng.randint(-1, 2, (84, 84, 3))
+        tiles[i, 8:92, 8:92] = np.clip(np.array(color) + noise, 0, 255)
+        if piece:
+            cv2.circle(tiles[i], (50, 55), 22, (20, 20, 20) if i % 3 else (250, 250, 250), -1)
+    return tiles
+
+def test_flags_only_empty_squares():
+    empty_filter = EmptySquareFilter()
+    squares = np.concatenate([_tiles(8, piece=False), _tiles(8, piece=True)])
+    flagged = empty_filter.predict(squares)
+    assert flagged[:8].all() and not flagged[8:].any()
+    assert empty_filter.checked == 16 and empty_filter.skipped == 8
+
+def test_accepts_lists_of_any_size():
+    squares = [cv2.resize(tile, (60, 60)) for tile in _tiles(4, piece=False)]
+    assert EmptySquareFilter().predict(squares).all()
+
+def test_calibration(tmp_path):
+    empty = _tiles(40, piece=False, seed=1)
+    # Quelques cases vides plus bruitées (photo)
+    empty[:4] = np.clip(empty[:4] + np.random.RandomState(2).randint(-6, 7, empty[:4].shape), 0, 255)
+    
+    empty_filter = EmptySquareFilter()
+    report = empty_filter.calibrate(empty, false_negative_rate=0.1, piece_squares=_tiles(20, piece=True))
+    assert report['empty_detected'] >= 0.9
+    assert report['pieces_flagged_empty'] == 0
+    assert all(empty_filter.thresholds[name] >= EmptySquareFilter.NOISE_FLOOR[name] for name in EmptySquareFilter.FEATURES)
+    
+    path = str(tmp_path / 'empty_filter.json')
+    empty_filter.save(path, report)
+    assert EmptySquareFilter.load(path).thresholds == empty_filter.thresholds
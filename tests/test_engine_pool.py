@@ -0,0 +1,84 @@
+import threading
+import time
+import chess
+import chess.engine
+import pytest
+from src.engine_pool import EnginePool
+from src.chess_analyzer import ChessAnalyzer
+
+class FakeEngine:
+    """Moteur factice : analyse en delay secondes, ping en échec si alive est faux"""
+    
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.alive = True
+        self.closed = False
+    
+    def ping(self):
+        if not self.alive:
+            raise chess.engine.EngineTerminatedError("mort")
+    
+    def analyse(self, board, limit, multipv=1, info=None):
+        time.sleep(self.delay)
+        move = next(iter(board.legal_moves))
+        return [{'score': chess.engine.PovScore(chess.engine.Cp(30), board.turn), 'pv': [move]}] * multipv
+    
+    def quit(self):
+        self.closed = True
+
+def make_pool(size=2, delay=0.0, **kwargs):
+    engines = []
+    def factory():
+        engines.append(FakeEngine(delay))
+        return engines[-1]
+    return EnginePool(factory, size=size, **kwargs), engines
+
+def test_checkout_blocks_then_times_out():
+    pool, engines = make_pool(size=2)
+    first, second = pool.checkout(), pool.checkout()
+    assert first is not second
+    with pytest.raises(TimeoutError):
+        pool.checkout(timeout=0.05)
+    
+    # Un moteur rendu débloque l'attente
+    threading.Timer(0.05, pool.release, args=(first,)).start()
+    assert pool.checkout(timeout=2) is first
+
+def test_failed_engine_is_respawned():
+    pool, engines = make_pool(size=1)
+    with pytest.raises(chess.engine.EngineTerminatedError):
+        with pool.engine() as engine:
+            raise chess.engine.EngineTerminatedError("plantage")
+    assert engines[0].closed
+    with pool.engine(timeout=1) as engine:
+        assert engine is engines[1]
+    assert pool.metrics()['respawns'] == 1 and pool.metrics()['failures'] == 1
+
+def test_health_check_replaces_dead_engine():
+    pool, engines = make_pool(size=1, health_check_interval=0)
+    engines[0].alive = False
+    assert pool.checkout(timeout=1) is engines[1]
+
+def test_missing_engine_fails_fast():
+    def factory():
+        raise FileNotFoundError("stockfish")
+    pool = EnginePool(factory, size=2)
+    assert pool.alive == 0
+    start = time.monotonic()
+    with pytest.raises(RuntimeError):
+        pool.checkout(timeout=5)
+    assert time.monotonic() - start < 1
+
+def test_analyzer_runs_analyses_concurrently():
+    pool, _ = make_pool(size=4, delay=0.2)
+    analyzer = ChessAnalyzer(pool=pool)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(analyzer.analyze_position(chess.STARTING_FEN, multipv=1)))
+               for _ in range(4)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - start < 0.6
+    assert all(len(result) == 1 and result[0].score == 30 for result in results)
@@ -0,0 +1,54 @@
+import pytest
+import cv2
+import numpy as np
+from src.image_processor import ImageProcessor
+from src.fixed_camera import FixedCameraBoard
+
+def _board_image(offset=100, size=800):
+    # Échiquier synthétique sur un fond texturé, comme une table vue par la caméra
+    rng = np.random.default_rng(0)
+    img = cv2.GaussianBlur(rng.integers(0, 256, (size, size, 3), dtype=np.uint8), (7, 7), 0)
+    for i in range(8):
+        for j in range(8):
+            color = 20 if (i + j) % 2 else 235
+            y, x = offset + i * 50, offset + j * 50
+            img[y:y + 50, x:x + 50] = color
+    return img
+
+def test_fixed_camera_matches_full_pipeline():
+    image = _board_image()
+    processor = ImageProcessor()
+    camera = FixedCameraBoard(processor)
+    assert camera.calibrate(image)
+    
+    success, squares = camera.extract_squares(image)
+    assert success
+    assert squares.shape == (64, 100, 100, 3)
+    
+    _, corners = processor.detect_chessboard(image)
+    _, expected = processor.extract_squares_batch(image, corners)
+    assert np.mean(np.abs(squares.astype(np.int16) - expected)) < 2
+    assert camera.redetections == 0
+
+def test_fixed_camera_redetects_when_board_moves():
+    camera = FixedCameraBoard()
+    assert camera.calibrate(_board_image(offset=100))
+    
+    moved = _board_image(offset=160)
+    assert not camera.check(moved)
+    
+    success, _ = camera.extract_squares(moved)
+    assert success
+    assert camera.redetections == 1
+    assert np.allclose(camera.corners[0], [160, 160], atol=1.5)
+
+def test_fixed_camera_with_lens_distortion():
+    image = _board_image()
+    camera_matrix = np.array([[800, 0, 400], [0, 800, 400], [0, 0, 1]], dtype=np.float64)
+    
+    # Sans distorsion, le résultat est identique au mode sans correction
+    camera = FixedCameraBoard(camera_matrix=camera_matrix, dist_coeffs=np.zeros(5))
+    assert camera.calibrate(image)
+    _, squares = camera.extract_squares(image)
+    _, reference = FixedCameraBoard().extract_squares(image)
+    assert np.mean(np.abs(squares.astype(np.int16) - reference)) < 2
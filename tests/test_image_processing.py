@@ -1,11 +1,29 @@
 import pytest
 from PIL import Image
 import io
+from src.chess_detector import ChessboardDetector
+
+def _encode(fmt, size=(400, 400)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size).save(buffer, format=fmt)
+    buffer.seek(0)
+    return buffer
 
 def test_image_format_validation():
     """Test basic image format validation"""
-    # Ce test sera implémenté plus tard
-    assert True
+    detector = ChessboardDetector()
+    assert detector.validate_image_format(_encode('PNG'))
+    assert detector.validate_image_format(_encode('JPEG'))
+    assert not detector.validate_image_format(_encode('GIF'))
+    assert not detector.validate_image_format(io.BytesIO(b'Not an image'))
+    
+    # Seul l'en-tête est lu, et la position du flux est restaurée
+    stream = _encode('PNG')
+    assert detector.validate_image_format(stream)
+    assert stream.tell() == 0
+
+def test_undersized_image_rejected():
+    assert not ChessboardDetector().validate_image_format(_encode('PNG', size=(100, 100)))
 
 def test_project_setup():
     """Test that pytest est correctement configuré"""
@@ -23,6 +23,19 @@ def sample_image():
     
     return img
 
+@pytest.fixture
+def board_image():
+    # Échiquier synthétique entouré d'une marge blanche, détectable par OpenCV
+    img = np.full((600, 600, 3), 255, dtype=np.uint8)
+    square_size = 50
+    for i in range(8):
+        for j in range(8):
+            if (i + j) % 2 == 1:
+                y1 = 100 + i * square_size
+                x1 = 100 + j * square_size
+                img[y1:y1 + square_size, x1:x1 + square_size] = 0
+    return img
+
 def test_valid_image_format(tmp_path):
     # Create a temporary valid image
     img_path = os.path.join(tmp_path, "test.jpg")
@@ -86,3 +99,169 @@ def test_grid_extraction_invalid_corners():
     success, squares = ImageProcessor.extract_grid(np.zeros((400, 400, 3)), invalid_corners)
     assert not success
     assert squares is None
+
+def test_load_image_from_bytes(board_image):
+    data = cv2.imencode('.png', board_image)[1].tobytes()
+    
+    decoded = ImageProcessor.load_image(data)
+    assert decoded is not None
+    assert np.array_equal(decoded.bgr, board_image)
+    assert decoded.gray.shape == board_image.shape[:2]
+    
+    # Une image déjà décodée est réutilisée sans copie
+    assert ImageProcessor.load_image(decoded) is decoded
+    assert ImageProcessor.load_image(b'not an image') is None
+
+def test_in_memory_pipeline(board_image):
+    processor = ImageProcessor()
+    decoded = processor.load_image(cv2.imencode('.png', board_image)[1].tobytes())
+    
+    success, corners = processor.detect_chessboard(decoded)
+    assert success
+    assert np.allclose(corners, [[100, 100], [500, 100], [500, 500], [100, 500]], atol=1.0)
+    
+    success, squares = processor.extract_squares(decoded, corners)
+    assert success
+    assert len(squares) == 64
+    assert all(square.shape == (100, 100, 3) for square in squares)
+
+def test_extract_squares_batch(board_image):
+    processor = ImageProcessor()
+    corners = np.array([[99.5, 99.5], [499.5, 99.5], [499.5, 499.5], [99.5, 499.5]], dtype=np.float32)
+    
+    success, batch = processor.extract_squares_batch(board_image, corners)
+    assert success
+    assert batch.shape == (64, 100, 100, 3)
+    assert batch.dtype == np.uint8
+    assert batch.flags['C_CONTIGUOUS']
+    
+    # Le lot doit correspondre aux cases extraites une par une
+    success, squares = processor.extract_squares(board_image, corners)
+    assert success
+    assert np.mean(np.abs(np.array(squares, dtype=np.int16) - batch)) < 5
+    
+    # La marge autour de chaque case reste blanche
+    assert np.all(batch[:, 0] == 255)
+    assert np.all(batch[:, :, -1] == 255)
+
+def test_multiscale_corner_detection(board_image):
+    # Même échiquier, agrandi bien au-delà de PYRAMID_MAX_SIDE
+    large = cv2.resize(board_image, (3000, 3000), interpolation=cv2.INTER_NEAREST)
+    gray = cv2.GaussianBlur(cv2.cvtColor(large, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+    
+    corners, level = ImageProcessor(multiscale=True).find_inner_corners(gray)
+    assert corners is not None
+    assert level >= 1
+    
+    # Les coins affinés en pleine résolution correspondent à la recherche directe
+    reference, reference_level = ImageProcessor(multiscale=False).find_inner_corners(gray)
+    assert reference_level == 0
+    assert np.abs(corners - reference).max() < 1.0
+
+def test_read_image_header():
+    image = np.zeros((300, 500, 3), dtype=np.uint8)
+    assert ImageProcessor.read_image_header(cv2.imencode('.png', image)[1].tobytes()) == ('png', 500, 300)
+    assert ImageProcessor.read_image_header(cv2.imencode('.jpg', image)[1].tobytes()) == ('jpeg', 500, 300)
+    assert ImageProcessor.read_image_header(b'Not an image') is None
+
+def test_reduced_jpeg_decoding():
+    image = np.random.randint(0, 256, (3200, 4000, 3), dtype=np.uint8)
+    data = cv2.imencode('.jpg', image)[1].tobytes()
+    
+    # Plus petit facteur de réduction gardant au moins DECODE_MIN_SIDE pixels
+    decoded = ImageProcessor.decode_image(data)
+    assert decoded.shape == (800, 1000, 3)
+    assert min(decoded.shape[:2]) >= ImageProcessor.DECODE_MIN_SIDE
+    
+    # Décodage pleine taille sur demande
+    assert ImageProcessor.decode_image(data, min_side=None).shape == image.shape
+    
+    # Les PNG ne sont jamais réduits
+    small = image[:1700, :1700]
+    assert ImageProcessor.decode_image(cv2.imencode('.png', small)[1].tobytes()).shape == small.shape
+
+def test_sniff_image_rejects_without_decoding():
+    # Un en-tête PNG valide suivi de données corrompues passe la validation
+    # d'en-tête : seule la signature et les dimensions sont lues
+    data = cv2.imencode('.png', np.zeros((400, 300, 3), dtype=np.uint8))[1].tobytes()
+    assert ImageProcessor.sniff_image(data[:64]) == (True, ('png', 300, 400))
+    
+    small = cv2.imencode('.png', np.zeros((100, 100, 3), dtype=np.uint8))[1].tobytes()
+    assert ImageProcessor.sniff_image(small) == (False, ('png', 100, 100))
+    assert ImageProcessor.sniff_image(b'GIF89a') == (False, None)
+
+def test_validate_image_from_bytes():
+    data = cv2.imencode('.png', np.zeros((400, 400, 3), dtype=np.uint8))[1].tobytes()
+    is_valid, image = ImageProcessor.validate_image(data)
+    assert is_valid
+    assert image.shape == (400, 400, 3)
+    
+    is_valid, image = ImageProcessor.validate_image(data[:64])
+    assert not is_valid
+    assert image is None
+
+def test_locate_screenshot_board(board_image):
+    processor = ImageProcessor()
+    success, corners = processor.locate_screenshot_board(board_image)
+    assert success
+    assert np.array_equal(corners, [[100, 100], [499, 100], [499, 499], [100, 499]])
+
+    # Une vue en perspective n'est pas une capture d'écran
+    src = np.float32([[100, 100], [500, 100], [500, 500], [100, 500]])
+    dst = np.float32([[120, 90], [510, 130], [480, 520], [90, 470]])
+    tilted = cv2.warpPerspective(board_image, cv2.getPerspectiveTransform(src, dst), (600, 600),
+                                 borderValue=(255, 255, 255))
+    success, corners = processor.locate_screenshot_board(tilted)
+    assert not success and corners is None
+
+def test_locate_screenshot_board_on_reduced_level():
+    # Capture 4K : profils sur un niveau réduit, frontières recalées en pleine résolution
+    img = np.full((2160, 3840, 3), 40, dtype=np.uint8)
+    x0, y0, square_size = 613, 271, 187
+    for i in range(8):
+        for j in range(8):
+            color = (181, 217, 240) if (i + j) % 2 == 0 else (99, 136, 181)
+            img[y0 + i * square_size:y0 + (i + 1) * square_size, x0 + j * square_size:x0 + (j + 1) * square_size] = color
+            if (i * 3 + j) % 4 == 0:
+                cv2.circle(img, (x0 + j * square_size + 93, y0 + i * square_size + 93), 60, (255, 255, 255), -1)
+    processor = ImageProcessor()
+    success, corners = processor.locate_screenshot_board(img, max_side=1024)
+    assert success
+    end_x, end_y = x0 + 8 * square_size - 1, y0 + 8 * square_size - 1
+    assert np.array_equal(corners, [[x0, y0], [end_x, y0], [end_x, end_y], [x0, end_y]])
+    assert np.array_equal(corners, processor.locate_screenshot_board(img)[1])
+
+def test_screenshot_squares_sliced(board_image):
+    processor = ImageProcessor()
+    _, corners = processor.locate_screenshot_board(board_image)
+    success, squares = processor.extract_squares_batch(board_image, corners)
+    assert success
+    assert squares.shape == (64, 100, 100, 3)
+
+    # Même résultat que le chemin par homographie, aux interpolations près
+    maps = processor.build_square_maps(processor.perspective_transform(corners))
+    remapped = processor.remap_squares(board_image, maps)
+    assert np.abs(squares.astype(int) - remapped).mean() < 2
+
+def test_warp_board(board_image):
+    processor = ImageProcessor()
+    _, corners = processor.locate_screenshot_board(board_image)
+    success, board = processor.warp_board(board_image, corners, size=256)
+    assert success and board.shape == (256, 256, 3)
+
+    # Le chemin par homographie donne le même échiquier, aux interpolations près
+    success, warped = processor.warp_board(board_image, corners + np.float32([[0.6, 0], [0, 0], [0, 0], [0, 0]]), size=256)
+    assert success
+    assert np.abs(board.astype(int) - warped).mean() < 4
+
+def test_validate_image_checks_extension(tmp_path):
+    # Contenu PNG valide, mais extension non supportée
+    img_path = os.path.join(tmp_path, "board.gif")
+    cv2.imwrite(os.path.join(tmp_path, "board.png"), np.zeros((400, 400, 3), dtype=np.uint8))
+    os.rename(os.path.join(tmp_path, "board.png"), img_path)
+    assert ImageProcessor.validate_image(img_path) == (False, None)
+    
+    with open(img_path, 'rb') as f:
+        data = f.read()
+    assert ImageProcessor.validate_image(data, filename='board.gif') == (False, None)
+    assert ImageProcessor.validate_image(data, filename='board.PNG')[0]
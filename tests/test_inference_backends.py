@@ -0,0 +1,99 @@
+import os
+import cv2
+import numpy as np
+import pytest
+from src.piece_classifier import PieceClassifier
+from src.inference_backends import InferenceBackend, NumpyBackend, TFLiteBackend, OnnxBackend, export_onnx, export_tflite, load_backend
+from src.numpy_inference import convert_model
+
+@pytest.fixture(scope='module')
+def reference():
+    return PieceClassifier()
+
+@pytest.fixture(scope='module')
+def sample_batch(reference):
+    # Quelques cases réelles de chaque classe
+    data_dir = os.path.join('data', 'pieces')
+    squares = []
+    for class_name in sorted(os.listdir(data_dir)):
+        for img_name in sorted(os.listdir(os.path.join(data_dir, class_name)))[:2]:
+            img = cv2.imread(os.path.join(data_dir, class_name, img_name))
+            squares.append(cv2.resize(cv2.cvtColor(img, cv2.COLOR_BGR2RGB), (100, 100)))
+    return reference.preprocess_batch(squares)
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        load_backend('caffe')
+
+def test_incomplete_backend_rejected_at_creation():
+    class Incomplete(InferenceBackend):
+        name = 'incomplete'
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_keras_compiled_buckets(reference, sample_batch):
+    backend = reference.backend
+    expected = np.asarray(reference.model.predict(sample_batch, verbose=0))
+    # Lots complétés jusqu'à la taille supérieure, ou découpés au-delà de la dernière
+    for count in (1, 3, len(sample_batch)):
+        assert np.allclose(backend.predict(sample_batch[:count]), expected[:count], atol=1e-5)
+    large = np.resize(sample_batch, (backend.BUCKETS[-1] + 5,) + sample_batch.shape[1:])
+    assert backend.predict(large).shape == (len(large), len(reference.PIECES))
+    # Une fonction compilée par taille de lot, jamais plus
+    assert set(backend._functions) <= set(backend.BUCKETS)
+
+def test_tflite_parity(reference, sample_batch, tmp_path):
+    path = str(tmp_path / 'model.tflite')
+    export_tflite(reference.model, path)
+    classifier = PieceClassifier(model_path=path, backend='tflite')
+    assert isinstance(classifier.backend, TFLiteBackend)
+    
+    expected = reference.predict_proba(sample_batch)
+    assert np.allclose(classifier.predict_proba(sample_batch), expected, atol=1e-5)
+    # La taille du lot peut varier d'un appel à l'autre
+    assert np.allclose(classifier.predict_proba(sample_batch[:3]), expected[:3], atol=1e-5)
+
+def test_onnx_parity(reference, sample_batch, tmp_path):
+    pytest.importorskip('onnxruntime')
+    pytest.importorskip('tf2onnx')
+    path = str(tmp_path / 'model.onnx')
+    export_onnx(reference.model, path)
+    classifier = PieceClassifier(model_path=path, backend='onnx')
+    assert isinstance(classifier.backend, OnnxBackend)
+    assert np.allclose(classifier.predict_proba(sample_batch), reference.predict_proba(sample_batch), atol=1e-5)
+
+def test_missing_export_falls_back_to_keras(tmp_path):
+    classifier = PieceClassifier(model_path=str(tmp_path / 'absent.tflite'), backend='tflite')
+    assert classifier.backend.name == 'keras'
+
+@pytest.mark.parametrize('quantization,tolerance', [('float16', 1e-2), ('int8', 5e-2)])
+def test_quantized_tflite(reference, sample_batch, tmp_path, quantization, tolerance):
+    path = str(tmp_path / f'model_{quantization}.tflite')
+    export_tflite(reference.model, path, quantization=quantization, representative_data=sample_batch)
+    classifier = PieceClassifier(model_path=path, backend='tflite')
+    assert classifier.backend.quantized == (quantization == 'int8')
+    
+    probabilities = classifier.predict_proba(sample_batch)
+    assert probabilities.dtype == np.float32
+    assert np.abs(probabilities - reference.predict_proba(sample_batch)).max() < tolerance
+
+def test_numpy_parity(reference, sample_batch, tmp_path):
+    path = str(tmp_path / 'model.npz')
+    convert_model(reference.model, path)
+    classifier = PieceClassifier(model_path=path, backend='numpy')
+    assert isinstance(classifier.backend, NumpyBackend)
+    expected = reference.predict_proba(sample_batch)
+    assert np.allclose(classifier.predict_proba(sample_batch), expected, atol=1e-5)
+
+def test_numpy_batchnorm_and_same_padding(tmp_path):
+    # Architecture de create_model, avec des statistiques de normalisation non triviales
+    model = PieceClassifier().create_model(7)
+    rng = np.random.RandomState(0)
+    for layer in model.layers:
+        if type(layer).__name__ == 'BatchNormalization':
+            gamma, beta, mean, variance = layer.get_weights()
+            layer.set_weights([rng.uniform(0.5, 1.5, gamma.shape), rng.normal(0, 0.1, beta.shape),
+                               rng.normal(0, 0.1, mean.shape), rng.uniform(0.5, 1.5, variance.shape)])
+    converted = convert_model(model, str(tmp_path / 'model.npz'))
+    batch = rng.standard_normal((3, 100, 100, 3)).astype(np.float32)
+    assert np.allclose(converted.predict(batch), model.predict(batch, verbose=0), atol=1e-5)
@@ -39,3 +39,92 @@ def test_classify_board(classifier):
     
     assert len(pieces) == 64
     assert all(p in PieceClassifier.PIECES.values() for p in pieces)
+
+def test_classify_batch(classifier):
+    # Un lot de 64 cases ne doit déclencher qu'une seule prédiction
+    squares = np.random.randint(0, 256, (64, 100, 100, 3), dtype=np.uint8)
+    pieces, probabilities = classifier.classify_batch(squares)
+    
+    assert len(pieces) == 64
+    assert probabilities.shape == (64, len(PieceClassifier.PIECES))
+    assert all(p in PieceClassifier.PIECES.values() for p in pieces)
+    assert np.allclose(probabilities.sum(axis=1), 1.0, atol=1e-4)
+
+def test_classify_batch_with_batching(classifier):
+    squares = np.random.randint(0, 256, (64, 100, 100, 3), dtype=np.uint8)
+    expected, _ = classifier.classify_batch(squares)
+    
+    batcher = classifier.enable_batching(max_wait_ms=1)
+    pieces, probabilities = classifier.classify_batch(squares)
+    assert pieces == expected
+    assert probabilities.shape == (64, len(PieceClassifier.PIECES))
+    assert batcher.batches == 1
+
+def test_classify_batch_with_cache():
+    from src.prediction_cache import PredictionCache
+    cache = PredictionCache()
+    classifier = PieceClassifier(cache=cache)
+    calls = []
+    predict_proba = classifier.predict_proba
+    classifier.predict_proba = lambda batch: calls.append(len(batch)) or predict_proba(batch)
+    
+    # Deux contenus distincts répétés sur tout l'échiquier
+    light = np.full((100, 100, 3), 220, dtype=np.uint8)
+    dark = np.full((100, 100, 3), 90, dtype=np.uint8)
+    squares = np.array([light if (i + i // 8) % 2 == 0 else dark for i in range(64)])
+    
+    pieces, probabilities = classifier.classify_batch(squares)
+    assert len(pieces) == 64 and probabilities.shape == (64, len(PieceClassifier.PIECES))
+    assert calls == [2]
+    assert np.allclose(probabilities[0], predict_proba(classifier.preprocess_batch(light[None]))[0], atol=1e-5)
+    
+    # Le second échiquier ne passe pas par le modèle
+    again, _ = classifier.classify_batch(squares)
+    assert again == pieces and calls == [2]
+    assert cache.hits == 64
+
+def test_classify_batch_skips_empty_squares():
+    from src.empty_filter import EmptySquareFilter
+    classifier = PieceClassifier(empty_filter=EmptySquareFilter())
+    calls = []
+    predict_proba = classifier.predict_proba
+    classifier.predict_proba = lambda batch: calls.append(len(batch)) or predict_proba(batch)
+    
+    squares = np.full((64, 100, 100, 3), 200, dtype=np.uint8)
+    squares[:10] = np.random.randint(0, 256, (10, 100, 100, 3), dtype=np.uint8)
+    pieces, probabilities = classifier.classify_batch(squares)
+    
+    assert calls == [10]
+    assert pieces[10:] == ['empty'] * 54
+    assert np.allclose(probabilities.sum(axis=1), 1.0, atol=1e-4)
+    assert classifier.empty_filter.skipped == 54
+
+def test_decode_predictions_threshold(classifier):
+    probabilities = np.array([
+        [0.9, 0.02, 0.02, 0.02, 0.02, 0.01, 0.01],  # Fou confiant
+        [0.2, 0.1, 0.1, 0.2, 0.2, 0.1, 0.1],         # Trop incertain
+    ])
+    assert classifier.decode_predictions(probabilities) == ['B', 'empty']
+
+def test_warm_up(classifier):
+    assert classifier.warm_up(batch_size=4) > 0
+
+def test_board_mode(tmp_path):
+    from src.model_trainer import ChessModelTrainer
+    model = ChessModelTrainer().create_board_model(board_size=PieceClassifier.BOARD_INPUT_SIZE)
+    assert model.output_shape == (None, 8, 8, len(PieceClassifier.PIECES))
+    path = str(tmp_path / 'board.h5')
+    model.save(path)
+    
+    classifier = PieceClassifier(board_model_path=path)
+    assert classifier.mode == 'board'
+    board = np.full((PieceClassifier.BOARD_INPUT_SIZE, PieceClassifier.BOARD_INPUT_SIZE, 3), 200, dtype=np.uint8)
+    pieces = classifier.classify_board_image(board)
+    assert len(pieces) == 64 and set(pieces) <= set(PieceClassifier.PIECES.values())
+    
+    # Un seul échiquier par requête : le préchauffage ne trace que la taille de lot 1
+    classifier.warm_up(batch_size=4)
+    assert set(classifier.board_backend._functions) == {1}
+    
+    # Sans modèle d'échiquier, classification case par case
+    assert PieceClassifier(board_model_path=str(tmp_path / 'absent.h5')).mode == 'squares'
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from src.prediction_cache import PredictionCache
+
+def _square(value, seed=None):
+    square = np.full((100, 100, 3), value, dtype=np.uint8)
+    if seed is not None:
+        square[30:70, 30:70] = np.random.RandomState(seed).randint(0, 256, (40, 40, 3))
+    return square
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        PredictionCache(mode='md5')
+
+def test_hits_and_misses():
+    cache = PredictionCache()
+    keys = cache.keys([_square(200), _square(80), _square(200)])
+    assert keys[0] == keys[2] and keys[0] != keys[1]
+    
+    assert cache.get_many(keys[:2]) == [None, None]
+    cache.put_many(keys[:2], np.eye(2, 7, dtype=np.float32))
+    rows = cache.get_many(keys)
+    assert np.array_equal(rows[0], rows[2])
+    assert rows[1][1] == 1.0
+    assert cache.hits == 3 and cache.misses == 2
+
+def test_memory_cap_evicts_least_recently_used():
+    row_size = PredictionCache.ENTRY_OVERHEAD + 16 + 7 * 4
+    cache = PredictionCache(max_bytes=3 * row_size)
+    keys = cache.keys([_square(0, seed=i) for i in range(4)])
+    cache.put_many(keys[:3], np.zeros((3, 7)))
+    cache.get_many(keys[:1])  # La première entrée redevient la plus récente
+    cache.put_many(keys[3:], np.zeros((1, 7)))
+    
+    assert len(cache) == 3 and cache.evictions == 1
+    assert cache.nbytes <= cache.max_bytes
+    assert cache.get_many([keys[1]]) == [None]
+    assert cache.get_many([keys[0]])[0] is not None
+
+def test_phash_tolerates_noise():
+    square = _square(180, seed=1)
+    noisy = np.clip(square.astype(int) + np.random.RandomState(2).randint(-3, 4, square.shape), 0, 255).astype(np.uint8)
+    
+    exact = PredictionCache(mode='exact')
+    exact.put_many(exact.keys([square]), np.ones((1, 7)))
+    assert exact.get_many(exact.keys([noisy])) == [None]
+    
+    phash = PredictionCache(mode='phash')
+    phash.put_many(phash.keys([square, _square(220)]), np.eye(2, 7))
+    hit, = phash.get_many(phash.keys([noisy]))
+    assert hit is not None and hit[0] == 1.0
+    # Une case vide foncée ne réutilise pas l'entrée de la case vide claire
+    assert phash.get_many(phash.keys([_square(90)])) == [None]
+    # Ni une autre pièce sur la même case
+    assert phash.get_many(phash.keys([_square(180, seed=3)])) == [None]
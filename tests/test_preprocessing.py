@@ -0,0 +1,44 @@
+import cv2
+import numpy as np
+import pytest
+from src.preprocessing import preprocess_batch
+
+def _reference(img):
+    # Prétraitement historique d'une case isolée
+    img = cv2.resize(img, (100, 100))
+    lab = cv2.cvtColor(img, cv2.COLOR_RGB2LAB)
+    l, a, b = cv2.split(lab)
+    cl = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8)).apply(l)
+    img = cv2.cvtColor(cv2.merge((cl, a, b)), cv2.COLOR_LAB2RGB)
+    img = cv2.GaussianBlur(img, (3, 3), 0).astype(np.float32) / 255.0
+    return (img - np.mean(img)) / (np.std(img) + 1e-7)
+
+@pytest.fixture
+def squares():
+    rng = np.random.RandomState(0)
+    squares = rng.randint(0, 256, (16, 100, 100, 3)).astype(np.uint8)
+    for square in squares[8:]:
+        cv2.GaussianBlur(square, (21, 21), 0, dst=square)
+    return squares
+
+def test_matches_per_square_preprocessing(squares):
+    batch = preprocess_batch(squares)
+    assert batch.shape == (16, 100, 100, 3) and batch.dtype == np.float32
+    assert np.allclose(batch, np.stack([_reference(s) for s in squares]), atol=1e-5)
+
+def test_preallocated_output(squares):
+    out = np.empty((16, 100, 100, 3), dtype=np.float32)
+    assert preprocess_batch(squares, out=out) is out
+    with pytest.raises(ValueError):
+        preprocess_batch(squares, out=np.empty((8, 100, 100, 3), dtype=np.float32))
+
+def test_mixed_inputs(squares):
+    gray = cv2.cvtColor(squares[0], cv2.COLOR_RGB2GRAY)
+    rgba = cv2.cvtColor(cv2.resize(squares[1], (150, 150)), cv2.COLOR_RGB2RGBA)
+    batch = preprocess_batch([gray, rgba])
+    assert batch.shape == (2, 100, 100, 3)
+    assert np.allclose(batch[1], _reference(cv2.resize(squares[1], (150, 150))), atol=1e-5)
+
+def test_without_standardization(squares):
+    batch = preprocess_batch(squares, blur=False, standardize=False)
+    assert batch.min() >= 0.0 and batch.max() <= 1.0
@@ -0,0 +1,80 @@
+import time
+import cv2
+import chess
+import numpy as np
+import pytest
+from src.result_cache import ResultCache
+from src.dataset_generator import BoardDatasetGenerator
+
+@pytest.fixture(scope='module')
+def boards():
+    generator = BoardDatasetGenerator(size=256, seed=0)
+    board = chess.Board()
+    colors = generator.SQUARE_COLORS[0]
+    original = generator.render_sprites(board, colors)
+    board.remove_piece_at(chess.E2)
+    return original, generator.render_sprites(board, colors)
+
+def test_exact_tier():
+    cache = ResultCache()
+    key = cache.exact_key(b'image')
+    assert cache.get('exact', key) is None
+    cache.put('exact', key, {'fen': 'x'})
+    assert cache.get('exact', key) == {'fen': 'x'}
+    assert cache.get('exact', cache.exact_key(b'image2')) is None
+    assert cache.metrics()['hits']['exact'] == 1 and cache.metrics()['misses'] == 2
+
+def test_near_tier(boards):
+    original, moved = boards
+    cache = ResultCache()
+    cache.put('near', cache.board_signature(original), {'fen': 'initial'})
+    
+    # Même échiquier recompressé en JPEG et redimensionné
+    _, encoded = cv2.imencode('.jpg', original, [cv2.IMWRITE_JPEG_QUALITY, 70])
+    recompressed = cv2.resize(cv2.imdecode(encoded, cv2.IMREAD_COLOR), (200, 200))
+    assert cache.get('near', cache.board_signature(recompressed)) == {'fen': 'initial'}
+    
+    # Un pion en moins : autre position
+    assert cache.get('near', cache.board_signature(moved)) is None
+
+def test_near_tier_rejects_substituted_piece():
+    # Mêmes sprites d'une position à l'autre : seule la pièce remplacée change
+    generator = BoardDatasetGenerator(size=256, seed=0)
+    generator.sprites = {piece: sprites[:1] for piece, sprites in generator.sprites.items()}
+    colors = generator.SQUARE_COLORS[0]
+    board = chess.Board()
+    cache = ResultCache()
+    cache.put('near', cache.board_signature(generator.render_sprites(board, colors)), {'fen': 'initial'})
+    
+    for square, piece in ((chess.E1, chess.QUEEN), (chess.D1, chess.KING), (chess.C1, chess.PAWN),
+                          (chess.A1, chess.KNIGHT), (chess.E8, chess.QUEEN), (chess.E2, chess.BISHOP)):
+        substituted = board.copy()
+        substituted.set_piece_at(square, chess.Piece(piece, board.piece_at(square).color))
+        signature = cache.board_signature(generator.render_sprites(substituted, colors))
+        assert cache.get('near', signature) is None, chess.square_name(square)
+
+def test_lru_and_ttl(boards, monkeypatch):
+    cache = ResultCache(max_entries=2, ttl=60)
+    for i in range(3):
+        cache.put('exact', bytes([i]), {'i': i})
+    assert cache.get('exact', bytes([0])) is None
+    assert cache.metrics()['evictions'] == 1
+    cache.put('near', cache.board_signature(boards[0]), {'i': 'near'})
+    
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 61)
+    assert cache.get('exact', bytes([2])) is None
+    assert cache.get('near', cache.board_signature(boards[0])) is None
+    assert cache.metrics()['expirations'] == 2
+    assert cache.metrics()['entries'] == {'exact': 1, 'near': 0}
+
+def test_sqlite_persistence(boards, tmp_path):
+    path = str(tmp_path / 'results.db')
+    cache = ResultCache(db_path=path)
+    cache.put('exact', b'key', {'fen': 'x'})
+    cache.put('near', cache.board_signature(boards[0]), {'fen': 'y'})
+    
+    reloaded = ResultCache(db_path=path)
+    assert reloaded.get('exact', b'key') == {'fen': 'x'}
+    assert reloaded.get('near', reloaded.board_signature(boards[0])) == {'fen': 'y'}
+    assert reloaded.metrics()['persistent']
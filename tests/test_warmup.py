@@ -0,0 +1,38 @@
+import threading
+import pytest
+from src.warmup import BackgroundInitializer
+
+def test_get_waits_for_warmup():
+    warmed = []
+    initializer = BackgroundInitializer(lambda: {'model': 'ok'}, warmed.append).start()
+    components = initializer.get(timeout=5)
+    assert components == {'model': 'ok'}
+    assert warmed == [components]
+    assert initializer.ready and initializer.status()['ready']
+
+def test_not_ready_before_warmup_ends():
+    release = threading.Event()
+    initializer = BackgroundInitializer(lambda: release.wait(5)).start()
+    with pytest.raises(TimeoutError):
+        initializer.get(timeout=0.05)
+    assert not initializer.status()['ready']
+    release.set()
+    assert initializer.get(timeout=5) is True
+
+def test_factory_error_is_reported():
+    def factory():
+        raise ValueError("modèle introuvable")
+    initializer = BackgroundInitializer(factory).start()
+    with pytest.raises(RuntimeError):
+        initializer.get(timeout=5)
+    status = initializer.status()
+    assert initializer.failed and not status['ready']
+    assert 'modèle introuvable' in status['error']
+
+def test_nothing_runs_before_start():
+    built = []
+    initializer = BackgroundInitializer(lambda: built.append(1))
+    assert not initializer.started and not built
+    assert initializer.status() == {'started': False, 'ready': False, 'elapsed_ms': None}
+    initializer.start().get(timeout=5)
+    assert initializer.started and built == [1]